@@ -0,0 +1,277 @@
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Type
+
+import cv2
+import numpy as np
+
+from Mobility_Utils.Line_Geometry import is_crossing_line
+from Mobility_Utils.Traffic_Aggregates import RecentIds, TrafficAggregator
+from Speed_Detection.Speed_Calculator import SpeedEstimator
+from Speed_Detection.Speed_Utils.Pixel_Point import draw_info, draw_lines
+from Traffic_Counter.Utils.LineVisualization import draw_lines_and_labels, draw_vehicle_count
+
+
+class Analyser:
+    """
+    Base class for per-frame analysers fed by the shared detection + tracking pass.
+
+    Subclasses receive the tracked objects of every frame and never run
+    inference themselves, so adding an analyser adds no detection cost.
+    Results go into a shared TrafficAggregator.
+    """
+
+    name = "analyser"
+
+    def __init__(self, aggregator: Optional[TrafficAggregator] = None) -> None:
+        self.aggregator = aggregator or TrafficAggregator()
+
+    def process(
+        self,
+        frame_idx: int,
+        timestamp: float,
+        tracked_objects: List[List[int]],
+        classes: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Consume the tracked objects of one frame.
+
+        Args:
+            frame_idx (int): Zero-based frame index.
+            timestamp (float): Frame time in seconds from the start of the video.
+            tracked_objects (List[List[int]]): Boxes with IDs [x1, y1, x2, y2, id].
+            classes (List[str] | None): Class name of each tracked object.
+        """
+
+    def annotate(self, frame: np.ndarray, tracked_objects: List[List[int]]) -> None:
+        """Draw this analyser's overlay on the frame."""
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the analyser's results so far."""
+        return {}
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Return the analyser's own state for checkpointing.
+
+        The shared aggregator is checkpointed separately by the caller.
+        """
+        return {}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore a state returned by `get_state`."""
+
+
+class LineCounter(Analyser):
+    """
+    Counts tracked vehicles crossing each configured counting line.
+    """
+
+    name = "line_counter"
+
+    def __init__(
+        self,
+        lines: Dict[str, Dict[str, Any]],
+        aggregator: Optional[TrafficAggregator] = None,
+        max_tracked: int = 10000,
+    ) -> None:
+        """
+        Args:
+            lines (dict): Line definitions keyed by name, as LINE_COORDS:
+                {"nb": {"start": (x1, y1), "end": (x2, y2), "label": "NB Incoming",
+                        "axis": "horizontal", "direction": "nb"}}. `axis` defaults to
+                'horizontal' and `direction` to the line name.
+            aggregator (TrafficAggregator | None): Where crossings are recorded.
+            max_tracked (int): Recently counted IDs remembered per line.
+        """
+        super().__init__(aggregator)
+        self.lines = lines
+        self.counted = {name: RecentIds(max_tracked) for name in lines}
+        self._crossed_now = set()
+
+    def process(
+        self,
+        frame_idx: int,
+        timestamp: float,
+        tracked_objects: List[List[int]],
+        classes: Optional[List[str]] = None,
+    ) -> None:
+        self._crossed_now = set()
+        for i, (x1, y1, x2, y2, obj_id) in enumerate(tracked_objects):
+            cx, cy = (int((x1 + x2) // 2), int((y1 + y2) // 2))
+
+            for name, line in self.lines.items():
+                axis = line.get("axis", "horizontal")
+                crossed = is_crossing_line(cx, cy, line["start"], line["end"], axis=axis)
+                if crossed and obj_id not in self.counted[name]:
+                    self.counted[name].add(obj_id)
+                    self._crossed_now.add(obj_id)
+                    class_name = classes[i] if classes else "vehicle"
+                    self.aggregator.add_count(timestamp, name, class_name, line.get("direction", name))
+
+    def annotate(self, frame: np.ndarray, tracked_objects: List[List[int]]) -> None:
+        for x1, y1, x2, y2, obj_id in tracked_objects:
+            if obj_id in self._crossed_now:
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+        draw_lines_and_labels(frame, self.lines)
+        draw_vehicle_count(frame, {name.upper(): self.aggregator.total(name) for name in self.lines})
+
+    def summary(self) -> Dict[str, Any]:
+        return {"counts": {name: self.aggregator.total(name) for name in self.lines}}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"counted": {name: ids.get_state() for name, ids in self.counted.items()}}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        for name, ids in state["counted"].items():
+            self.counted[name].set_state(ids)
+
+
+class SpeedAnalyser(Analyser):
+    """
+    Estimates vehicle speeds between a red and a blue reference line.
+    """
+
+    name = "speed"
+
+    def __init__(
+        self,
+        red_line_y: int,
+        blue_line_y: int,
+        offset: int = 6,
+        distance_m: float = 200,
+        line_name: str = "speed",
+        aggregator: Optional[TrafficAggregator] = None,
+        max_tracked: int = 10000,
+        recent_window: float = 60.0,
+    ) -> None:
+        """
+        Args:
+            red_line_y (int): Y-coordinate of the red line.
+            blue_line_y (int): Y-coordinate of the blue line.
+            offset (int): Tolerance for detecting line crossing.
+            distance_m (float): Real-world distance between the two lines in meters.
+            line_name (str): Name of this speed segment in the aggregates.
+            aggregator (TrafficAggregator | None): Where speeds are recorded.
+            max_tracked (int): Object IDs whose last speed is kept for drawing.
+            recent_window (float): Seconds of measurements returned by `recent_speeds`.
+        """
+        super().__init__(aggregator)
+        self.red_line_y = red_line_y
+        self.blue_line_y = blue_line_y
+        self.line_name = line_name
+        self.recent_window = recent_window
+        self.estimator = SpeedEstimator(red_line_y, blue_line_y, offset, distance_m, max_tracked)
+        self.speeds = RecentIds(max_tracked)
+        # (timestamp, km/h) of the latest measurements, bounded like the other per-object state
+        self.recent = deque(maxlen=max_tracked)
+
+    def process(
+        self,
+        frame_idx: int,
+        timestamp: float,
+        tracked_objects: List[List[int]],
+        classes: Optional[List[str]] = None,
+    ) -> None:
+        for i, (x1, y1, x2, y2, object_id) in enumerate(tracked_objects):
+            cy = (y1 + y2) // 2
+            speed_down = self.estimator.calculate_speed(cy, object_id, "down", timestamp)
+            speed_up = self.estimator.calculate_speed(cy, object_id, "up", timestamp)
+
+            speed = speed_down or speed_up
+            if speed:
+                self.speeds.add(object_id, speed)
+                self.recent.append((timestamp, speed))
+                self.aggregator.add_speed(timestamp, self.line_name, speed)
+                class_name = classes[i] if classes else "vehicle"
+                direction = "down" if speed_down else "up"
+                self.aggregator.add_count(timestamp, self.line_name, class_name, direction)
+
+    def annotate(self, frame: np.ndarray, tracked_objects: List[List[int]]) -> None:
+        for x1, y1, x2, y2, object_id in tracked_objects:
+            draw_info(frame, self.speeds.get(object_id), (x1, y1, x2, y2), object_id)
+        draw_lines(frame, self.red_line_y, self.blue_line_y)
+
+    def recent_speeds(self, timestamp: float) -> List[float]:
+        """Speeds (km/h) measured in the last `recent_window` seconds before `timestamp`."""
+        while self.recent and self.recent[0][0] < timestamp - self.recent_window:
+            self.recent.popleft()
+        return [speed for _, speed in self.recent]
+
+    def summary(self) -> Dict[str, Any]:
+        return self.aggregator.snapshot(rollup_names=[])["speeds"].get(self.line_name, {"count": 0})
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "estimator": self.estimator.get_state(),
+            "speeds": self.speeds.get_state(),
+            "recent": list(self.recent),
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        self.estimator.set_state(state["estimator"])
+        self.speeds.set_state(state["speeds"])
+        self.recent.clear()
+        self.recent.extend(state.get("recent", []))
+
+
+ANALYSER_TYPES: Dict[str, Type[Analyser]] = {
+    LineCounter.name: LineCounter,
+    SpeedAnalyser.name: SpeedAnalyser,
+}
+
+
+def build_analysers(
+    specs: List[Dict[str, Any]],
+    aggregator: Optional[TrafficAggregator] = None,
+) -> List[Analyser]:
+    """
+    Instantiate analysers from config entries.
+
+    Args:
+        specs (List[dict]): Entries like {"type": "speed", "red_line_y": 120, ...};
+            every key except `type` is passed to the analyser's constructor.
+        aggregator (TrafficAggregator | None): Aggregator shared by all analysers.
+
+    Returns:
+        List[Analyser]: The configured analysers.
+
+    Raises:
+        ValueError: If an entry names an unknown analyser type.
+    """
+    analysers = []
+    for spec in specs:
+        params = dict(spec)
+        kind = params.pop("type")
+        if kind not in ANALYSER_TYPES:
+            raise ValueError(f"Unknown analyser type '{kind}'. Available: {sorted(ANALYSER_TYPES)}")
+        analysers.append(ANALYSER_TYPES[kind](aggregator=aggregator, **params))
+        logging.info("Analyser enabled: %s", kind)
+    return analysers
+
+
+def aggregate_limits(specs: List[Dict[str, Any]], class_names: List[str]) -> Dict[str, int]:
+    """
+    Size a TrafficAggregator for the configured analysers.
+
+    Args:
+        specs (List[dict]): Analyser entries, as passed to `build_analysers`.
+        class_names (List[str]): Class names the analysers are fed.
+
+    Returns:
+        dict: `max_lines`, `max_classes` and `max_directions` keyword arguments.
+    """
+    lines, directions = set(), set()
+    for spec in specs:
+        if spec["type"] == LineCounter.name:
+            for name, line in spec["lines"].items():
+                lines.add(name)
+                directions.add(line.get("direction", name))
+        elif spec["type"] == SpeedAnalyser.name:
+            lines.add(spec.get("line_name", "speed"))
+            directions.update(("down", "up"))
+    return {
+        "max_lines": max(len(lines), 1),
+        "max_classes": max(len(set(class_names)), 1),
+        "max_directions": max(len(directions), 1),
+    }
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+BOX_COLUMNS = 6  # x1, y1, x2, y2, conf, cls
+_HASH_CHUNK = 1 << 20
+
+
+def file_digest(path: str, memo_path: Optional[str] = None) -> Optional[str]:
+    """
+    SHA-256 of a file's content, memoized by (path, size, mtime).
+
+    Args:
+        path (str): File to hash.
+        memo_path (str | None): JSON file used to remember digests between runs.
+
+    Returns:
+        str | None: Hex digest, or None if `path` is not a regular file (a
+            device index, a stream URL, weights not downloaded yet, ...).
+    """
+    if not isinstance(path, (str, os.PathLike)) or not os.path.isfile(path):
+        return None
+
+    stat = os.stat(path)
+    memo_key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    memo: Dict[str, str] = {}
+    if memo_path and os.path.exists(memo_path):
+        with open(memo_path, "r") as f:
+            memo = json.load(f)
+        if memo_key in memo:
+            return memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    if memo_path:
+        memo[memo_key] = value
+        tmp_path = f"{memo_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(memo, f, indent=2)
+        os.replace(tmp_path, memo_path)
+    return value
+
+
+class DetectionCache:
+    """
+    Persistent per-frame cache of raw YOLO detections.
+
+    Entries are keyed by (video content hash, model weight hash, inference
+    parameters), so changing counting lines, speed lines or class filters
+    reuses the stored detections instead of re-running inference.
+
+    On disk every cache is a directory with two append-only raw files that
+    are memory-mapped for reading:
+        boxes.f32  -> float32 rows of [x1, y1, x2, y2, conf, cls]
+        index.i64  -> int64 pairs of (frame_idx, end row in boxes.f32)
+    Cached frames always form a contiguous prefix 0..last_frame, so a
+    cache is either complete or continued from its end. A meta.json is
+    written once every frame of the video is cached. An interrupted run
+    leaves a valid prefix that the next run continues.
+    """
+
+    def __init__(self, cache_root: str, video_path: str, model_path: str, params: Dict[str, Any]) -> None:
+        """
+        Open (or start) the cache for a video / model / parameter combination.
+
+        Args:
+            cache_root (str): Directory that holds all detection caches.
+            video_path (str): Source video file.
+            model_path (str): YOLO weights file.
+            params (dict): Inference parameters that change the detections
+                (e.g. image size, confidence threshold, resize target).
+
+        Raises:
+            ValueError: If the video or the weights are not regular files, so
+                their content cannot identify the cached detections.
+        """
+        os.makedirs(cache_root, exist_ok=True)
+        memo_path = os.path.join(cache_root, "file_hashes.json")
+        digests = {"video": file_digest(video_path, memo_path), "model": file_digest(model_path, memo_path)}
+        for kind, source in (("video", video_path), ("model", model_path)):
+            if digests[kind] is None:
+                raise ValueError(f"Cannot cache detections: {kind} {source!r} is not a regular file")
+        key_source = json.dumps(
+            {
+                "video": digests["video"],
+                "model": digests["model"],
+                "params": params,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        self.key = hashlib.sha256(key_source.encode()).hexdigest()[:24]
+        self.path = os.path.join(cache_root, self.key)
+        os.makedirs(self.path, exist_ok=True)
+
+        self._boxes_path = os.path.join(self.path, "boxes.f32")
+        self._index_path = os.path.join(self.path, "index.i64")
+        self._meta_path = os.path.join(self.path, "meta.json")
+        self._recover()
+        self.complete = os.path.exists(self._meta_path)
+
+        if not self.complete:
+            with open(os.path.join(self.path, "params.json"), "w") as f:
+                f.write(key_source)
+        self._load()
+
+        self._boxes_file = None
+        self._index_file = None
+        self._rows = int(self._ends[-1]) if self._ends.size else 0
+        self.last_frame = int(self._frames[-1]) if self._frames.size else -1
+        self.writable = True
+        self.hits = 0
+        self.misses = 0
+
+        logging.info(
+            "Detection cache %s: %d frames cached%s",
+            self.key,
+            self._frames.size,
+            " (complete)" if self.complete else "",
+        )
+
+    def _recover(self) -> None:
+        """Drop partial writes left by an interrupted run, and any frames after a gap."""
+        if not os.path.exists(self._index_path):
+            open(self._index_path, "wb").close()
+            open(self._boxes_path, "wb").close()
+            return
+
+        index_size = os.path.getsize(self._index_path)
+        entries = index_size // 16
+        if index_size % 16:
+            with open(self._index_path, "r+b") as f:
+                f.truncate(entries * 16)
+
+        box_rows = os.path.getsize(self._boxes_path) // (4 * BOX_COLUMNS)
+        if entries:
+            index = np.fromfile(self._index_path, dtype=np.int64).reshape(-1, 2)
+            valid = int(np.searchsorted(index[:, 1], box_rows, side="right"))
+            # Caches written by runs that skipped frames have holes; keep the part before the first one
+            gaps = np.flatnonzero(index[:valid, 0] != np.arange(valid))
+            if gaps.size:
+                logging.warning(
+                    "Detection cache %s: frame %d is missing; dropping the %d frames cached after it",
+                    self.key,
+                    gaps[0],
+                    valid - gaps[0],
+                )
+                valid = int(gaps[0])
+                if os.path.exists(self._meta_path):
+                    os.remove(self._meta_path)
+            if valid < entries:
+                with open(self._index_path, "r+b") as f:
+                    f.truncate(valid * 16)
+            box_rows = int(index[valid - 1, 1]) if valid else 0
+        else:
+            box_rows = 0
+        with open(self._boxes_path, "r+b") as f:
+            f.truncate(box_rows * 4 * BOX_COLUMNS)
+
+    def _load(self) -> None:
+        """Memory-map the cached boxes and index."""
+        if os.path.getsize(self._index_path):
+            index = np.memmap(self._index_path, dtype=np.int64, mode="r").reshape(-1, 2)
+            self._frames, self._ends = index[:, 0], index[:, 1]
+        else:
+            self._frames = self._ends = np.empty(0, dtype=np.int64)
+
+        if os.path.getsize(self._boxes_path):
+            self._boxes = np.memmap(self._boxes_path, dtype=np.float32, mode="r").reshape(-1, BOX_COLUMNS)
+        else:
+            self._boxes = np.empty((0, BOX_COLUMNS), dtype=np.float32)
+
+    def get(self, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        Look up the detections of a frame.
+
+        Args:
+            frame_idx (int): Zero-based frame index in the source video.
+
+        Returns:
+            np.ndarray | None: (N, 6) detections, or None on a cache miss.
+        """
+        pos = int(np.searchsorted(self._frames, frame_idx))
+        if pos >= self._frames.size or self._frames[pos] != frame_idx:
+            self.misses += 1
+            return None
+        start = int(self._ends[pos - 1]) if pos else 0
+        self.hits += 1
+        return np.asarray(self._boxes[start : int(self._ends[pos])])
+
+    def put(self, frame_idx: int, detections: np.ndarray) -> None:
+        """
+        Append the detections of a frame.
+
+        Frames must be added in order, each one right after the last cached
+        frame. Frames already cached are ignored. A frame after a gap (e.g.
+        a run that skipped frames) stops caching for the rest of this run,
+        so the cache is never marked complete with frames missing.
+
+        Args:
+            frame_idx (int): Zero-based frame index in the source video.
+            detections (np.ndarray): (N, 6) raw detections.
+        """
+        if frame_idx <= self.last_frame or not self.writable:
+            return
+        if frame_idx != self.last_frame + 1:
+            logging.warning(
+                "Detection cache %s: frame %d follows frame %d; not caching the rest of this run",
+                self.key,
+                frame_idx,
+                self.last_frame,
+            )
+            self.writable = False
+            return
+        if self._boxes_file is None:
+            self._boxes_file = open(self._boxes_path, "ab")
+            self._index_file = open(self._index_path, "ab")
+
+        rows = np.ascontiguousarray(detections, dtype=np.float32).reshape(-1, BOX_COLUMNS)
+        self._boxes_file.write(rows.tobytes())
+        self._rows += rows.shape[0]
+        # Index entry goes last so a crash never leaves it pointing past the boxes
+        self._boxes_file.flush()
+        self._index_file.write(np.array([frame_idx, self._rows], dtype=np.int64).tobytes())
+        self.last_frame = frame_idx
+
+    def close(self, complete: bool = False) -> None:
+        """
+        Flush pending writes.
+
+        Args:
+            complete (bool): True if the whole video has been processed; marks
+                the cache as complete if every frame of it was cached.
+        """
+        if self._boxes_file is not None:
+            self._boxes_file.close()
+            self._index_file.close()
+            self._boxes_file = self._index_file = None
+
+        if complete and not self.complete and self.writable:
+            frames = os.path.getsize(self._index_path) // 16
+            with open(self._meta_path, "w") as f:
+                json.dump({"frames": frames, "rows": self._rows}, f, indent=2)
+            self.complete = True
+
+        logging.info("Detection cache %s: %d hits, %d misses", self.key, self.hits, self.misses)
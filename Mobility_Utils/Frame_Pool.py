@@ -0,0 +1,172 @@
+import logging
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """
+    Fixed ring of preallocated frame buffers.
+
+    Buffers are handed out with `acquire` and must be given back with
+    `release` once the last consumer (writer, preview, saver) is done, so
+    the decode/resize path reuses the same memory every frame instead of
+    allocating new arrays.
+
+    Free buffers are reused in round-robin order: after `release`, a buffer's
+    contents stay intact until `capacity - 1` more buffers have been acquired.
+    A consumer that keeps a frame longer than that must copy it (as
+    PreviewServer.publish does) or keep it acquired.
+    """
+
+    def __init__(self, shape: Optional[Tuple[int, ...]], capacity: int = 2, dtype=np.uint8) -> None:
+        """
+        Args:
+            shape (Tuple[int, ...] | None): Buffer shape, e.g. (height, width, 3). None if
+                not known yet (e.g. a stream that reports no size): the pool is then sized
+                by `fit` from the first decoded frame.
+            capacity (int): Number of buffers; the most that can be in flight at once.
+            dtype: Buffer dtype.
+
+        Raises:
+            ValueError: If `capacity` is below 1.
+        """
+        if capacity < 1:
+            raise ValueError(f"FramePool needs at least one buffer, got capacity={capacity}")
+        self.shape = tuple(shape) if shape else None
+        self.dtype = dtype
+        # Placeholders until the shape is known; the decoder replaces them with real frames
+        self._buffers = [np.empty(self.shape or (1, 1, 3), dtype=dtype) for _ in range(capacity)]
+        self._free = deque(range(capacity))
+        self._owner = {id(buffer): index for index, buffer in enumerate(self._buffers)}
+        self._in_use = set()
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def available(self) -> int:
+        """Number of buffers ready to be acquired."""
+        return len(self._free)
+
+    def acquire(self) -> np.ndarray:
+        """
+        Take ownership of a free buffer.
+
+        Returns:
+            np.ndarray: A buffer of the pool's shape (contents undefined).
+
+        Raises:
+            RuntimeError: If every buffer is still owned (a release is missing).
+        """
+        if not self._free:
+            raise RuntimeError(f"FramePool exhausted: all {len(self._buffers)} buffers are in use")
+        index = self._free.popleft()
+        self._in_use.add(index)
+        return self._buffers[index]
+
+    def release(self, buffer: np.ndarray) -> None:
+        """
+        Return a buffer to the pool.
+
+        Args:
+            buffer (np.ndarray): A buffer previously obtained from `acquire` (or `fit`).
+
+        Raises:
+            ValueError: If the buffer does not belong to the pool or is already free.
+        """
+        index = self._owner.get(id(buffer))
+        if index is None or index not in self._in_use:
+            raise ValueError("Buffer is not owned by this FramePool")
+        self._in_use.remove(index)
+        if self.shape is not None and buffer.shape != self.shape:
+            # Acquired before the pool was re-sized; replace it with one of the current shape
+            self._replace(index, np.empty(self.shape, dtype=self.dtype))
+        self._free.append(index)
+
+    def fit(self, buffer: np.ndarray, frame: np.ndarray) -> np.ndarray:
+        """
+        Adopt a frame the decoder allocated because it did not fit `buffer`.
+
+        The frame takes the place of `buffer` in the pool, and the pool is
+        re-sized to the frame's shape once, so later frames decode in place
+        again. This covers streams that report no size and rotated videos,
+        whose decoded frames are taller than the reported width x height.
+
+        Args:
+            buffer (np.ndarray): The owned buffer that was passed to the decoder.
+            frame (np.ndarray): The frame the decoder returned.
+
+        Returns:
+            np.ndarray: The owned buffer holding the frame (`frame` itself).
+
+        Raises:
+            ValueError: If `buffer` is not currently owned from this pool.
+        """
+        if frame is buffer:
+            return buffer
+        index = self._owner.get(id(buffer))
+        if index is None or index not in self._in_use:
+            raise ValueError("Buffer is not owned by this FramePool")
+        if frame.shape != self.shape:
+            logging.info("FramePool re-sized from %s to %s", self.shape, frame.shape)
+            self.shape = frame.shape
+            for free_index in self._free:
+                self._replace(free_index, np.empty(self.shape, dtype=self.dtype))
+        self._replace(index, frame)
+        return frame
+
+    def _replace(self, index: int, buffer: np.ndarray) -> None:
+        del self._owner[id(self._buffers[index])]
+        self._buffers[index] = buffer
+        self._owner[id(buffer)] = index
+
+
+def capture_shape(cap: cv2.VideoCapture) -> Optional[Tuple[int, int, int]]:
+    """
+    (height, width, 3) of the frames a capture reports, or None if it reports
+    no size (many live streams). Rotated videos report the unrotated size;
+    FramePool.fit corrects the pool on the first frame in both cases.
+    """
+    height, width = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    return (height, width, 3) if height > 0 and width > 0 else None
+
+
+def read_into(cap: cv2.VideoCapture, pool: FramePool) -> Optional[np.ndarray]:
+    """
+    Decode the next frame directly into a pooled buffer.
+
+    Args:
+        cap (cv2.VideoCapture): Open capture.
+        pool (FramePool): Pool for the capture's frames (re-sized on the first
+            frame if its shape is wrong or unknown).
+
+    Returns:
+        np.ndarray | None: The owned buffer holding the frame, or None at the end
+            of the stream (no buffer is held in that case).
+    """
+    buffer = pool.acquire()
+    ret, image = cap.read(image=buffer)
+    if not ret:
+        pool.release(buffer)
+        return None
+    return pool.fit(buffer, image)
+
+
+def resize_into(frame: np.ndarray, pool: FramePool) -> np.ndarray:
+    """
+    Resize a frame into a pooled buffer of the pool's shape.
+
+    Args:
+        frame (np.ndarray): Source frame (still owned by the caller).
+        pool (FramePool): Destination pool.
+
+    Returns:
+        np.ndarray: The owned destination buffer.
+    """
+    buffer = pool.acquire()
+    cv2.resize(frame, (pool.shape[1], pool.shape[0]), dst=buffer)
+    return buffer
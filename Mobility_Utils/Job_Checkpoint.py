@@ -0,0 +1,198 @@
+import logging
+import os
+import pickle
+import threading
+from typing import Any, Dict, Optional
+
+import cv2
+
+CHECKPOINT_FILE = "job_state.pkl"
+
+
+def _fsync_dir(path: str) -> None:
+    """Flush a directory entry to disk (no-op where unsupported)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def seek_capture(cap: cv2.VideoCapture, position: int) -> bool:
+    """
+    Move a file capture so the next read returns frame `position`.
+
+    Some codecs and backends only seek to keyframes. If the capture lands
+    elsewhere, frames are grabbed forward from the landing point (or from
+    the start, if it overshot) up to the exact frame.
+
+    Args:
+        cap (cv2.VideoCapture): Open capture of a video file.
+        position (int): Zero-based frame number.
+
+    Returns:
+        bool: True if the capture is at the requested position afterwards.
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+    actual = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if actual == position:
+        return True
+
+    logging.info("Seek to frame %d landed on frame %d; grabbing forward", position, actual)
+    if not 0 <= actual < position:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        actual = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if actual != 0:
+            logging.warning("Cannot rewind to frame 0 to reach frame %d; results may differ", position)
+            return False
+    while actual < position:
+        if not cap.grab():
+            logging.warning("Video ended at frame %d before frame %d", actual, position)
+            return False
+        actual += 1
+    return True
+
+
+def segment_path(path: str, start_frame: int) -> str:
+    """
+    Output path for a run resumed at `start_frame` (e.g. output.000900.avi),
+    so a resumed job does not overwrite what the interrupted run wrote.
+    """
+    if not start_frame:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{start_frame:06d}{ext}"
+
+
+class JobCheckpointer:
+    """
+    Periodic crash-safe checkpoints of a video processing job.
+
+    The caller collects the job state (tracker, counters, estimators, ...)
+    at a frame boundary and hands it to `save`. A background thread pickles
+    it and writes it to disk: temp file, fsync, os.replace. The state must
+    be a snapshot the frame loop no longer mutates; the `get_state` methods
+    of the trackers, estimators and aggregators return copies.
+    If a write is still in flight when the next checkpoint is due, only
+    the newest pending state is kept.
+
+    Only load checkpoints this process family wrote: they are pickles.
+    """
+
+    def __init__(self, checkpoint_dir: str, job: Dict[str, Any], every_frames: int = 1000) -> None:
+        """
+        Args:
+            checkpoint_dir (str): Directory holding the checkpoint file.
+            job (dict): Identity of the job (video, model, lines, ...); a
+                checkpoint is only resumed if it was written for an equal job.
+            every_frames (int): Source frames between checkpoints.
+        """
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.checkpoint_dir = checkpoint_dir
+        self.path = os.path.join(checkpoint_dir, CHECKPOINT_FILE)
+        self.job = job
+        self.every_frames = every_frames
+        self.next_position = every_frames
+        self.written = 0
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._writer, name="job-checkpoint", daemon=True)
+        self._thread.start()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the last checkpoint.
+
+        Returns:
+            dict | None: {'position': next frame to process, 'state': saved state},
+                or None if there is no checkpoint.
+
+        Raises:
+            ValueError: If the checkpoint belongs to a different job.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            checkpoint = pickle.load(f)
+        if checkpoint["job"] != self.job:
+            raise ValueError(
+                f"Checkpoint {self.path} was written for a different job: {checkpoint['job']}"
+            )
+        self.next_position = checkpoint["position"] + self.every_frames
+        logging.info("Resuming from checkpoint at frame %d", checkpoint["position"])
+        return {"position": checkpoint["position"], "state": checkpoint["state"]}
+
+    def due(self, position: int) -> bool:
+        """True once `position` (next frame to process) reaches the next checkpoint."""
+        return position >= self.next_position
+
+    def save(self, position: int, state: Dict[str, Any]) -> None:
+        """
+        Queue the state for writing.
+
+        Args:
+            position (int): Next frame to process when resuming.
+            state (dict): Picklable job state, consistent with `position`. It is
+                pickled later on the writer thread, so do not mutate it afterwards.
+        """
+        self.next_position = position + self.every_frames
+        with self._condition:
+            self._pending = {"job": self.job, "position": position, "state": state}
+            self._condition.notify_all()
+
+    def clear(self) -> None:
+        """Drop the checkpoint once the job has completed."""
+        self.flush()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            _fsync_dir(self.checkpoint_dir)
+
+    def flush(self) -> None:
+        """Block until every queued checkpoint is on disk."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is None and not self._writing)
+
+    def close(self) -> None:
+        """Write any pending checkpoint and stop the writer thread."""
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _writer(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                checkpoint, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+                self.written += 1
+            except Exception as error:
+                # A failed checkpoint (disk error, unpicklable state) must not stop
+                # the job or this thread; the next one retries
+                logging.error("Writing checkpoint %s failed: %s", self.path, error)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, payload: bytes) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.checkpoint_dir)
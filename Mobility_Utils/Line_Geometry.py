@@ -0,0 +1,67 @@
+import math
+from typing import Dict, Iterable, List, Tuple
+
+
+def distance_to_line(cx: int, cy: int, line_start: Tuple[int, int], line_end: Tuple[int, int]) -> float:
+    """
+    Distance from a centroid to a line segment.
+
+    Args:
+        cx (int): Centroid x-coordinate.
+        cy (int): Centroid y-coordinate.
+        line_start (Tuple[int, int]): Line start coordinates.
+        line_end (Tuple[int, int]): Line end coordinates.
+
+    Returns:
+        float: Euclidean distance in pixels.
+    """
+    (x1, y1), (x2, y2) = line_start, line_end
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((cx - x1) * dx + (cy - y1) * dy) / length_sq))
+    return math.hypot(cx - (x1 + t * dx), cy - (y1 + t * dy))
+
+
+def lane_queues(
+    centroids: List[Tuple[int, int]], lines: Iterable[Dict[str, Tuple[int, int]]], zone_px: float
+) -> List[int]:
+    """
+    Count vehicles waiting near each line.
+
+    Args:
+        centroids (List[Tuple[int, int]]): Centroids of the tracked vehicles.
+        lines (Iterable[dict]): Lines with "start" and "end" points, one per lane.
+        zone_px (float): Distance from a line within which a vehicle counts as queued.
+
+    Returns:
+        List[int]: Queued vehicles per line, in the order of `lines`.
+    """
+    return [
+        sum(distance_to_line(cx, cy, line["start"], line["end"]) < zone_px for cx, cy in centroids)
+        for line in lines
+    ]
+
+
+def is_crossing_line(
+    cx: int,
+    cy: int,
+    line_start: Tuple[int, int],
+    line_end: Tuple[int, int],
+    axis: str = "horizontal",
+) -> bool:
+    """
+    Check if the centroid crosses the defined line.
+
+    Args:
+        cx (int): Centroid x-coordinate.
+        cy (int): Centroid y-coordinate.
+        line_start (Tuple[int, int]): Line start coordinates.
+        line_end (Tuple[int, int]): Line end coordinates.
+        axis (str): Line orientation ('horizontal' or 'vertical').
+
+    Returns:
+        bool: True if centroid crosses the line, else False.
+    """
+    if axis == "horizontal":
+        return line_start[0] < cx < line_end[0] and abs(cy - line_start[1]) < 10
+    return line_start[1] < cy < line_end[1] and abs(cx - line_start[0]) < 10
@@ -0,0 +1,209 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+MODES = ("offline", "paced", "live")
+
+
+class ScheduledFrame(NamedTuple):
+    """A frame selected by the scheduler."""
+
+    frame: np.ndarray
+    index: int  # position in the source (frame number)
+    timestamp: float  # capture time in seconds since the start of the source
+    motion_scale: float  # source frames elapsed since the previous processed frame
+
+
+class FrameScheduler:
+    """
+    Chooses which frame to process next.
+
+    Modes:
+        offline  every frame in order (recorded video analysis).
+        paced    treats a file as a camera running at its native fps: frames
+                 that "arrived" while the previous one was being processed
+                 are skipped with cap.grab() and the newest one is decoded.
+                 Use this to test live behaviour with a local file.
+        live     camera / stream: buffered stale frames are drained with
+                 cap.grab() so processing always starts from the newest one.
+
+    Every processed frame has a deadline of one frame period (configurable);
+    lag, drop rate and deadline misses are tracked and logged periodically.
+    """
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        mode: str = "offline",
+        fps: Optional[float] = None,
+        deadline: Optional[float] = None,
+        log_interval: float = 10.0,
+        max_drain: int = 30,
+    ) -> None:
+        """
+        Args:
+            cap (cv2.VideoCapture): Open capture.
+            mode (str): 'offline', 'paced' or 'live'.
+            fps (float | None): Source frame rate; read from the capture if None.
+            deadline (float | None): Per-frame processing budget in seconds
+                (defaults to one frame period).
+            log_interval (float): Seconds between metric log lines (0 disables).
+            max_drain (int): Upper bound on frames grabbed away per call in live mode.
+
+        Raises:
+            ValueError: If `mode` is not one of MODES.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown scheduling mode '{mode}'. Available: {MODES}")
+        self.cap = cap
+        self.mode = mode
+        self.fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.period = 1.0 / self.fps
+        self.deadline = deadline or self.period
+        self.log_interval = log_interval
+        self.max_drain = max_drain
+
+        self.position = max(int(cap.get(cv2.CAP_PROP_POS_FRAMES)), 0)  # next frame to decode
+        self.processed = 0
+        self.dropped = 0
+        self.deadline_misses = 0
+        self._lags = deque(maxlen=1000)
+        self._start: Optional[float] = None
+        self._frame_started: Optional[float] = None
+        self._capture_time = 0.0
+        self._last_timestamp: Optional[float] = None
+        self._last_log = time.monotonic()
+
+    def next_frame(self, image: Optional[np.ndarray] = None) -> Optional[ScheduledFrame]:
+        """
+        Select and decode the next frame to process.
+
+        Args:
+            image (np.ndarray | None): Optional preallocated buffer to decode into. If the
+                decoded frame does not fit it, the frame is a new array instead (pass both
+                to FramePool.fit).
+
+        Returns:
+            ScheduledFrame | None: The frame, or None at the end of the source.
+        """
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now - self.position * self.period
+
+        if self.mode == "paced":
+            ret, frame = self._next_paced(image)
+        elif self.mode == "live":
+            ret, frame = self._next_live(image)
+        else:
+            ret, frame = self._decode(image)
+            self._capture_time = self.position * self.period
+            self.position += 1
+
+        if not ret:
+            return None
+
+        index = self.position - 1
+        timestamp = self._capture_time
+
+        motion_scale = 1.0
+        if self._last_timestamp is not None:
+            motion_scale = max((timestamp - self._last_timestamp) * self.fps, 1.0)
+        self._last_timestamp = timestamp
+
+        self._frame_started = time.monotonic()
+        return ScheduledFrame(frame, index, timestamp, motion_scale)
+
+    def _decode(self, image: Optional[np.ndarray]):
+        return self.cap.read(image=image) if image is not None else self.cap.read()
+
+    def _next_paced(self, image: Optional[np.ndarray]):
+        """Emulate a camera: decode the newest frame that has 'arrived' by now."""
+        due = int((time.monotonic() - self._start) * self.fps)
+        if due < self.position:
+            # Ahead of the camera: wait for the next frame to arrive
+            time.sleep(max(self._start + self.position * self.period - time.monotonic(), 0.0))
+            due = self.position
+
+        while self.position < due:
+            if not self.cap.grab():
+                return False, None
+            self.position += 1
+            self.dropped += 1
+
+        ret, frame = self._decode(image)
+        self._capture_time = self.position * self.period
+        self.position += 1
+        return ret, frame
+
+    def _next_live(self, image: Optional[np.ndarray]):
+        """Drain frames buffered by the driver and decode the first fresh one."""
+        threshold = self.period / 2
+        for attempt in range(self.max_drain + 1):
+            grab_start = time.monotonic()
+            if not self.cap.grab():
+                return False, None
+            self.position += 1
+            waited = time.monotonic() - grab_start
+            # A grab that returns immediately came out of the buffer and is stale
+            if waited >= threshold or attempt == self.max_drain:
+                break
+            self.dropped += 1
+
+        self._capture_time = time.monotonic() - self._start
+        ret, frame = self.cap.retrieve(image=image) if image is not None else self.cap.retrieve()
+        return ret, frame
+
+    def finish_frame(self) -> None:
+        """Mark the current frame as fully processed and update the metrics."""
+        if self._frame_started is None:
+            return
+        now = time.monotonic()
+        self.processed += 1
+        if now - self._frame_started > self.deadline:
+            self.deadline_misses += 1
+        if self.mode != "offline":
+            self._lags.append(now - (self._start + self._capture_time))
+        self._frame_started = None
+
+        if self.log_interval and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            self.log_metrics()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Current scheduling metrics.
+
+        Returns:
+            dict: processed/dropped frame counts, drop rate, deadline misses and
+                lag statistics in milliseconds (over the last 1000 frames).
+        """
+        seen = self.processed + self.dropped
+        lags = np.asarray(self._lags) * 1e3
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "drop_rate": self.dropped / seen if seen else 0.0,
+            "deadline_misses": self.deadline_misses,
+            "lag_ms_mean": float(lags.mean()) if lags.size else 0.0,
+            "lag_ms_p95": float(np.percentile(lags, 95)) if lags.size else 0.0,
+            "lag_ms_max": float(lags.max()) if lags.size else 0.0,
+        }
+
+    def log_metrics(self) -> None:
+        m = self.metrics()
+        logging.info(
+            "Scheduler[%s]: %d processed, %d dropped (%.1f%%), %d deadline misses, "
+            "lag mean %.0f ms / p95 %.0f ms / max %.0f ms",
+            self.mode,
+            m["processed"],
+            m["dropped"],
+            100 * m["drop_rate"],
+            m["deadline_misses"],
+            m["lag_ms_mean"],
+            m["lag_ms_p95"],
+            m["lag_ms_max"],
+        )
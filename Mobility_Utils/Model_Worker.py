@@ -0,0 +1,368 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import selectors
+import signal
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from Mobility_Utils.Detection_Cache import file_digest
+
+# Wire format, both directions: 4-byte big-endian header length, JSON header,
+# then `nbytes` of raw payload (uint8 frames in, float32 detections out).
+_HEADER = struct.Struct(">I")
+DEFAULT_SOCKET = "/tmp/mobility_model.sock"
+
+
+def _recv_exact(conn: socket.socket, size: int) -> Optional[bytearray]:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = conn.recv_into(view[received:])
+        if n == 0:
+            return None
+        received += n
+    return buffer
+
+
+def _recv(conn: socket.socket) -> Tuple[Optional[Dict[str, Any]], Optional[bytearray]]:
+    """Read one message; (None, None) once the peer has closed the connection."""
+    raw_length = _recv_exact(conn, _HEADER.size)
+    if raw_length is None:
+        return None, None
+    header = json.loads(_recv_exact(conn, _HEADER.unpack(raw_length)[0]))
+    payload = _recv_exact(conn, header.get("nbytes", 0)) if header.get("nbytes") else bytearray()
+    if payload is None:
+        raise ConnectionError("Connection closed in the middle of a message")
+    return header, payload
+
+
+def weights_info(path: str) -> Dict[str, Any]:
+    """
+    Identify a weights file by absolute path, size, mtime and content hash.
+
+    Args:
+        path (str): Weights file.
+
+    Returns:
+        dict: `model` (the path), plus `size`, `mtime_ns` and `digest` if it is a regular file.
+    """
+    if not os.path.isfile(path):
+        return {"model": path}
+    stat = os.stat(path)
+    return {
+        "model": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": file_digest(path),
+    }
+
+
+def _send(conn: socket.socket, header: Dict[str, Any], payloads: List[memoryview] = ()) -> None:
+    header = dict(header, nbytes=sum(p.nbytes for p in payloads))
+    encoded = json.dumps(header).encode()
+    conn.sendall(_HEADER.pack(len(encoded)) + encoded)
+    for payload in payloads:
+        conn.sendall(payload)
+
+
+class ModelClient:
+    """
+    Client of a Model_Worker daemon, usable wherever a model is passed to
+    `detect_objects`, `VehicleDetector` or `TiledDetector`.
+
+    Starting a client only opens a socket: the job never imports
+    ultralytics/torch, loads weights or pays the first-prediction warm-up.
+    A client holds one connection and is not thread-safe; create one per
+    thread (TiledDetector's model_loader does this).
+    """
+
+    def __init__(
+        self, socket_path: str = DEFAULT_SOCKET, timeout: Optional[float] = None, model_path: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            socket_path (str): Unix socket the daemon listens on.
+            timeout (float | None): Socket timeout in seconds.
+            model_path (str | None): Weights the caller expects the daemon to serve;
+                see `check_model`. None skips the check.
+
+        Raises:
+            ConnectionError: If no daemon is listening on the socket.
+            ValueError: If the daemon serves other weights than `model_path`.
+        """
+        self.socket_path = socket_path
+        self._conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._conn.settimeout(timeout)
+        try:
+            self._conn.connect(socket_path)
+        except OSError as error:
+            self._conn.close()
+            raise ConnectionError(f"No model worker listening on {socket_path}: {error}") from error
+        header = self._request({"op": "info"})[0]
+        self.names: Dict[int, str] = {int(k): v for k, v in header["names"].items()}
+        self.model_path: Optional[str] = header["model"]
+        self.weights: Dict[str, Any] = {key: header.get(key) for key in ("model", "size", "mtime_ns", "digest")}
+        if model_path is not None:
+            try:
+                self.check_model(model_path)
+            except ValueError:
+                self.close()
+                raise
+
+    def check_model(self, model_path: str) -> None:
+        """
+        Make sure the daemon serves the weights in `model_path`.
+
+        The same file, unchanged since the daemon loaded it, matches without
+        hashing; any other file must have the same content. If `model_path`
+        is not available locally, only the file names can be compared.
+
+        Args:
+            model_path (str): Weights the caller would otherwise load itself.
+
+        Raises:
+            ValueError: If the daemon's weights differ from `model_path`.
+        """
+        served = self.weights
+        if os.path.isfile(model_path):
+            stat = os.stat(model_path)
+            if (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns) == (
+                served["model"],
+                served["size"],
+                served["mtime_ns"],
+            ):
+                return
+            if served["digest"] is not None and file_digest(model_path) == served["digest"]:
+                return
+        elif os.path.basename(model_path) == os.path.basename(served["model"] or ""):
+            return
+        raise ValueError(
+            f"Model worker on {self.socket_path} serves {served['model']!r}, not {model_path!r}; "
+            f"restart it with --model {model_path}"
+        )
+
+    def _request(self, header: Dict[str, Any], payloads: List[memoryview] = ()):
+        _send(self._conn, header, payloads)
+        reply, payload = _recv(self._conn)
+        if reply is None:
+            raise ConnectionError("Model worker closed the connection")
+        if "error" in reply:
+            raise RuntimeError(f"Model worker error: {reply['error']}")
+        return reply, payload
+
+    def predict_boxes(
+        self, source: Union[np.ndarray, List[np.ndarray]], **params
+    ) -> Union[np.ndarray, List[np.ndarray]]:
+        """
+        Detect objects in one frame or a batch of frames.
+
+        Args:
+            source (np.ndarray | List[np.ndarray]): BGR uint8 frame(s).
+            **params: Extra keyword arguments for `model.predict` (JSON-serializable).
+
+        Returns:
+            np.ndarray | List[np.ndarray]: (N, 6) float32 detections
+                [x1, y1, x2, y2, conf, cls] per frame, matching `source`.
+        """
+        frames = source if isinstance(source, list) else [source]
+        frames = [np.ascontiguousarray(frame, dtype=np.uint8) for frame in frames]
+        reply, payload = self._request(
+            {"op": "predict", "shapes": [frame.shape for frame in frames], "params": params},
+            [memoryview(frame).cast("B") for frame in frames],
+        )
+        boxes = np.frombuffer(payload, dtype=np.float32).reshape(-1, 6)
+        per_frame = np.split(boxes, np.cumsum(reply["counts"])[:-1])
+        return per_frame if isinstance(source, list) else per_frame[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _handle(conn: socket.socket, model, weights: Dict[str, Any]) -> bool:
+    """Answer one request; False once the client has closed the connection."""
+    header, payload = _recv(conn)
+    if header is None:
+        return False
+    try:
+        if header["op"] == "info":
+            names = {str(class_id): name for class_id, name in model.names.items()}
+            _send(conn, {"names": names, **weights})
+            return True
+
+        frames, offset = [], 0
+        for shape in header["shapes"]:
+            size = int(np.prod(shape))
+            frames.append(np.frombuffer(payload, dtype=np.uint8, count=size, offset=offset).reshape(shape))
+            offset += size
+        params = {"verbose": False, **header.get("params", {})}
+        results = model.predict(frames if len(frames) > 1 else frames[0], **params)
+        boxes = [
+            result.boxes.data.detach().cpu().numpy().astype(np.float32)
+            if result.boxes is not None else np.empty((0, 6), dtype=np.float32)
+            for result in results
+        ]
+    except Exception as error:
+        logging.exception("Request failed")
+        _send(conn, {"error": str(error)})
+        return True
+    payloads = [memoryview(np.ascontiguousarray(b)).cast("B") for b in boxes if len(b)]
+    _send(conn, {"counts": [len(b) for b in boxes]}, payloads)
+    return True
+
+
+def _serve_forever(listener: socket.socket, model, weights: Dict[str, Any]) -> None:
+    """
+    Serve requests from any number of connections, one request at a time.
+
+    A worker busy predicting is not waiting in select(), so new connections
+    go to idle workers; long-lived clients never block new ones.
+    """
+    listener.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj is listener:
+                try:
+                    conn, _ = listener.accept()
+                except BlockingIOError:
+                    continue  # another worker accepted it first
+                selector.register(conn, selectors.EVENT_READ)
+                continue
+            conn = key.fileobj
+            try:
+                keep_open = _handle(conn, model, weights)
+            except (ConnectionError, OSError) as error:
+                logging.warning("Client connection dropped: %s", error)
+                keep_open = False
+            if not keep_open:
+                selector.unregister(conn)
+                conn.close()
+
+
+def _start_worker(listener: socket.socket, model, threads: Optional[int], weights: Dict[str, Any]) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # Child: shares the parent's model pages copy-on-write
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    status = 0
+    try:
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        _serve_forever(listener, model, weights)
+    except Exception:
+        logging.exception("Worker %d crashed", os.getpid())
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def serve(
+    socket_path: str = DEFAULT_SOCKET,
+    model_path: str = "yolov9c.pt",
+    workers: int = 2,
+    warmup_size: Tuple[int, int] = (640, 640),
+    threads_per_worker: Optional[int] = None,
+) -> None:
+    """
+    Load and warm a model once, then serve detection requests on a Unix socket.
+
+    With `workers` > 1 the process forks after warm-up; every worker accepts
+    connections on the shared listening socket and reads the same weights
+    through copy-on-write pages, so N workers cost about one model of memory.
+    Forking is meant for CPU inference: CUDA cannot be used across fork, so
+    run a single worker (workers=1, no fork) on a GPU.
+
+    Args:
+        socket_path (str): Path of the Unix socket to create.
+        model_path (str): YOLO weights.
+        workers (int): Worker processes (1 serves in this process).
+        warmup_size (Tuple[int, int]): (width, height) of the warm-up frame.
+        threads_per_worker (int | None): Torch threads per worker, e.g. cores / workers.
+    """
+    from Traffic_Counter.Utils.DetectionOfFrames import load_model, warmup_model
+
+    model = load_model(model_path)
+    warmup_model(model, warmup_size, runs=2)
+    # Reported to clients so they can check these are the weights they expect
+    weights = weights_info(getattr(model, "ckpt_path", None) or model_path)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket of a previous daemon
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    listener.listen(64)
+    logging.info("Model worker serving %s on %s with %d worker(s)", model_path, socket_path, workers)
+
+    if workers <= 1:
+        try:
+            _serve_forever(listener, model, weights)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            os.remove(socket_path)
+        return
+
+    # Move everything allocated so far out of the GC's reach, so collections in the
+    # workers do not write to (and thereby copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+
+    children = set()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        children.add(_start_worker(listener, model, threads_per_worker, weights))
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            logging.warning("Worker %d exited (code %d); restarting", pid, os.waitstatus_to_exitcode(status))
+            children.add(_start_worker(listener, model, threads_per_worker, weights))
+
+    listener.close()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Pre-warmed YOLO model worker on a local Unix socket")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--model", default="yolov9c.pt", help="YOLO weights")
+    parser.add_argument("--workers", type=int, default=2, help="Forked worker processes (1 = no fork, GPU)")
+    parser.add_argument("--warmup-size", type=int, nargs=2, default=(640, 640), help="Warm-up frame width height")
+    parser.add_argument("--threads", type=int, default=None, help="Torch threads per worker")
+    args = parser.parse_args()
+    serve(args.socket, args.model, args.workers, tuple(args.warmup_size), args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import cv2
+import numpy as np
+
+_BOUNDARY = "frame"
+_INDEX_PAGE = b"""<!doctype html>
+<html><head><title>%s</title></head>
+<body style="margin:0;background:#111"><img src="/stream" style="max-width:100%%"></body></html>
+"""
+
+
+class PreviewServer:
+    """
+    MJPEG-over-HTTP live preview that replaces cv2.imshow.
+
+    Only the latest annotated frame is kept. The processing loop hands
+    frames over with `publish`, which returns immediately when nobody is
+    watching or when the capped preview rate has not elapsed yet, so the
+    preview never slows the main loop. JPEG encoding happens on the server
+    threads, once per frame, shared by all connected clients.
+
+    Endpoints:
+        /               HTML page embedding the stream
+        /stream         multipart MJPEG stream
+        /snapshot.jpg   single latest frame
+    """
+
+    def __init__(
+        self,
+        port: int = 8080,
+        host: str = "127.0.0.1",
+        max_fps: float = 10.0,
+        quality: int = 70,
+        title: str = "Preview",
+    ) -> None:
+        """
+        Initialize the preview server (call `start` to begin serving).
+
+        Args:
+            port (int): TCP port to listen on.
+            host (str): Interface to bind; keep 127.0.0.1 and tunnel over SSH for remote servers.
+            max_fps (float): Maximum preview frame rate.
+            quality (int): JPEG quality (0–100).
+            title (str): Page title.
+        """
+        self.address = (host, port)
+        self.min_interval = 1.0 / max_fps
+        self.quality = quality
+        self.title = title
+
+        self.clients = 0
+        self._frame: Optional[np.ndarray] = None
+        self._frame_seq = 0
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = -1
+        self._last_publish = 0.0
+        self._condition = threading.Condition()
+        self._encode_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "PreviewServer":
+        """Start serving in a background daemon thread."""
+        self._server = ThreadingHTTPServer(self.address, _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logging.info("Live preview at http://%s:%d/", *self.address)
+        return self
+
+    def publish(self, frame: np.ndarray) -> None:
+        """
+        Offer the latest annotated frame to the preview.
+
+        Cheap no-op when no client is connected or the preview rate cap has
+        not elapsed; otherwise the frame is copied (the caller may reuse its
+        buffer) and older unsent frames are dropped.
+
+        Args:
+            frame (np.ndarray): BGR frame.
+        """
+        if not self.clients:
+            return
+        now = time.monotonic()
+        if now - self._last_publish < self.min_interval:
+            return
+        self._last_publish = now
+
+        snapshot = frame.copy()
+        with self._condition:
+            self._frame = snapshot
+            self._frame_seq += 1
+            self._condition.notify_all()
+
+    def _add_client(self, delta: int) -> None:
+        with self._condition:
+            self.clients += delta
+
+    def _wait_frame(self, after_seq: int, timeout: float = 1.0) -> int:
+        """Block until a frame newer than `after_seq` is available; return its sequence."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame_seq > after_seq, timeout=timeout)
+            return self._frame_seq
+
+    def _encoded(self) -> Optional[bytes]:
+        """JPEG bytes of the latest frame, encoded at most once per frame."""
+        with self._encode_lock:
+            with self._condition:
+                frame, seq = self._frame, self._frame_seq
+            if frame is None:
+                return None
+            if seq != self._jpeg_seq:
+                ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if ok:
+                    self._jpeg, self._jpeg_seq = buffer.tobytes(), seq
+            return self._jpeg
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._condition:
+            self._condition.notify_all()
+
+
+def _make_handler(preview: PreviewServer):
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002 - keep the processing log clean
+            logging.debug("Preview: " + format, *args)
+
+        def do_GET(self):
+            if self.path == "/":
+                body = _INDEX_PAGE % preview.title.encode()
+                self._send(200, "text/html", body)
+            elif self.path == "/snapshot.jpg":
+                self._snapshot()
+            elif self.path == "/stream":
+                self._stream()
+            else:
+                self.send_error(404)
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _snapshot(self):
+            preview._add_client(1)
+            try:
+                preview._wait_frame(0, timeout=2.0)
+                jpeg = preview._encoded()
+            finally:
+                preview._add_client(-1)
+            if jpeg is None:
+                self.send_error(503, "No frame available yet")
+            else:
+                self._send(200, "image/jpeg", jpeg)
+
+        def _stream(self):
+            self.send_response(200)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={_BOUNDARY}")
+            self.end_headers()
+
+            preview._add_client(1)
+            seq = 0
+            try:
+                while preview._server is not None:
+                    new_seq = preview._wait_frame(seq)
+                    if new_seq == seq:
+                        continue
+                    seq = new_seq
+                    jpeg = preview._encoded()
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(
+                        f"--{_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                    )
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                preview._add_client(-1)
+
+    return PreviewHandler
@@ -0,0 +1,219 @@
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Sequence
+
+import numpy as np
+
+MAX_LANES = 8
+
+# One record per processed vision frame
+OBSERVATION_DTYPE = np.dtype(
+    [
+        ("timestamp_ns", "<i8"),  # time.monotonic_ns() when published
+        ("frame_id", "<i8"),
+        ("num_lanes", "<i4"),
+        ("occupancy", "<f4", (MAX_LANES,)),  # normalized 0–1 per lane
+        ("queue", "<i4", (MAX_LANES,)),  # vehicles waiting per lane
+        ("mean_speed", "<f4"),  # km/h, NaN if unknown
+    ],
+    align=True,
+)
+
+# One record per controller decision
+DECISION_DTYPE = np.dtype(
+    [
+        ("timestamp_ns", "<i8"),
+        ("obs_timestamp_ns", "<i8"),
+        ("frame_id", "<i8"),
+        ("phase", "<i4"),
+    ],
+    align=True,
+)
+
+_HEADER_BYTES = 64  # write counter, padded to a cache line
+
+
+class SharedRing:
+    """
+    Single-writer, multi-reader ring buffer of fixed-size records in shared memory.
+
+    Records are NumPy structured values written in place, so no pickling is
+    involved. Each slot carries a sequence number used as a seqlock: the
+    writer marks a slot odd while writing and even once complete, and readers
+    retry if the number changed while they were copying. Neither side ever
+    takes a lock.
+    """
+
+    def __init__(self, name: str, dtype: np.dtype, capacity: int = 256, create: bool = False) -> None:
+        """
+        Create or attach to a ring.
+
+        Args:
+            name (str): Shared memory block name.
+            dtype (np.dtype): Record dtype (e.g. OBSERVATION_DTYPE).
+            capacity (int): Number of slots (only used when creating).
+            create (bool): True for the writer side (replaces a stale block of the
+                same name), False to attach as reader.
+        """
+        self.slot_dtype = np.dtype([("seq", "<u8"), ("record", dtype)], align=True)
+        self.capacity = capacity
+        self.owner = create
+
+        if create:
+            size = _HEADER_BYTES + capacity * self.slot_dtype.itemsize
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Left behind by a writer that crashed before close(); there is only
+                # one writer per ring, so the old block is replaced
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+        else:
+            self.shm = _attach(name)
+            self.capacity = (self.shm.size - _HEADER_BYTES) // self.slot_dtype.itemsize
+
+        self._head = np.ndarray((1,), dtype="<u8", buffer=self.shm.buf, offset=0)
+        self._slots = np.ndarray(
+            (self.capacity,), dtype=self.slot_dtype, buffer=self.shm.buf, offset=_HEADER_BYTES
+        )
+
+    @property
+    def head(self) -> int:
+        """Total number of records published so far."""
+        return int(self._head[0])
+
+    def publish(self, record) -> int:
+        """
+        Write one record (writer side only).
+
+        Args:
+            record: A value of the ring's record dtype, or a tuple in field order.
+
+        Returns:
+            int: Sequence index of the published record.
+        """
+        index = int(self._head[0])
+        slot = self._slots[index % self.capacity : index % self.capacity + 1]
+        slot["seq"] = 2 * index + 1
+        slot["record"] = record
+        slot["seq"] = 2 * index + 2
+        self._head[0] = index + 1
+        return index
+
+    def read(self, index: int) -> Optional[np.void]:
+        """
+        Copy out the record with the given sequence index.
+
+        Returns:
+            np.void | None: The record, or None if it was overwritten or not yet written.
+        """
+        slot = self._slots[index % self.capacity]
+        expected = 2 * index + 2
+        if int(slot["seq"]) != expected:
+            return None
+        record = slot["record"].copy()
+        if int(slot["seq"]) != expected:
+            return None
+        return record
+
+    def latest(self) -> Optional[np.void]:
+        """Return a copy of the newest complete record, or None if the ring is empty."""
+        while True:
+            head = int(self._head[0])
+            if head == 0:
+                return None
+            record = self.read(head - 1)
+            if record is not None:
+                return record
+
+    def wait_next(
+        self, after: int, timeout: float = 1.0, spin: int = 1000, max_sleep: float = 1e-4
+    ) -> Optional[int]:
+        """
+        Wait until a record newer than `after` is available.
+
+        Polls `spin` times first, so back-to-back records are picked up
+        immediately, then sleeps with exponential back-off up to `max_sleep`.
+        A record that arrives while the reader sleeps waits at most
+        `max_sleep` plus timer slack; with the default 100 µs an idle reader
+        uses a few percent of one core.
+
+        Returns:
+            int | None: The new head, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        for _ in range(spin):
+            head = int(self._head[0])
+            if head > after:
+                return head
+        sleep = 1e-5
+        while True:
+            head = int(self._head[0])
+            if head > after:
+                return head
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(sleep, remaining))
+            sleep = min(sleep * 2, max_sleep)
+
+    def close(self) -> None:
+        """Detach from (and, on the writer side, remove) the shared block."""
+        del self._head, self._slots
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process's tracker unlink it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class ObservationPublisher:
+    """
+    Vision-side helper that publishes per-lane traffic observations.
+    """
+
+    def __init__(self, name: str, capacity: int = 256) -> None:
+        self.ring = SharedRing(name, OBSERVATION_DTYPE, capacity=capacity, create=True)
+        self._record = np.zeros((), dtype=OBSERVATION_DTYPE)
+
+    def publish(
+        self,
+        frame_id: int,
+        occupancy: Sequence[float],
+        queue: Sequence[int],
+        mean_speed: float = float("nan"),
+    ) -> None:
+        """
+        Publish one observation.
+
+        Args:
+            frame_id (int): Frame number the observation was computed from.
+            occupancy (Sequence[float]): Normalized occupancy (0–1) per lane.
+            queue (Sequence[int]): Queued vehicle count per lane.
+            mean_speed (float): Mean speed in km/h, NaN when not measured.
+        """
+        num_lanes = min(len(occupancy), MAX_LANES)
+        record = self._record
+        record["occupancy"] = 0
+        record["queue"] = 0
+        record["occupancy"][:num_lanes] = occupancy[:num_lanes]
+        record["queue"][:num_lanes] = queue[:num_lanes]
+        record["num_lanes"] = num_lanes
+        record["frame_id"] = frame_id
+        record["mean_speed"] = mean_speed
+        record["timestamp_ns"] = time.monotonic_ns()
+        self.ring.publish(record)
+
+    def close(self) -> None:
+        self.ring.close()
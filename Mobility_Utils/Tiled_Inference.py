@@ -0,0 +1,281 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MODES = ("batch", "threads")
+MATCH_METRICS = ("iou", "ios")
+EDGE_MARGIN = 2  # px; boxes this close to an inner tile border are treated as cut off
+EXECUTION_KEYS = ("mode", "batch_size", "workers")  # layout keys that do not change detections
+
+
+def layout_key(tiling: Dict[str, Any]) -> Dict[str, Any]:
+    """Tile layout without execution settings, for cache keys."""
+    return {key: value for key, value in tiling.items() if key not in EXECUTION_KEYS}
+
+
+def tile_grid(
+    frame_size: Tuple[int, int],
+    tile_size: Union[int, Tuple[int, int]] = 640,
+    overlap: float = 0.2,
+    region: Optional[Tuple[int, int, int, int]] = None,
+) -> np.ndarray:
+    """
+    Overlapping tiles covering a frame (or a region of it).
+
+    Tiles are spread evenly so the last row/column ends exactly on the region
+    border; neighbouring tiles overlap by at least `overlap` of a tile.
+
+    Args:
+        frame_size (Tuple[int, int]): Frame (width, height).
+        tile_size (int | Tuple[int, int]): Tile (width, height), or one value for square tiles.
+        overlap (float): Minimum overlap between neighbouring tiles, as a fraction of the tile.
+        region (Tuple[int, int, int, int] | None): (x1, y1, x2, y2) area to tile,
+            e.g. the far part of the road. Defaults to the whole frame.
+
+    Returns:
+        np.ndarray: (N, 4) int array of tiles as [x1, y1, x2, y2].
+    """
+    width, height = frame_size
+    tile_w, tile_h = (tile_size, tile_size) if isinstance(tile_size, int) else tile_size
+    rx1, ry1, rx2, ry2 = region or (0, 0, width, height)
+    rx1, ry1 = max(rx1, 0), max(ry1, 0)
+    rx2, ry2 = min(rx2, width), min(ry2, height)
+
+    def starts(start: int, stop: int, size: int) -> np.ndarray:
+        if stop - start <= size:
+            return np.array([start])
+        step = size * (1 - overlap)
+        count = int(np.ceil((stop - start - size) / step)) + 1
+        return np.round(np.linspace(start, stop - size, count)).astype(int)
+
+    xs = starts(rx1, rx2, tile_w)
+    ys = starts(ry1, ry2, tile_h)
+    x1, y1 = np.meshgrid(xs, ys)
+    x1, y1 = x1.ravel(), y1.ravel()
+    return np.stack([x1, y1, np.minimum(x1 + tile_w, rx2), np.minimum(y1 + tile_h, ry2)], axis=1)
+
+
+def merge_detections(
+    detections: np.ndarray,
+    threshold: float = 0.6,
+    metric: str = "ios",
+    truncated: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Class-aware non-maximum suppression over detections from several tiles.
+
+    Pairwise overlaps are computed in one vectorized pass; the greedy keep
+    loop then only visits boxes that overlap another box of their class.
+
+    Args:
+        detections (np.ndarray): (N, 6) rows of [x1, y1, x2, y2, conf, cls] in frame coordinates.
+        threshold (float): Overlap above which the lower-confidence box is dropped.
+        metric (str): 'iou' (intersection over union) or 'ios' (intersection over
+            the smaller box), which also removes partial boxes cut off at a tile border.
+        truncated (np.ndarray | None): Boolean flag per detection for boxes touching
+            an inner tile border; they rank after every complete box, so a partial
+            view never suppresses the complete box of the same vehicle.
+
+    Returns:
+        np.ndarray: Kept detections, complete boxes first, then by confidence.
+
+    Raises:
+        ValueError: If `metric` is not one of MATCH_METRICS.
+    """
+    if metric not in MATCH_METRICS:
+        raise ValueError(f"Unknown match metric '{metric}'. Available: {MATCH_METRICS}")
+    if len(detections) < 2:
+        return detections
+
+    if truncated is None:
+        truncated = np.zeros(len(detections), dtype=bool)
+    dets = detections[np.lexsort((-detections[:, 4], truncated))]
+    x1, y1, x2, y2 = (dets[:, i] for i in range(4))
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    inter_w = np.clip(np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]), 0, None)
+    inter_h = np.clip(np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]), 0, None)
+    inter = inter_w * inter_h
+    if metric == "iou":
+        denominator = areas[:, None] + areas[None, :] - inter
+    else:
+        denominator = np.minimum(areas[:, None], areas[None, :])
+    overlap = inter / np.maximum(denominator, 1e-9)
+
+    # Row i: lower-ranked boxes of the same class that box i would suppress
+    suppresses = np.triu((overlap > threshold) & (dets[:, None, 5] == dets[None, :, 5]), k=1)
+    keep = np.ones(len(dets), dtype=bool)
+    for i in np.flatnonzero(suppresses.any(axis=1)):
+        if keep[i]:
+            keep &= ~suppresses[i]
+    return dets[keep]
+
+
+def _boxes(result) -> np.ndarray:
+    """(N, 6) detections from one ultralytics result."""
+    if result is None or getattr(result, "boxes", None) is None or result.boxes.data is None:
+        return np.empty((0, 6), dtype=np.float32)
+    return result.boxes.data.detach().cpu().numpy()
+
+
+def _predict(model, source, params: Dict[str, Any]) -> list:
+    """Per-image (N, 6) detections from a YOLO model or a Model_Worker client."""
+    if hasattr(model, "predict_boxes"):
+        boxes = model.predict_boxes(source, **params)
+        return boxes if isinstance(source, list) else [boxes]
+    return [_boxes(result) for result in model.predict(source, **params)]
+
+
+class TiledDetector:
+    """
+    Runs a YOLO model on overlapping tiles of a high-resolution frame.
+
+    Downscaling a 4K frame to the model input size makes distant vehicles a
+    few pixels wide. Each tile is instead seen at (close to) native
+    resolution; tiles run as batched predict calls or on a thread pool, and
+    the per-tile boxes are shifted to frame coordinates and merged with
+    class-aware NMS. An optional whole-frame pass keeps large, close
+    vehicles that no single tile contains.
+
+    The tile layout is given per camera, e.g.
+        {"tile_size": 640, "overlap": 0.2, "region": (0, 300, 3840, 1200),
+         "full_frame": True, "mode": "batch", "batch_size": 16}
+    """
+
+    def __init__(
+        self,
+        model,
+        tile_size: Union[int, Tuple[int, int]] = 640,
+        overlap: float = 0.2,
+        region: Optional[Tuple[int, int, int, int]] = None,
+        full_frame: bool = True,
+        mode: str = "batch",
+        batch_size: int = 16,
+        workers: int = 4,
+        model_loader: Optional[Callable[[], Any]] = None,
+        threshold: float = 0.6,
+        metric: str = "ios",
+        predict_params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Args:
+            model (YOLO | ModelClient): Loaded model or Model_Worker client (used in 'batch' mode).
+            tile_size (int | Tuple[int, int]): Tile (width, height) in source pixels.
+            overlap (float): Minimum overlap between neighbouring tiles (fraction).
+            region (Tuple[int, int, int, int] | None): Area to tile; None tiles the whole frame.
+            full_frame (bool): Also run one downscaled pass over the whole frame.
+            mode (str): 'batch' (tiles stacked into predict batches) or 'threads'
+                (one predict per tile on a thread pool, one model per thread).
+            batch_size (int): Tiles per predict call in 'batch' mode.
+            workers (int): Threads in 'threads' mode.
+            model_loader (Callable | None): Builds a model for each worker thread;
+                required in 'threads' mode since a YOLO predictor is not thread-safe.
+            threshold (float): Overlap threshold of the cross-tile merge.
+            metric (str): Overlap metric of the merge, 'ios' or 'iou'.
+            predict_params (dict | None): Extra keyword arguments for `model.predict`.
+
+        Raises:
+            ValueError: On an unknown mode, or 'threads' without a model_loader.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown tiling mode '{mode}'. Available: {MODES}")
+        if mode == "threads" and model_loader is None:
+            raise ValueError("Tiling mode 'threads' needs a model_loader (one model per thread)")
+        self.model = model
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.region = region
+        self.full_frame = full_frame
+        self.mode = mode
+        self.batch_size = batch_size
+        self.threshold = threshold
+        self.metric = metric
+        self.predict_params = dict(predict_params or {})
+        self.predict_params.setdefault("verbose", False)
+
+        self._grids: Dict[Tuple[int, int], np.ndarray] = {}
+        self._local = threading.local()
+        self._model_loader = model_loader
+        self._pool = ThreadPoolExecutor(max_workers=workers) if mode == "threads" else None
+
+    def tiles(self, frame_size: Tuple[int, int]) -> np.ndarray:
+        """Tile grid for a frame (width, height); computed once per size."""
+        if frame_size not in self._grids:
+            self._grids[frame_size] = tile_grid(frame_size, self.tile_size, self.overlap, self.region)
+        return self._grids[frame_size]
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Detect objects over all tiles of a frame.
+
+        Args:
+            frame (np.ndarray): Full-resolution frame.
+
+        Returns:
+            np.ndarray: (N, 6) merged detections [x1, y1, x2, y2, conf, cls] in frame coordinates.
+        """
+        tiles = self.tiles((frame.shape[1], frame.shape[0]))
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+
+        if self.mode == "batch":
+            per_tile = []
+            for start in range(0, len(crops), self.batch_size):
+                per_tile.extend(_predict(self.model, crops[start : start + self.batch_size], self.predict_params))
+        else:
+            per_tile = list(self._pool.map(self._predict_one, crops))
+
+        # Tile edges that are not also an edge of the tiled area cut vehicles in part
+        outer = tiles[:, 0].min(), tiles[:, 1].min(), tiles[:, 2].max(), tiles[:, 3].max()
+        parts, cut = [], []
+        for (x1, y1, x2, y2), boxes in zip(tiles, per_tile):
+            if len(boxes):
+                boxes = boxes.copy()
+                boxes[:, [0, 2]] += x1
+                boxes[:, [1, 3]] += y1
+                parts.append(boxes)
+                cut.append(
+                    ((boxes[:, 0] <= x1 + EDGE_MARGIN) & (x1 > outer[0]))
+                    | ((boxes[:, 1] <= y1 + EDGE_MARGIN) & (y1 > outer[1]))
+                    | ((boxes[:, 2] >= x2 - EDGE_MARGIN) & (x2 < outer[2]))
+                    | ((boxes[:, 3] >= y2 - EDGE_MARGIN) & (y2 < outer[3]))
+                )
+        if self.full_frame:
+            boxes = _predict(self.model, frame, self.predict_params)[0]
+            parts.append(boxes)
+            cut.append(np.zeros(len(boxes), dtype=bool))
+
+        if not parts:
+            return np.empty((0, 6), dtype=np.float32)
+        return merge_detections(np.concatenate(parts), self.threshold, self.metric, np.concatenate(cut))
+
+    def _predict_one(self, crop: np.ndarray) -> np.ndarray:
+        model = getattr(self._local, "model", None)
+        if model is None:
+            model = self._local.model = self._model_loader()
+        return _predict(model, crop, self.predict_params)[0]
+
+    def close(self) -> None:
+        """Stop the worker threads."""
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def scale_detections(detections: np.ndarray, from_size: Sequence[int], to_size: Sequence[int]) -> np.ndarray:
+    """
+    Map detections between frame sizes, e.g. from a 4K source to the working frame.
+
+    Args:
+        detections (np.ndarray): (N, 6) detections.
+        from_size (Sequence[int]): (width, height) the boxes are expressed in.
+        to_size (Sequence[int]): Target (width, height).
+
+    Returns:
+        np.ndarray: Scaled copy of the detections.
+    """
+    scaled = np.array(detections, dtype=np.float32, copy=True)
+    if len(scaled):
+        scaled[:, [0, 2]] *= to_size[0] / from_size[0]
+        scaled[:, [1, 3]] *= to_size[1] / from_size[1]
+    return scaled
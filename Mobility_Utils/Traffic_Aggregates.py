@@ -0,0 +1,411 @@
+import json
+import logging
+import math
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# (name, bucket width in seconds, buckets kept)
+DEFAULT_ROLLUPS = (
+    ("1min", 60, 60),  # last hour
+    ("15min", 900, 96),  # last day
+    ("1h", 3600, 168),  # last week
+)
+DEFAULT_QUANTILES = (0.5, 0.85, 0.95)
+# Labels beyond an aggregator's limits are counted under this name
+OTHER_LABEL = "other"
+
+
+class RecentIds:
+    """
+    Bounded set of recently seen IDs (oldest evicted first).
+
+    Replaces ever-growing sets of track IDs: an ID only needs to be
+    remembered while its track can still cross a line again.
+    """
+
+    def __init__(self, maxlen: int = 10000) -> None:
+        self.maxlen = maxlen
+        self._ids: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, key: Hashable, value: Any = None) -> None:
+        self._ids[key] = value
+        self._ids.move_to_end(key)
+        if len(self._ids) > self.maxlen:
+            self._ids.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self._ids.get(key, default)
+
+    def items(self):
+        return self._ids.items()
+
+    def get_state(self) -> List[Tuple[Hashable, Any]]:
+        """(id, value) pairs, oldest first, for checkpointing."""
+        return list(self._ids.items())
+
+    def set_state(self, state: List[Tuple[Hashable, Any]]) -> None:
+        """Restore pairs returned by `get_state`."""
+        self._ids = OrderedDict(state)
+
+
+class SpeedSketch:
+    """
+    Mergeable quantile sketch with fixed memory (log-spaced histogram).
+
+    Values are binned with a constant relative error `accuracy`, so any
+    quantile is returned within that relative error. Two sketches with the
+    same settings merge by adding their bins. A (..., bins) array of
+    sketches can share one layout, which is how the rollups store them.
+    """
+
+    def __init__(self, accuracy: float = 0.01, min_value: float = 1.0, max_value: float = 400.0) -> None:
+        """
+        Args:
+            accuracy (float): Relative accuracy of the returned quantiles.
+            min_value (float): Values below this fall into the first bin.
+            max_value (float): Values above this fall into the last bin.
+        """
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.bins = int(math.ceil(math.log(max_value / min_value) / self.log_gamma)) + 2
+
+    def index(self, value: float) -> int:
+        """Bin index of a value."""
+        if value <= self.min_value:
+            return 0
+        return min(int(math.ceil(math.log(value / self.min_value) / self.log_gamma)), self.bins - 1)
+
+    def value(self, index: int) -> float:
+        """Representative value of a bin (midpoint in relative terms)."""
+        if index == 0:
+            return self.min_value
+        return self.min_value * 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantiles(self, hist: np.ndarray, qs=DEFAULT_QUANTILES) -> Dict[str, Optional[float]]:
+        """
+        Quantiles from a histogram laid out by this sketch.
+
+        Args:
+            hist (np.ndarray): Bin counts of length `bins`.
+            qs (Sequence[float]): Quantiles in [0, 1].
+
+        Returns:
+            dict: {'p50': value, ...}, values None if the histogram is empty.
+        """
+        total = int(hist.sum())
+        cumulative = np.cumsum(hist)
+        result = {}
+        for q in qs:
+            key = f"p{round(q * 100):d}"
+            if total == 0:
+                result[key] = None
+                continue
+            rank = q * (total - 1)
+            result[key] = round(self.value(int(np.searchsorted(cumulative, rank, side="right"))), 2)
+        return result
+
+
+class TimeRollup:
+    """
+    Ring of fixed-width time buckets; updating the current bucket is O(1).
+    """
+
+    def __init__(
+        self, width: float, num_buckets: int, count_shape: Tuple[int, ...], speed_shape: Tuple[int, ...]
+    ) -> None:
+        self.width = width
+        self.num_buckets = num_buckets
+        self.bucket_ids = np.full(num_buckets, -1, dtype=np.int64)
+        self.counts = np.zeros((num_buckets,) + count_shape, dtype=np.int32)
+        self.speeds = np.zeros((num_buckets,) + speed_shape, dtype=np.uint32)
+
+    def slot(self, timestamp: float) -> Optional[int]:
+        """
+        Slot for a timestamp, recycling the oldest bucket when time moves on.
+
+        Returns:
+            int | None: The slot, or None if the timestamp is older than the retained window.
+        """
+        return self.slot_for_bucket(int(timestamp // self.width))
+
+    def slot_for_bucket(self, bucket_id: int) -> Optional[int]:
+        slot = bucket_id % self.num_buckets
+        current = self.bucket_ids[slot]
+        if current == bucket_id:
+            return slot
+        if current > bucket_id:
+            return None
+        self.bucket_ids[slot] = bucket_id
+        self.counts[slot] = 0
+        self.speeds[slot] = 0
+        return slot
+
+
+class TrafficAggregator:
+    """
+    Streaming per-line, per-class, per-direction counts and speed distributions.
+
+    Counts and speed sketches are kept in 1 min / 15 min / 1 h rollups
+    whose memory is fixed at construction, however long the process runs.
+    Labels are registered on first use up to the configured maxima; any
+    further ones share an extra "other" slot.
+    """
+
+    def __init__(
+        self,
+        max_lines: int = 16,
+        max_classes: int = 32,
+        max_directions: int = 8,
+        rollups=DEFAULT_ROLLUPS,
+        sketch: Optional[SpeedSketch] = None,
+        origin: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            max_lines (int): Maximum number of distinct line names, not counting "other".
+            max_classes (int): Maximum number of distinct class names, not counting "other".
+            max_directions (int): Maximum number of distinct direction names, not counting "other".
+            rollups (Sequence[tuple]): (name, bucket width s, bucket count) per resolution.
+            sketch (SpeedSketch | None): Speed sketch layout.
+            origin (float): Absolute time (epoch seconds) of timestamp 0, added to
+                bucket start times on export.
+        """
+        self.sketch = sketch or SpeedSketch()
+        self.origin = origin
+        self._labels: Dict[str, Dict[str, int]] = {"line": {}, "class": {}, "direction": {}}
+        self._limits = {"line": max_lines, "class": max_classes, "direction": max_directions}
+        # One slot more per label kind, for OTHER_LABEL
+        count_shape = (max_lines + 1, max_classes + 1, max_directions + 1)
+        speed_shape = (max_lines + 1, self.sketch.bins)
+        self.rollups = {
+            name: TimeRollup(width, buckets, count_shape, speed_shape) for name, width, buckets in rollups
+        }
+        self.totals = np.zeros(count_shape, dtype=np.int64)
+        self.speed_totals = np.zeros(speed_shape, dtype=np.uint64)
+
+    def _label(self, kind: str, name: str) -> int:
+        labels = self._labels[kind]
+        if name not in labels:
+            limit = self._limits[kind]
+            if len(labels) < limit:
+                labels[name] = len(labels)
+            else:
+                if OTHER_LABEL not in labels:
+                    logging.warning(
+                        "More than %d %s labels: counting '%s' and any later ones as '%s'",
+                        limit,
+                        kind,
+                        name,
+                        OTHER_LABEL,
+                    )
+                    labels[OTHER_LABEL] = limit
+                return labels[OTHER_LABEL]
+        return labels[name]
+
+    def add_count(self, timestamp: float, line: str, class_name: str, direction: str) -> None:
+        """
+        Record one vehicle crossing.
+
+        Args:
+            timestamp (float): Event time in seconds.
+            line (str): Counting line name.
+            class_name (str): Vehicle class.
+            direction (str): Travel direction.
+        """
+        index = (
+            self._label("line", line),
+            self._label("class", class_name),
+            self._label("direction", direction),
+        )
+        self.totals[index] += 1
+        for rollup in self.rollups.values():
+            slot = rollup.slot(timestamp)
+            if slot is not None:
+                rollup.counts[(slot,) + index] += 1
+
+    def add_speed(self, timestamp: float, line: str, speed_kmh: float) -> None:
+        """
+        Record one speed measurement.
+
+        Args:
+            timestamp (float): Event time in seconds.
+            line (str): Speed segment name.
+            speed_kmh (float): Measured speed.
+        """
+        line_index = self._label("line", line)
+        bin_index = self.sketch.index(speed_kmh)
+        self.speed_totals[line_index, bin_index] += 1
+        for rollup in self.rollups.values():
+            slot = rollup.slot(timestamp)
+            if slot is not None:
+                rollup.speeds[slot, line_index, bin_index] += 1
+
+    def total(self, line: str) -> int:
+        """Total crossings of a line since start."""
+        index = self._labels["line"].get(line)
+        return 0 if index is None else int(self.totals[index].sum())
+
+    def _nested_counts(self, counts: np.ndarray) -> Dict[str, Dict[str, Dict[str, int]]]:
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for line, li in self._labels["line"].items():
+            for class_name, ci in self._labels["class"].items():
+                for direction, di in self._labels["direction"].items():
+                    value = int(counts[li, ci, di])
+                    if value:
+                        result.setdefault(line, {}).setdefault(class_name, {})[direction] = value
+        return result
+
+    def _speed_stats(self, hists: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        return {
+            line: dict(count=int(hists[li].sum()), **self.sketch.quantiles(hists[li]))
+            for line, li in self._labels["line"].items()
+            if hists[li].any()
+        }
+
+    def snapshot(
+        self, rollup_names: Optional[List[str]] = None, now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Export totals and the non-empty buckets of the selected rollups.
+
+        Only buckets inside each rollup's retained window are exported. Slots
+        that were not reused since time moved on still hold older buckets.
+
+        Args:
+            rollup_names (List[str] | None): Rollups to include (default: all).
+            now (float | None): Current timestamp; the window ends at its bucket.
+                Defaults to the newest recorded bucket.
+
+        Returns:
+            dict: JSON-serializable snapshot.
+        """
+        snapshot: Dict[str, Any] = {
+            "origin": self.origin,
+            "totals": self._nested_counts(self.totals),
+            "speeds": self._speed_stats(self.speed_totals),
+            "rollups": {},
+        }
+        for name in list(self.rollups) if rollup_names is None else rollup_names:
+            rollup = self.rollups[name]
+            newest = int(rollup.bucket_ids.max()) if now is None else int(now // rollup.width)
+            buckets = []
+            for slot in np.argsort(rollup.bucket_ids):
+                bucket_id = int(rollup.bucket_ids[slot])
+                if bucket_id < 0 or not newest - rollup.num_buckets < bucket_id <= newest:
+                    continue
+                buckets.append(
+                    {
+                        "start": self.origin + bucket_id * rollup.width,
+                        "counts": self._nested_counts(rollup.counts[slot]),
+                        "speeds": self._speed_stats(rollup.speeds[slot]),
+                    }
+                )
+            snapshot["rollups"][name] = buckets
+        return snapshot
+
+    def _layout(self) -> Dict[str, Any]:
+        return {
+            "limits": dict(self._limits),
+            "bins": self.sketch.bins,
+            "rollups": {name: (rollup.width, rollup.num_buckets) for name, rollup in self.rollups.items()},
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Return a copy of labels, totals and rollup buckets for checkpointing.
+
+        Only the registered labels and the filled buckets are copied, which
+        is a small fraction of the preallocated arrays, so the frame loop
+        can keep recording while the copy is serialized elsewhere.
+        """
+        lines, classes, directions = (len(self._labels[kind]) for kind in ("line", "class", "direction"))
+        rollups = {}
+        for name, rollup in self.rollups.items():
+            slots = np.flatnonzero(rollup.bucket_ids >= 0)
+            rollups[name] = (
+                slots,
+                rollup.bucket_ids[slots],
+                rollup.counts[slots, :lines, :classes, :directions],
+                rollup.speeds[slots, :lines],
+            )
+        return {
+            "layout": self._layout(),
+            "origin": self.origin,
+            "labels": {kind: dict(labels) for kind, labels in self._labels.items()},
+            "totals": self.totals[:lines, :classes, :directions].copy(),
+            "speed_totals": self.speed_totals[:lines].copy(),
+            "rollups": rollups,
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore a state returned by `get_state`.
+
+        Raises:
+            ValueError: If the state was saved with different limits, rollups or sketch.
+        """
+        if state.get("layout") != self._layout():
+            raise ValueError("Aggregator state does not match this aggregator's layout")
+        self.origin = state["origin"]
+        self._labels = {kind: dict(labels) for kind, labels in state["labels"].items()}
+        lines, classes, directions = state["totals"].shape
+        self.totals[...] = 0
+        self.totals[:lines, :classes, :directions] = state["totals"]
+        self.speed_totals[...] = 0
+        self.speed_totals[:lines] = state["speed_totals"]
+        for name, (slots, bucket_ids, counts, speeds) in state["rollups"].items():
+            rollup = self.rollups[name]
+            rollup.bucket_ids[...] = -1
+            rollup.counts[...] = 0
+            rollup.speeds[...] = 0
+            rollup.bucket_ids[slots] = bucket_ids
+            rollup.counts[slots, :lines, :classes, :directions] = counts
+            rollup.speeds[slots, :lines] = speeds
+
+    def export(
+        self, path: str, rollup_names: Optional[List[str]] = None, now: Optional[float] = None
+    ) -> None:
+        """Atomically write `snapshot()` as JSON."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(rollup_names, now), f)
+        os.replace(tmp_path, path)
+
+    def merge(self, other: "TrafficAggregator") -> None:
+        """
+        Add another aggregator's data (e.g. from another camera or worker).
+
+        Both must share rollup layouts and sketch settings; labels are matched by name.
+        """
+        maps = {
+            kind: np.array([self._label(kind, name) for name in other._labels[kind]], dtype=int)
+            for kind in ("line", "class", "direction")
+        }
+        li, ci, di = np.ix_(maps["line"], maps["class"], maps["direction"])
+        n_lines, n_classes, n_dirs = len(maps["line"]), len(maps["class"]), len(maps["direction"])
+
+        # np.add.at, because labels folded into "other" map several of theirs onto one of ours
+        np.add.at(self.totals, (li, ci, di), other.totals[:n_lines, :n_classes, :n_dirs])
+        np.add.at(self.speed_totals, maps["line"], other.speed_totals[:n_lines])
+        for name, rollup in self.rollups.items():
+            theirs = other.rollups[name]
+            for slot in range(theirs.num_buckets):
+                bucket_id = int(theirs.bucket_ids[slot])
+                if bucket_id < 0:
+                    continue
+                mine = rollup.slot_for_bucket(bucket_id)
+                if mine is None:
+                    continue
+                counts = theirs.counts[slot][:n_lines, :n_classes, :n_dirs]
+                np.add.at(rollup.counts[mine], (li, ci, di), counts)
+                np.add.at(rollup.speeds[mine], maps["line"], theirs.speeds[slot][:n_lines])
@@ -0,0 +1,71 @@
+"""
+Configuration for the combined counting + speed pipeline (pipeline_main.py)
+"""
+
+# Input video and YOLO model
+VIDEO_PATH = "./data/Vancouver_Traffic_Intersection.MP4"
+MODEL_PATH = "./models/yolov9c.pt"
+CLASSES_TO_TRACK = ["car", "bus", "truck", "motorcycle"]
+INFERENCE_PARAMS = {}  # extra model.predict arguments; part of the detection cache key
+# Pre-loaded model daemon (python -m Mobility_Utils.Model_Worker --model <MODEL_PATH>); when set,
+# detection is sent to it over this Unix socket and no model is loaded here. None loads locally.
+MODEL_WORKER_SOCKET = None
+
+# Tiled inference for high-resolution cameras (see Mobility_Utils/Tiled_Inference.py); None runs
+# one whole-frame pass. Layout per camera, e.g. tile only the far part of the road and keep a
+# whole-frame pass for close vehicles:
+# {"tile_size": 640, "overlap": 0.2, "region": (0, 300, 3840, 1200), "full_frame": True,
+#  "mode": "batch", "batch_size": 16}   # or "mode": "threads", "workers": 4
+TILING = None
+
+# Frames are resized to this (width, height) before detection; None keeps the native size.
+# All line coordinates below are in this frame size.
+PROCESS_SIZE = None
+
+# Frame scheduling: "offline" processes every frame; "paced" emulates a live camera at the
+# file's native fps (stale frames are skipped); "live" for cameras/streams (VIDEO_PATH may be
+# a device index). FRAME_DEADLINE is the per-frame budget in seconds (None = one frame period).
+SCHEDULE_MODE = "offline"
+FRAME_DEADLINE = None
+
+# Shared per-frame detection cache; None disables it. Only used in "offline" mode and for
+# sources that are regular files (not device indices or stream URLs).
+DETECTION_CACHE_DIR = "./cache/detections"
+
+# Crash-safe checkpoints (resume with `python pipeline_main.py --resume`); None disables them.
+# Not used in "live" mode, where there is nothing to seek back to.
+CHECKPOINT_DIR = "./checkpoints/pipeline"
+CHECKPOINT_EVERY = 1000  # source frames between checkpoints
+
+# Outputs
+OUTPUT_VIDEO = None  # e.g. "output.avi"
+AGGREGATES_PATH = "traffic_aggregates.json"  # rolling counts + speed percentiles; None disables
+AGGREGATES_EXPORT_INTERVAL = 60  # seconds of video time between snapshot exports
+PREVIEW_PORT = 8080  # None disables the live preview
+PREVIEW_MAX_FPS = 10
+
+# RL signal controller bridge (see Signal_Controller.py); None disables publishing. Each line of
+# the line_counter analysers is one lane; mean speed comes from the speed analysers.
+BRIDGE_RING_NAME = None
+BRIDGE_ZONE_PX = 60  # distance from a line within which a vehicle counts as queued
+BRIDGE_LANE_CAPACITY = 20  # queued vehicles that correspond to full occupancy
+
+# Analysers fed by the single detection + tracking pass.
+# Each entry names an analyser type; the remaining keys are its constructor arguments.
+ANALYSERS = [
+    {
+        "type": "line_counter",
+        "lines": {
+            "nb": {"start": (880, 390), "end": (1000, 380), "label": "NB Incoming"},
+            "sb": {"start": (740, 660), "end": (1010, 620), "label": "SB Incoming"},
+            "wb": {"start": (630, 430), "end": (630, 620), "label": "WB Incoming", "axis": "vertical"},
+        },
+    },
+    {
+        "type": "speed",
+        "red_line_y": 720,
+        "blue_line_y": 640,
+        "offset": 6,
+        "distance_m": 200,
+    },
+]
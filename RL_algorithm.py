@@ -1,79 +1,21 @@
-import gym
-from gym import spaces
 import numpy as np
+import argparse
+import bisect
 import time
 
+from RL_checkpoint import checkpoint_mismatches, latest_checkpoint, load_checkpoint, save_checkpoint
 
-# ======================================================
-#  ENVIRONMENT CLASS
-# ======================================================
-class TrafficManagementEnv(gym.Env):
-    """
-    Custom Traffic Management Environment.
-    Simulates a 4-way intersection where each direction has a traffic queue.
-    RL agent controls which lane gets green light.
-    Reward encourages minimizing waiting time & congestion.
-    """
-
-    def __init__(self, num_actions=4, num_observations=6):
-        super(TrafficManagementEnv, self).__init__()
-
-        self.num_actions = num_actions
-        self.num_observations = num_observations
-
-        # Define action and observation spaces
-        # Actions = which direction's light to turn green
-        self.action_space = spaces.Discrete(num_actions)
-        # Observations = normalized traffic densities per lane + avg vehicle speed
-        self.observation_space = spaces.Box(
-            low=0, high=1, shape=(num_observations,), dtype=np.float32
-        )
-
-        # Environment variables
-        self.max_steps = 100
-        self.current_step = 0
-        self.state = None
+STATE_BIN_EDGES = np.linspace(0, 1, 10).tolist()  # bin edges of each observation entry
 
-    def reset(self):
-        """Resets the environment to an initial state."""
-        self.current_step = 0
-        # Random traffic density per lane + avg speed
-        traffic_density = np.random.rand(self.num_observations - 1)
-        avg_speed = np.random.rand(1)  # Normalized speed (0–1)
-        self.state = np.concatenate((traffic_density, avg_speed))
-        return self.state
 
-    def step(self, action):
-        """Applies an action and returns (next_state, reward, done, info)."""
+def __getattr__(name):
+    # TrafficManagementEnv lives in RL_environment now; it is re-exported on first
+    # access so that importing the agent alone does not pull in gym
+    if name == "TrafficManagementEnv":
+        from RL_environment import TrafficManagementEnv
 
-        self.current_step += 1
-
-        # Simulate environment dynamics
-        traffic_density = self.state[:-1]
-        avg_speed = self.state[-1]
-
-        # Action represents which direction's light turns green
-        # Reduce density in that lane (simulate traffic clearing)
-        if 0 <= action < len(traffic_density):
-            traffic_density[action] = max(0, traffic_density[action] - np.random.uniform(0.1, 0.3))
-
-        # Add some random noise (new cars arriving)
-        traffic_density += np.random.uniform(0.01, 0.05, size=traffic_density.shape)
-        traffic_density = np.clip(traffic_density, 0, 1)
-
-        # Update speed (inverse of congestion)
-        avg_speed = 1 - np.mean(traffic_density)
-
-        # Combine new state
-        self.state = np.concatenate((traffic_density, [avg_speed]))
-
-        # Reward: higher for higher avg speed and lower congestion
-        reward = avg_speed - np.mean(traffic_density)
-
-        done = self.current_step >= self.max_steps
-        info = {}
-
-        return self.state, float(reward), done, info
+        return TrafficManagementEnv
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ======================================================
@@ -89,6 +31,7 @@ class QLearningAgent:
         exploration_rate=1.0,
         exploration_decay=0.01,
         min_exploration=0.01,
+        q_table=None,
     ):
         self.num_states = num_states
         self.num_actions = num_actions
@@ -100,13 +43,65 @@ class QLearningAgent:
 
         # Initialize Q-table
         # We’ll discretize states for simplicity
-        self.q_table = np.zeros((10 ** num_states, num_actions))
+        if q_table is None:
+            q_table = np.zeros((10 ** num_states, num_actions))
+        self.q_table = q_table
+
+    @classmethod
+    def from_checkpoint(cls, path, mmap_mode="r"):
+        """
+        Build an agent from a saved checkpoint.
+
+        Args:
+            path (str): Checkpoint directory or checkpoint root.
+            mmap_mode (str | None): 'r' to share the Q-table read-only between
+                processes, 'c' for a private copy-on-write view.
+
+        Returns:
+            QLearningAgent: Agent backed by the checkpointed Q-table.
+        """
+        ckpt = load_checkpoint(path, mmap_mode=mmap_mode)
+        agent = cls(
+            ckpt["num_states"],
+            ckpt["num_actions"],
+            learning_rate=ckpt["learning_rate"],
+            discount_factor=ckpt["discount_factor"],
+            exploration_rate=ckpt["epsilon"],
+            exploration_decay=ckpt["exploration_decay"],
+            min_exploration=ckpt["min_exploration"],
+            q_table=ckpt["q_table"],
+        )
+        return agent
 
     def _discretize_state(self, state):
         """Convert continuous observation into discrete index."""
         bins = np.digitize(state, np.linspace(0, 1, 10)) - 1
         return int("".join(map(str, bins)))
 
+    def _discretize_states(self, states):
+        """Vectorized `_discretize_state` for a (batch, num_states) array."""
+        bins = np.digitize(states, np.linspace(0, 1, 10)) - 1
+        place_values = 10 ** np.arange(states.shape[1] - 1, -1, -1, dtype=np.int64)
+        return bins.astype(np.int64) @ place_values
+
+    def greedy_actions(self, states):
+        """Greedy action for every row of a (batch, num_states) array."""
+        return np.argmax(self.q_table[self._discretize_states(states)], axis=1)
+
+    def greedy_action(self, state):
+        """
+        Greedy action for a single state, same result as `greedy_actions`.
+
+        Plain Python instead of a chain of small NumPy calls: this is the
+        signal controller's per-decision path, and after an idle wait each
+        NumPy call costs far more than the arithmetic it does.
+        """
+        index = 0
+        for value in np.asarray(state, dtype=float).tolist():
+            index = index * 10 + bisect.bisect_right(STATE_BIN_EDGES, value) - 1
+        row = self.q_table[index].tolist()
+        return row.index(max(row))
+
     def choose_action(self, state):
         """Epsilon-greedy strategy."""
         state_idx = self._discretize_state(state)
@@ -131,12 +126,49 @@ class QLearningAgent:
 # ======================================================
 #  TRAINING FUNCTION
 # ======================================================
-def train(env, agent, num_episodes=1000, max_steps=100):
+def train(
+    env,
+    agent,
+    num_episodes=1000,
+    max_steps=100,
+    checkpoint_dir=None,
+    checkpoint_every=100,
+    resume=False,
+):
+    """
+    Train the agent, optionally checkpointing every `checkpoint_every` episodes.
+
+    With `resume=True` the Q-table, epsilon, RNG state, reward history and
+    episode counter are restored from the latest checkpoint in `checkpoint_dir`.
+    A checkpoint is always written when training ends; `checkpoint_every`
+    of 0 or None disables the periodic ones.
+
+    Raises:
+        ValueError: If `checkpoint_every` is negative, or the checkpoint to
+            resume from was written with other hyperparameters or table shape.
+    """
+    if checkpoint_every is not None and checkpoint_every < 0:
+        raise ValueError(f"checkpoint_every must be >= 0, got {checkpoint_every}")
     total_rewards = []
+    start_episode = 0
+
+    if resume and checkpoint_dir and latest_checkpoint(checkpoint_dir):
+        ckpt = load_checkpoint(checkpoint_dir, mmap_mode="c")
+        mismatches = checkpoint_mismatches(ckpt, agent)
+        if mismatches:
+            raise ValueError(
+                f"Cannot resume from {ckpt['path']}; it differs from this run in: " + ", ".join(mismatches)
+            )
+        agent.q_table = ckpt["q_table"]
+        agent.epsilon = ckpt["epsilon"]
+        np.random.set_state(ckpt["rng_state"])
+        total_rewards = ckpt["rewards"]
+        start_episode = ckpt["episode"]
+        print(f"Resumed from {ckpt['path']} at episode {start_episode}")
 
     start_time = time.time()
 
-    for episode in range(num_episodes):
+    for episode in range(start_episode, num_episodes):
         state = env.reset()
         total_reward = 0
 
@@ -157,6 +189,13 @@ def train(env, agent, num_episodes=1000, max_steps=100):
         if (episode + 1) % 100 == 0:
             print(f"Episode {episode+1}/{num_episodes} | Total Reward: {total_reward:.3f}")
 
+        if checkpoint_dir and checkpoint_every and (episode + 1) % checkpoint_every == 0:
+            save_checkpoint(checkpoint_dir, agent, episode + 1, total_rewards)
+
+    already_saved = checkpoint_every and num_episodes % checkpoint_every == 0
+    if checkpoint_dir and num_episodes > start_episode and not already_saved:
+        save_checkpoint(checkpoint_dir, agent, num_episodes, total_rewards)
+
     end_time = time.time()
     print(f"\nTraining completed in {end_time - start_time:.2f} seconds")
     return total_rewards
@@ -181,21 +220,151 @@ def evaluate(env, agent, episodes=100, max_steps=100):
     return avg_reward
 
 
+# ======================================================
+#  BATCHED EVALUATION
+# ======================================================
+def evaluate_batched(env, agent, episodes=10000, max_steps=100, batch_size=1024, seed=None):
+    """
+    Greedy evaluation that rolls out `batch_size` episodes at once.
+
+    State indexing and action selection are vectorized over the batch, so
+    thousands of episodes take about as long as a handful with `evaluate`.
+    Uses its own generator and leaves the global NumPy RNG untouched.
+
+    Args:
+        env (TrafficManagementEnv): Environment providing the batched dynamics.
+        agent (QLearningAgent): Trained agent (its Q-table may be memory-mapped).
+        episodes (int): Total number of episodes.
+        max_steps (int): Step limit per episode.
+        batch_size (int): Episodes simulated in parallel.
+        seed (int | None): Seed for reproducible regression checks.
+
+    Returns:
+        dict: Reward mean, std and 95% confidence interval, per-lane queue
+            statistics, episode count and wall time in seconds.
+    """
+    rng = np.random.default_rng(seed)
+    steps = min(max_steps, env.max_steps)
+    num_lanes = env.num_observations - 1
+
+    episode_rewards = np.empty(episodes)
+    lane_sum = np.zeros(num_lanes)
+    lane_sq_sum = np.zeros(num_lanes)
+    lane_max = np.zeros(num_lanes)
+    lane_samples = 0
+
+    start_time = time.perf_counter()
+    for start in range(0, episodes, batch_size):
+        size = min(batch_size, episodes - start)
+        states = env.reset_batch(size, rng)
+        rewards = np.zeros(size)
+
+        for _ in range(steps):
+            actions = agent.greedy_actions(states)
+            states, step_rewards = env.step_batch(states, actions, rng)
+            rewards += step_rewards
+
+            queues = states[:, :-1]
+            lane_sum += queues.sum(axis=0)
+            lane_sq_sum += np.square(queues).sum(axis=0)
+            np.maximum(lane_max, queues.max(axis=0), out=lane_max)
+            lane_samples += size
+
+        episode_rewards[start:start + size] = rewards
+    wall_time = time.perf_counter() - start_time
+
+    mean = float(episode_rewards.mean())
+    std = float(episode_rewards.std(ddof=1)) if episodes > 1 else 0.0
+    half_width = float(1.96 * std / np.sqrt(episodes))
+    lane_mean = lane_sum / max(lane_samples, 1)
+    lane_std = np.sqrt(np.maximum(lane_sq_sum / max(lane_samples, 1) - lane_mean ** 2, 0))
+
+    return {
+        "episodes": episodes,
+        "reward_mean": mean,
+        "reward_std": std,
+        "reward_ci95": (mean - half_width, mean + half_width),
+        "lane_queue_mean": lane_mean.tolist(),
+        "lane_queue_std": lane_std.tolist(),
+        "lane_queue_max": lane_max.tolist(),
+        "wall_time": wall_time,
+    }
+
+
 # ======================================================
 #  MAIN EXECUTION
 # ======================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Q-learning traffic signal controller")
+    parser.add_argument("--episodes", type=int, default=500, help="Training episodes")
+    parser.add_argument("--checkpoint-dir", default=None, help="Directory for checkpoints")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=100, help="Episodes between checkpoints (0: only at the end)"
+    )
+    parser.add_argument("--resume", action="store_true", help="Resume from the latest checkpoint")
+    parser.add_argument(
+        "--evaluate-only", action="store_true", help="Skip training and evaluate the latest checkpoint"
+    )
+    parser.add_argument("--eval-episodes", type=int, default=10000, help="Episodes for batched evaluation")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for batched evaluation")
+    parser.add_argument(
+        "--min-reward",
+        type=float,
+        default=None,
+        help="Exit non-zero if the lower 95%% CI bound of the evaluation reward is below this",
+    )
+    return parser.parse_args()
+
+
+def report_evaluation(stats, min_reward=None):
+    """Print batched evaluation results and apply the optional regression threshold."""
+    low, high = stats["reward_ci95"]
+    print(
+        f"\nAverage Evaluation Reward: {stats['reward_mean']:.3f} "
+        f"(95% CI {low:.3f}–{high:.3f}, {stats['episodes']} episodes, {stats['wall_time']:.2f}s)"
+    )
+    for lane, (mean, peak) in enumerate(zip(stats["lane_queue_mean"], stats["lane_queue_max"])):
+        print(f"  Lane {lane}: mean queue {mean:.3f} | max {peak:.3f}")
+
+    if min_reward is not None and low < min_reward:
+        raise SystemExit(f"Regression: reward CI lower bound {low:.3f} < {min_reward:.3f}")
+
+
 def main():
+    args = parse_args()
     num_actions = 4
     num_observations = 6
 
+    # Imported here so that importing the agent (Signal_Controller.py) does not pull in gym
+    from RL_environment import TrafficManagementEnv
+
     env = TrafficManagementEnv(num_actions=num_actions, num_observations=num_observations)
+
+    if args.evaluate_only:
+        if not args.checkpoint_dir:
+            raise SystemExit("--evaluate-only requires --checkpoint-dir")
+        agent = QLearningAgent.from_checkpoint(args.checkpoint_dir, mmap_mode="r")
+        print("\n🏁 Evaluating checkpointed agent...")
+        stats = evaluate_batched(env, agent, episodes=args.eval_episodes, seed=args.seed)
+        report_evaluation(stats, args.min_reward)
+        return
+
     agent = QLearningAgent(num_states=num_observations, num_actions=num_actions)
 
     print("🚦 Starting training...")
-    train(env, agent, num_episodes=500, max_steps=100)
+    train(
+        env,
+        agent,
+        num_episodes=args.episodes,
+        max_steps=100,
+        checkpoint_dir=args.checkpoint_dir,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+    )
 
     print("\n🏁 Evaluating trained agent...")
-    evaluate(env, agent, episodes=100, max_steps=100)
+    stats = evaluate_batched(env, agent, episodes=args.eval_episodes, seed=args.seed)
+    report_evaluation(stats, args.min_reward)
 
 
 if __name__ == "__main__":
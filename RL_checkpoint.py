@@ -0,0 +1,242 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+# ======================================================
+#  CHECKPOINT LAYOUT
+# ======================================================
+# <checkpoint_dir>/
+#     LATEST                  -> name of the newest complete checkpoint
+#     ep_000500/
+#         q_table.npy         -> agent Q-table (memory-mappable)
+#         rewards.npy         -> per-episode total reward history
+#         rng_keys.npy        -> global NumPy MT19937 key vector
+#         state.json          -> epsilon, episode counter, write sequence, hyperparameters, RNG scalars
+#
+# A checkpoint is first written into a hidden temporary directory and only
+# renamed into place once every file has been flushed, so readers never see
+# a half-written checkpoint. LATEST is swapped with os.replace afterwards.
+# Checkpoints are pruned by write sequence, not by name: a fresh run may start
+# over at a lower episode next to checkpoints left behind by an earlier run.
+
+LATEST_FILE = "LATEST"
+STATE_FILE = "state.json"
+Q_TABLE_FILE = "q_table.npy"
+REWARDS_FILE = "rewards.npy"
+RNG_KEYS_FILE = "rng_keys.npy"
+
+
+def _fsync_dir(path):
+    """Flush a directory entry to disk (no-op where unsupported)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _save_array(path, array):
+    """Write an array as .npy and flush it to disk."""
+    with open(path, "wb") as f:
+        np.save(f, np.asarray(array))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def latest_checkpoint(checkpoint_dir):
+    """
+    Return the path of the newest complete checkpoint.
+
+    Args:
+        checkpoint_dir (str): Directory holding the checkpoints.
+
+    Returns:
+        str | None: Path of the checkpoint, or None if there is none.
+    """
+    pointer = os.path.join(checkpoint_dir, LATEST_FILE)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, "r") as f:
+        name = f.read().strip()
+    path = os.path.join(checkpoint_dir, name)
+    return path if os.path.isdir(path) else None
+
+
+def _checkpoint_names(checkpoint_dir):
+    return [
+        entry for entry in os.listdir(checkpoint_dir)
+        if entry.startswith("ep_") and os.path.isdir(os.path.join(checkpoint_dir, entry))
+    ]
+
+
+def _sequence(path):
+    """Write sequence of a checkpoint (-1 if unreadable or written before it was recorded)."""
+    try:
+        with open(os.path.join(path, STATE_FILE), "r") as f:
+            return int(json.load(f).get("sequence", -1))
+    except (OSError, ValueError):
+        return -1
+
+
+def save_checkpoint(checkpoint_dir, agent, episode, rewards, keep=2):
+    """
+    Atomically write a checkpoint of the agent and training progress.
+
+    Args:
+        checkpoint_dir (str): Directory holding the checkpoints.
+        agent (QLearningAgent): Agent whose table and epsilon are stored.
+        episode (int): Number of completed episodes.
+        rewards (list[float]): Per-episode total rewards so far.
+        keep (int): Number of most recent checkpoints to retain.
+
+    Returns:
+        str: Path of the written checkpoint.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    name = f"ep_{episode:06d}"
+    final_path = os.path.join(checkpoint_dir, name)
+    tmp_path = tempfile.mkdtemp(prefix=f".{name}.", dir=checkpoint_dir)
+    sequence = 1 + max(
+        (_sequence(os.path.join(checkpoint_dir, entry)) for entry in _checkpoint_names(checkpoint_dir)),
+        default=-1,
+    )
+
+    try:
+        _save_array(os.path.join(tmp_path, Q_TABLE_FILE), agent.q_table)
+        _save_array(os.path.join(tmp_path, REWARDS_FILE), np.asarray(rewards, dtype=np.float64))
+
+        rng_name, rng_keys, rng_pos, has_gauss, cached_gaussian = np.random.get_state()
+        _save_array(os.path.join(tmp_path, RNG_KEYS_FILE), rng_keys)
+
+        state = {
+            "episode": int(episode),
+            "sequence": sequence,
+            "epsilon": float(agent.epsilon),
+            "num_states": int(agent.num_states),
+            "num_actions": int(agent.num_actions),
+            "learning_rate": float(agent.lr),
+            "discount_factor": float(agent.gamma),
+            "exploration_decay": float(agent.decay),
+            "min_exploration": float(agent.min_epsilon),
+            "rng": {
+                "name": rng_name,
+                "pos": int(rng_pos),
+                "has_gauss": int(has_gauss),
+                "cached_gaussian": float(cached_gaussian),
+            },
+        }
+        with open(os.path.join(tmp_path, STATE_FILE), "w") as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_dir(tmp_path)
+
+        if os.path.exists(final_path):
+            shutil.rmtree(final_path)
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    # Point LATEST at the new checkpoint only once it is fully in place
+    pointer_tmp = os.path.join(checkpoint_dir, f".{LATEST_FILE}.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(checkpoint_dir, LATEST_FILE))
+    _fsync_dir(checkpoint_dir)
+
+    _prune_checkpoints(checkpoint_dir, keep)
+    return final_path
+
+
+def _prune_checkpoints(checkpoint_dir, keep):
+    """Delete all but the `keep` most recently written checkpoints, never the LATEST one."""
+    latest = latest_checkpoint(checkpoint_dir)
+    names = sorted(
+        _checkpoint_names(checkpoint_dir),
+        key=lambda entry: (_sequence(os.path.join(checkpoint_dir, entry)), entry),
+    )
+    for name in names[:-max(keep, 1)]:
+        path = os.path.join(checkpoint_dir, name)
+        if latest is not None and os.path.samefile(path, latest):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def checkpoint_mismatches(ckpt, agent):
+    """
+    Compare a loaded checkpoint with the agent it would be resumed into.
+
+    Args:
+        ckpt (dict): Output of `load_checkpoint`.
+        agent (QLearningAgent): Agent of the current run.
+
+    Returns:
+        list[str]: "<field>: checkpoint=<value>, current=<value>" for every
+            hyperparameter or Q-table shape that differs; empty if compatible.
+    """
+    current = {
+        "num_states": int(agent.num_states),
+        "num_actions": int(agent.num_actions),
+        "learning_rate": float(agent.lr),
+        "discount_factor": float(agent.gamma),
+        "exploration_decay": float(agent.decay),
+        "min_exploration": float(agent.min_epsilon),
+        "q_table_shape": tuple(agent.q_table.shape),
+    }
+    stored = {key: ckpt[key] for key in current if key != "q_table_shape"}
+    stored["q_table_shape"] = tuple(ckpt["q_table"].shape)
+    return [
+        f"{key}: checkpoint={stored[key]}, current={current[key]}"
+        for key in current
+        if stored[key] != current[key]
+    ]
+
+
+def load_checkpoint(path, mmap_mode="r"):
+    """
+    Load a checkpoint without copying the Q-table into process memory.
+
+    The Q-table is returned as a memory map, so several evaluation workers
+    opening the same checkpoint share one copy through the OS page cache.
+
+    Args:
+        path (str): A checkpoint directory, or a checkpoint root (LATEST is followed).
+        mmap_mode (str | None): 'r' for shared read-only access, 'c' for
+            copy-on-write (resume training), None to load into memory.
+
+    Returns:
+        dict: 'q_table', 'rewards', 'rng_state' and the fields of state.json.
+
+    Raises:
+        FileNotFoundError: If no complete checkpoint exists at the path.
+    """
+    if not os.path.exists(os.path.join(path, STATE_FILE)):
+        resolved = latest_checkpoint(path)
+        if resolved is None:
+            raise FileNotFoundError(f"No checkpoint found in {path}")
+        path = resolved
+
+    with open(os.path.join(path, STATE_FILE), "r") as f:
+        state = json.load(f)
+
+    rng = state.pop("rng")
+    rng_keys = np.load(os.path.join(path, RNG_KEYS_FILE))
+    state["rng_state"] = (
+        rng["name"], rng_keys, rng["pos"], rng["has_gauss"], rng["cached_gaussian"]
+    )
+    state["q_table"] = np.load(os.path.join(path, Q_TABLE_FILE), mmap_mode=mmap_mode)
+    state["rewards"] = np.load(os.path.join(path, REWARDS_FILE)).tolist()
+    state["path"] = path
+    return state
@@ -0,0 +1,121 @@
+import gym
+from gym import spaces
+import numpy as np
+
+
+# ======================================================
+#  ENVIRONMENT CLASS
+# ======================================================
+class TrafficManagementEnv(gym.Env):
+    """
+    Custom Traffic Management Environment.
+    Simulates a 4-way intersection where each direction has a traffic queue.
+    RL agent controls which lane gets green light.
+    Reward encourages minimizing waiting time & congestion.
+    """
+
+    def __init__(self, num_actions=4, num_observations=6):
+        super(TrafficManagementEnv, self).__init__()
+
+        self.num_actions = num_actions
+        self.num_observations = num_observations
+
+        # Define action and observation spaces
+        # Actions = which direction's light to turn green
+        self.action_space = spaces.Discrete(num_actions)
+        # Observations = normalized traffic densities per lane + avg vehicle speed
+        self.observation_space = spaces.Box(
+            low=0, high=1, shape=(num_observations,), dtype=np.float32
+        )
+
+        # Environment variables
+        self.max_steps = 100
+        self.current_step = 0
+        self.state = None
+
+    def reset(self):
+        """Resets the environment to an initial state."""
+        self.current_step = 0
+        # Random traffic density per lane + avg speed
+        traffic_density = np.random.rand(self.num_observations - 1)
+        avg_speed = np.random.rand(1)  # Normalized speed (0–1)
+        self.state = np.concatenate((traffic_density, avg_speed))
+        return self.state
+
+    def step(self, action):
+        """Applies an action and returns (next_state, reward, done, info)."""
+
+        self.current_step += 1
+
+        # Simulate environment dynamics
+        traffic_density = self.state[:-1]
+        avg_speed = self.state[-1]
+
+        # Action represents which direction's light turns green
+        # Reduce density in that lane (simulate traffic clearing)
+        if 0 <= action < len(traffic_density):
+            traffic_density[action] = max(0, traffic_density[action] - np.random.uniform(0.1, 0.3))
+
+        # Add some random noise (new cars arriving)
+        traffic_density += np.random.uniform(0.01, 0.05, size=traffic_density.shape)
+        traffic_density = np.clip(traffic_density, 0, 1)
+
+        # Update speed (inverse of congestion)
+        avg_speed = 1 - np.mean(traffic_density)
+
+        # Combine new state
+        self.state = np.concatenate((traffic_density, [avg_speed]))
+
+        # Reward: higher for higher avg speed and lower congestion
+        reward = avg_speed - np.mean(traffic_density)
+
+        done = self.current_step >= self.max_steps
+        info = {}
+
+        return self.state, float(reward), done, info
+
+    def reset_batch(self, batch_size, rng=None):
+        """
+        Vectorized `reset` for `batch_size` independent episodes.
+
+        Args:
+            batch_size (int): Number of parallel episodes.
+            rng (np.random.Generator | None): Random source (defaults to a fresh generator).
+
+        Returns:
+            np.ndarray: States of shape (batch_size, num_observations).
+        """
+        rng = rng or np.random.default_rng()
+        return rng.random((batch_size, self.num_observations))
+
+    def step_batch(self, states, actions, rng=None):
+        """
+        Vectorized `step` with the same dynamics, applied to every row at once.
+
+        Args:
+            states (np.ndarray): Current states, shape (batch_size, num_observations).
+            actions (np.ndarray): One action per row.
+            rng (np.random.Generator | None): Random source.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Next states and per-row rewards.
+        """
+        rng = rng or np.random.default_rng()
+        batch_size = states.shape[0]
+        traffic_density = states[:, :-1].copy()
+        num_lanes = traffic_density.shape[1]
+
+        rows = np.arange(batch_size)
+        valid = (actions >= 0) & (actions < num_lanes)
+        rows, lanes = rows[valid], actions[valid]
+        cleared = traffic_density[rows, lanes] - rng.uniform(0.1, 0.3, size=rows.shape[0])
+        traffic_density[rows, lanes] = np.maximum(0, cleared)
+
+        traffic_density += rng.uniform(0.01, 0.05, size=traffic_density.shape)
+        np.clip(traffic_density, 0, 1, out=traffic_density)
+
+        mean_density = traffic_density.mean(axis=1)
+        avg_speed = 1 - mean_density
+        next_states = np.concatenate((traffic_density, avg_speed[:, None]), axis=1)
+        rewards = avg_speed - mean_density
+        return next_states, rewards
@@ -0,0 +1,212 @@
+import argparse
+import math
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from Mobility_Utils.Shared_Ring import (
+    DECISION_DTYPE,
+    OBSERVATION_DTYPE,
+    ObservationPublisher,
+    SharedRing,
+)
+from RL_algorithm import QLearningAgent
+
+
+# ======================================================
+#  OBSERVATION MAPPING
+# ======================================================
+def build_observation(record, num_observations=6, speed_limit_kmh=50.0):
+    """
+    Convert a vision record into the observation layout used by TrafficManagementEnv.
+
+    Lane occupancies fill the first `num_observations - 1` entries (padded
+    with zeros); the last entry is the normalized average speed. When the
+    vision side did not measure speed it falls back to 1 - mean density,
+    matching the environment dynamics.
+
+    Args:
+        record (np.void): A record of OBSERVATION_DTYPE.
+        num_observations (int): Observation size expected by the agent.
+        speed_limit_kmh (float): Speed mapped to 1.0.
+
+    Returns:
+        np.ndarray: Observation vector in [0, 1].
+    """
+    # Plain Python on a handful of values: this runs once per decision, right
+    # after an idle wait, where every small NumPy call is expensive
+    num_lanes = num_observations - 1
+    available = min(int(record["num_lanes"]), num_lanes)
+    density = [min(max(value, 0.0), 1.0) for value in record["occupancy"][:available].tolist()]
+    density += [0.0] * (num_lanes - available)
+
+    speed = float(record["mean_speed"])
+    if math.isnan(speed):
+        avg_speed = 1 - sum(density) / num_lanes
+    else:
+        avg_speed = min(max(speed / speed_limit_kmh, 0.0), 1.0)
+    return np.array(density + [avg_speed])
+
+
+# ======================================================
+#  CONTROLLER LOOP
+# ======================================================
+def run_controller(
+    agent,
+    obs_ring,
+    decision_ring=None,
+    num_observations=6,
+    duration=None,
+    max_decisions=None,
+    idle_timeout=5.0,
+    verbose=True,
+):
+    """
+    Read the latest observation, pick a phase greedily and publish the decision.
+
+    Intermediate observations that arrive while a decision is being made
+    are skipped: the controller always acts on the newest one.
+
+    Args:
+        agent (QLearningAgent): Trained agent.
+        obs_ring (SharedRing): Ring of OBSERVATION_DTYPE records.
+        decision_ring (SharedRing | None): Ring of DECISION_DTYPE records to write to.
+        num_observations (int): Observation size expected by the agent.
+        duration (float | None): Stop after this many seconds.
+        max_decisions (int | None): Stop after this many decisions.
+        idle_timeout (float): Stop if no observation arrives for this long.
+        verbose (bool): Print phase changes.
+
+    Returns:
+        np.ndarray: Observation-to-decision latencies in microseconds.
+    """
+    latencies = []
+    decision = np.zeros((), dtype=DECISION_DTYPE)
+    seen = obs_ring.head
+    phase = None
+    stop_at = time.monotonic() + duration if duration else None
+
+    while stop_at is None or time.monotonic() < stop_at:
+        head = obs_ring.wait_next(seen, timeout=idle_timeout)
+        if head is None:
+            break
+        seen = head
+        record = obs_ring.latest()
+        if record is None:
+            continue
+
+        observation = build_observation(record, num_observations)
+        action = agent.greedy_action(observation)
+
+        now = time.monotonic_ns()
+        if decision_ring is not None:
+            decision["timestamp_ns"] = now
+            decision["obs_timestamp_ns"] = record["timestamp_ns"]
+            decision["frame_id"] = record["frame_id"]
+            decision["phase"] = action
+            decision_ring.publish(decision)
+        latencies.append((now - int(record["timestamp_ns"])) / 1e3)
+
+        if verbose and action != phase:
+            phase = action
+            print(f"Frame {int(record['frame_id'])}: green → lane {action}")
+
+        if max_decisions and len(latencies) >= max_decisions:
+            break
+
+    return np.asarray(latencies)
+
+
+# ======================================================
+#  SYNTHETIC PUBLISHER
+# ======================================================
+def synthetic_publisher(ring_name, rate_hz, count, num_lanes, ready):
+    """Publish random lane observations at `rate_hz` to benchmark the bridge."""
+    publisher = ObservationPublisher(ring_name)
+    ready.set()
+    rng = np.random.default_rng(0)
+    interval = 1.0 / rate_hz
+    next_time = time.monotonic()
+    try:
+        for frame_id in range(count):
+            occupancy = rng.random(num_lanes)
+            queue = (occupancy * 20).astype(int)
+            publisher.publish(frame_id, occupancy, queue)
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        # Keep the block alive until the controller has drained it
+        time.sleep(1.0)
+    finally:
+        publisher.close()
+
+
+def report_latency(latencies):
+    if latencies.size == 0:
+        print("No decisions were made.")
+        return
+    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9])
+    print(
+        f"\n{latencies.size} decisions | latency p50 {p50:.1f} µs | p99 {p99:.1f} µs | "
+        f"p99.9 {p999:.1f} µs | max {latencies.max():.1f} µs"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="RL signal controller fed by the vision bridge")
+    parser.add_argument("--checkpoint-dir", help="Checkpoint of a trained QLearningAgent")
+    parser.add_argument("--ring-name", default="smart_mobility_obs", help="Observation ring name")
+    parser.add_argument("--decision-ring", default="smart_mobility_phase", help="Decision ring name")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run")
+    parser.add_argument(
+        "--synthetic", action="store_true", help="Spawn a synthetic publisher and report latency"
+    )
+    parser.add_argument("--rate", type=float, default=30.0, help="Synthetic publish rate (Hz)")
+    parser.add_argument("--count", type=int, default=3000, help="Synthetic observations to publish")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    num_observations = 6
+
+    if args.checkpoint_dir:
+        agent = QLearningAgent.from_checkpoint(args.checkpoint_dir, mmap_mode="r")
+    else:
+        print("No checkpoint given, using an untrained agent")
+        agent = QLearningAgent(num_states=num_observations, num_actions=4)
+
+    publisher = None
+    if args.synthetic:
+        ready = mp.Event()
+        publisher = mp.Process(
+            target=synthetic_publisher,
+            args=(args.ring_name, args.rate, args.count, num_observations - 1, ready),
+        )
+        publisher.start()
+        ready.wait()
+
+    obs_ring = SharedRing(args.ring_name, OBSERVATION_DTYPE)
+    decision_ring = SharedRing(args.decision_ring, DECISION_DTYPE, create=True)
+    try:
+        latencies = run_controller(
+            agent,
+            obs_ring,
+            decision_ring,
+            num_observations=num_observations,
+            duration=args.duration,
+            max_decisions=args.count if args.synthetic else None,
+            verbose=not args.synthetic,
+        )
+        report_latency(latencies)
+    finally:
+        obs_ring.close()
+        decision_ring.close()
+        if publisher is not None:
+            publisher.join()
+
+
+if __name__ == "__main__":
+    main()
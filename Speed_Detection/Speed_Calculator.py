@@ -1,4 +1,5 @@
 import time
+from collections import OrderedDict
 
 
 class SpeedEstimator:
@@ -7,7 +8,7 @@ class SpeedEstimator:
     between two horizontal reference lines in the frame.
     """
 
-    def __init__(self, red_line_y, blue_line_y, offset, distance_m=200):
+    def __init__(self, red_line_y, blue_line_y, offset, distance_m=200, max_tracked=10000):
         """
         Initialize the SpeedEstimator.
 
@@ -16,17 +17,44 @@ class SpeedEstimator:
             blue_line_y (int): Y-coordinate of the blue line.
             offset (int): Tolerance for detecting line crossing.
             distance_m (float): Real-world distance between the two lines in meters.
+            max_tracked (int): Most object IDs remembered per table; the oldest
+                are forgotten first, keeping memory bounded on long runs.
         """
         self.red_line_y = red_line_y
         self.blue_line_y = blue_line_y
         self.offset = offset
         self.distance_m = distance_m
-        self.down = {}
-        self.up = {}
-        self.counter_down = []
-        self.counter_up = []
+        self.max_tracked = max_tracked
+        self.down = OrderedDict()
+        self.up = OrderedDict()
+        self.counter_down = OrderedDict()
+        self.counter_up = OrderedDict()
 
-    def calculate_speed(self, cy, object_id, direction):
+    def _remember(self, table, object_id, value):
+        """Store a value for an object ID, evicting the oldest entry when full."""
+        table[object_id] = value
+        table.move_to_end(object_id)
+        if len(table) > self.max_tracked:
+            table.popitem(last=False)
+
+    def get_state(self):
+        """
+        Return the pending and completed line crossings for checkpointing.
+
+        Returns:
+            dict: Each crossing table as a list of (object_id, time) pairs, oldest first.
+        """
+        return {
+            name: list(getattr(self, name).items())
+            for name in ("down", "up", "counter_down", "counter_up")
+        }
+
+    def set_state(self, state):
+        """Restore a state returned by `get_state`."""
+        for name, entries in state.items():
+            setattr(self, name, OrderedDict(entries))
+
+    def calculate_speed(self, cy, object_id, direction, timestamp=None):
         """
         Calculate the speed of a vehicle when it crosses the defined lines.
 
@@ -34,16 +62,18 @@ class SpeedEstimator:
             cy (int): The Y-coordinate of the object's centroid.
             object_id (int): The unique identifier of the object.
             direction (str): The movement direction ('up' or 'down').
+            timestamp (float | None): Time of the frame in seconds (e.g. video
+                position). Defaults to the wall clock.
 
         Returns:
             float | None: The calculated speed in km/h if measurable, else None.
         """
-        current_time = time.time()
+        current_time = time.time() if timestamp is None else timestamp
 
         # --- Downward direction ---
         if direction == "down":
             if self.red_line_y - self.offset < cy < self.red_line_y + self.offset:
-                self.down[object_id] = current_time
+                self._remember(self.down, object_id, current_time)
 
             if (
                 object_id in self.down
@@ -51,13 +81,13 @@ class SpeedEstimator:
             ):
                 elapsed = current_time - self.down[object_id]
                 if object_id not in self.counter_down:
-                    self.counter_down.append(object_id)
+                    self._remember(self.counter_down, object_id, current_time)
                     return (self.distance_m / elapsed) * 3.6  # Convert m/s to km/h
 
         # --- Upward direction ---
         elif direction == "up":
             if self.blue_line_y - self.offset < cy < self.blue_line_y + self.offset:
-                self.up[object_id] = current_time
+                self._remember(self.up, object_id, current_time)
 
             if (
                 object_id in self.up
@@ -65,7 +95,7 @@ class SpeedEstimator:
             ):
                 elapsed = current_time - self.up[object_id]
                 if object_id not in self.counter_up:
-                    self.counter_up.append(object_id)
+                    self._remember(self.counter_up, object_id, current_time)
                     return (self.distance_m / elapsed) * 3.6  # Convert m/s to km/h
 
         return None
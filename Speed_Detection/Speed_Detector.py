@@ -1,5 +1,6 @@
-from ultralytics import YOLO
-import pandas as pd
+import time
+
+import numpy as np
 
 
 class VehicleDetector:
@@ -7,44 +8,125 @@ class VehicleDetector:
     Detects vehicles in a given video frame using a YOLO model.
     """
 
-    def __init__(self, model_path: str = "yolov9c.pt", class_list: list[str] | None = None):
+    def __init__(
+        self,
+        model_path: str = "yolov9c.pt",
+        class_list: list[str] | None = None,
+        cache=None,
+        tiling: dict | None = None,
+        worker_socket: str | None = None,
+    ):
         """
         Initialize the VehicleDetector with a YOLO model and class filter.
 
         Args:
-            model_path (str): Path to the YOLO model file.
+            model_path (str): Path to the YOLO model file. With `worker_socket`, the
+                weights the daemon must be serving.
             class_list (list[str] | None): List of class names to detect.
                 Defaults to ['car', 'bus', 'truck', 'motorcycle'].
+            cache (DetectionCache | None): Persistent cache of raw detections.
+                Stores unfiltered boxes, so changing `class_list` reuses it.
+            tiling (dict | None): Tile layout for high-resolution frames, passed to
+                `Mobility_Utils.Tiled_Inference.TiledDetector`, e.g.
+                {"tile_size": 640, "overlap": 0.2, "mode": "batch"}. None runs one pass.
+            worker_socket (str | None): Unix socket of a running Model_Worker daemon;
+                detection is served by its pre-loaded, warmed-up model and this
+                process never imports ultralytics or torch.
         """
-        self.model = YOLO(model_path)
+        # Heavy imports happen here rather than at module load
+        if worker_socket:
+            from Mobility_Utils.Model_Worker import ModelClient
+
+            def load():
+                return ModelClient(worker_socket)
+
+            # Fails if the daemon serves other weights than model_path, which keys the cache and checkpoints
+            self.model = ModelClient(worker_socket, model_path=model_path)
+        else:
+            from ultralytics import YOLO
+
+            def load():
+                return YOLO(model_path)
+
+            self.model = load()
         self.class_list = class_list or ["car", "bus", "truck", "motorcycle"]
+        self.cache = cache
+        names = self.model.names
+        self.class_mask = np.array([names[i] in self.class_list for i in range(len(names))], dtype=bool)
+        self.tiler = None
+        if tiling:
+            from Mobility_Utils.Tiled_Inference import TiledDetector
+
+            self.tiler = TiledDetector(self.model, model_loader=load, **tiling)
+
+    def warmup(self, frame_size: tuple[int, int] = (640, 640), runs: int = 1) -> float:
+        """
+        Run predictions on a blank frame so the first real frame is not slowed
+        by one-time model setup. Not needed with a Model_Worker (already warm).
+
+        Args:
+            frame_size (tuple[int, int]): (width, height) of the frames to come.
+            runs (int): Number of warm-up predictions.
 
-    def detect(self, frame) -> list[list[int]]:
+        Returns:
+            float: Seconds spent warming up.
+        """
+        start = time.perf_counter()
+        blank = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        for _ in range(runs):
+            if self.tiler is not None:
+                self.tiler.detect(blank)
+            elif hasattr(self.model, "predict_boxes"):
+                self.model.predict_boxes(blank)
+            else:
+                self.model.predict(blank, verbose=False)
+        return time.perf_counter() - start
+
+    def detect(
+        self,
+        frame,
+        frame_idx: int | None = None,
+        output_size: tuple[int, int] | None = None,
+    ) -> list[list[int]]:
         """
         Perform vehicle detection on a given frame.
 
         Args:
             frame (np.ndarray): The video frame for object detection.
+            frame_idx (int | None): Zero-based frame index, required to use the cache.
+            output_size (tuple[int, int] | None): (width, height) the returned boxes
+                are scaled to, e.g. the working frame when detecting on the full-resolution
+                source. Defaults to the size of `frame`.
 
         Returns:
             list[list[int]]: A list of bounding boxes [x1, y1, x2, y2] for detected vehicles.
         """
-        results = self.model.predict(frame)
-        detections = []
-
-        if not results or not hasattr(results[0], "boxes") or results[0].boxes.data is None:
-            return detections  # Return empty list if no detection
+        use_cache = self.cache is not None and frame_idx is not None
+        data = self.cache.get(frame_idx) if use_cache else None
 
-        data = results[0].boxes.data.cpu().numpy()
-        df = pd.DataFrame(data).astype(float)
+        if data is None:
+            if self.tiler is not None:
+                data = self.tiler.detect(frame)
+            elif hasattr(self.model, "predict_boxes"):
+                data = self.model.predict_boxes(frame)
+            else:
+                results = self.model.predict(frame)
+                if not results or not hasattr(results[0], "boxes") or results[0].boxes.data is None:
+                    data = np.empty((0, 6))
+                else:
+                    data = results[0].boxes.data.cpu().numpy()
+            if use_cache:
+                self.cache.put(frame_idx, data)
 
-        for _, row in df.iterrows():
-            x1, y1, x2, y2, _, cls_id = row
-            cls_id = int(cls_id)
+        if output_size is not None and len(data):
+            sx, sy = output_size[0] / frame.shape[1], output_size[1] / frame.shape[0]
+            data = data * np.array([sx, sy, sx, sy, 1, 1])
 
-            if cls_id < len(self.model.names):
-                cls_name = self.model.names[cls_id]
-                if cls_name in self.class_list:
-                    detections.append([int(x1), int(y1), int(x2), int(y2)])
+        if len(data) == 0:
+            return []  # Return empty list if no detection
 
-        return detections
+        # Keep boxes whose class is in class_list (unknown class IDs are dropped)
+        cls_ids = np.asarray(data[:, 5]).astype(int)
+        known = cls_ids < len(self.class_mask)
+        keep = known & self.class_mask[np.where(known, cls_ids, 0)]
+        return np.asarray(data[keep, :4], dtype=float).astype(int).tolist()
@@ -7,22 +7,32 @@ class Tracker:
     Each detected object is assigned a unique ID that persists across frames.
     """
 
-    def __init__(self) -> None:
-        """Initialize the tracker with empty state."""
+    def __init__(self, max_distance: float = 25) -> None:
+        """
+        Initialize the tracker with empty state.
+
+        Args:
+            max_distance (float): Largest centroid movement (pixels) between two
+                consecutive frames that still counts as the same object.
+        """
         self.center_points: dict[int, tuple[int, int]] = {}
         self.id_count: int = 0
+        self.max_distance = max_distance
 
-    def update(self, objects_rect: list[list[int]]) -> list[list[int]]:
+    def update(self, objects_rect: list[list[int]], motion_scale: float = 1.0) -> list[list[int]]:
         """
         Update tracked objects based on new detections.
 
         Args:
             objects_rect (list[list[int]]): List of bounding boxes as [x, y, w, h].
+            motion_scale (float): Frames elapsed since the previous update; the
+                matching distance grows with it when frames were skipped.
 
         Returns:
             list[list[int]]: Updated list of bounding boxes with IDs as [x, y, w, h, id].
         """
         objects_bbs_ids: list[list[int]] = []
+        max_distance = self.max_distance * motion_scale
 
         # Iterate through all detected objects
         for rect in objects_rect:
@@ -36,7 +46,7 @@ class Tracker:
                 dist = math.hypot(cx - prev_center[0], cy - prev_center[1])
 
                 # If the object is close enough, consider it the same
-                if dist < 25:
+                if dist < max_distance:
                     self.center_points[object_id] = (cx, cy)
                     objects_bbs_ids.append([x, y, w, h, object_id])
                     same_object_detected = True
@@ -55,3 +65,12 @@ class Tracker:
 
         self.center_points = new_center_points.copy()
         return objects_bbs_ids
+
+    def get_state(self) -> dict:
+        """Return the tracker state for checkpointing."""
+        return {"center_points": dict(self.center_points), "id_count": self.id_count}
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by `get_state`."""
+        self.center_points = dict(state["center_points"])
+        self.id_count = state["id_count"]
@@ -0,0 +1,100 @@
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Shared modules (Mobility_Utils) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Mobility_Utils.Frame_Pool import FramePool, capture_shape, read_into, resize_into
+
+FRAME_SIZE = (1020, 500)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    with open("/proc/self/statm", "r") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def annotate(frame: np.ndarray) -> None:
+    """Stand-in for the drawing done in speed_main.py."""
+    cv2.line(frame, (0, 120), (frame.shape[1], 120), (0, 0, 255), 2)
+    cv2.line(frame, (0, 80), (frame.shape[1], 80), (255, 0, 0), 2)
+    cv2.rectangle(frame, (100, 100), (200, 200), (0, 255, 0), 2)
+
+
+def run_loop(video_path: str, mode: str, max_frames: int, results) -> None:
+    """Decode → resize → draw loop without detection, in 'alloc' or 'pool' mode."""
+    cap = cv2.VideoCapture(video_path)
+    if mode == "pool":
+        decode_pool = FramePool(capture_shape(cap))
+        frame_pool = FramePool((FRAME_SIZE[1], FRAME_SIZE[0], 3))
+
+    frame_times = []
+    rss_samples = []
+    faults_start = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+
+    for frame_id in range(max_frames):
+        start = time.perf_counter()
+        if mode == "pool":
+            raw = read_into(cap, decode_pool)
+            if raw is None:
+                break
+            frame = resize_into(raw, frame_pool)
+            decode_pool.release(raw)
+            annotate(frame)
+            frame_pool.release(frame)
+        else:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.resize(frame, FRAME_SIZE)
+            annotate(frame)
+        frame_times.append(time.perf_counter() - start)
+        if frame_id % 10 == 0:
+            rss_samples.append(current_rss_mb())
+
+    cap.release()
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults_start
+    steady = np.asarray(frame_times[len(frame_times) // 5 :]) * 1e3  # skip warm-up
+    results.put(
+        {
+            "mode": mode,
+            "frames": len(frame_times),
+            "ms_mean": float(steady.mean()) if steady.size else float("nan"),
+            "ms_p95": float(np.percentile(steady, 95)) if steady.size else float("nan"),
+            "rss_mb_steady": float(np.median(rss_samples[len(rss_samples) // 5 :])) if rss_samples else 0.0,
+            "rss_mb_peak": float(max(rss_samples)) if rss_samples else 0.0,
+            "minor_faults_per_frame": faults / max(len(frame_times), 1),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Allocation-heavy vs pooled decode/resize loop")
+    parser.add_argument("video", help="Video file to decode (1080p recommended)")
+    parser.add_argument("--frames", type=int, default=600, help="Frames per run")
+    args = parser.parse_args()
+
+    results = mp.Queue()
+    for mode in ("alloc", "pool"):
+        # Each mode runs in a fresh process so RSS and page faults are not shared
+        process = mp.Process(target=run_loop, args=(args.video, mode, args.frames, results))
+        process.start()
+        stats = results.get()
+        process.join()
+        print(
+            f"{stats['mode']:>5}: {stats['frames']} frames | {stats['ms_mean']:.2f} ms/frame "
+            f"(p95 {stats['ms_p95']:.2f}) | RSS steady {stats['rss_mb_steady']:.1f} MB, "
+            f"peak {stats['rss_mb_peak']:.1f} MB | {stats['minor_faults_per_frame']:.1f} page faults/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import argparse
+import os
+import sys
+import time
+import logging
 import cv2
 from Speed_tracker import Tracker
 from Speed_detector import VehicleDetector
@@ -5,64 +10,195 @@ from speed_Calculator import SpeedEstimator
 from utils.Pixelpoint import draw_lines, draw_info
 from utils.Frames_Folder import ensure_folder, save_frame
 
+# Shared modules (Mobility_Utils) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Mobility_Utils.Detection_Cache import DetectionCache
+from Mobility_Utils.Frame_Pool import FramePool, capture_shape, resize_into
+from Mobility_Utils.Job_Checkpoint import JobCheckpointer, seek_capture, segment_path
+from Mobility_Utils.Live_Scheduler import FrameScheduler
+from Mobility_Utils.Preview_Server import PreviewServer
+from Mobility_Utils.Tiled_Inference import layout_key
+from Mobility_Utils.Traffic_Aggregates import TrafficAggregator
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vehicle speed detection")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    return parser.parse_args()
+
 
 def main():
     """
     Main function to perform vehicle detection, tracking, and speed estimation
     from a video source.
     """
+    args = parse_args()
     # --- Setup ---
     video_path = "/content/drive/MyDrive/murru5 (1).mp4"
+    model_path = "yolov9c.pt"
+    # Unix socket of a running Model_Worker daemon serving model_path, None loads the model here
+    model_socket = None
+    frame_size = (1020, 500)
+    cache_dir = "detection_cache"  # None disables the detection cache (offline mode only)
+    preview_port = 8081  # live preview at http://127.0.0.1:8081/, None disables it
+    # "offline": every frame; "paced": emulate a live camera with this file; "live": camera/stream
+    schedule_mode = "offline"
+    # Tiled inference on the full-resolution source (e.g. 4K), None detects on the resized frame:
+    # {"tile_size": 640, "overlap": 0.2, "region": None, "full_frame": True, "mode": "batch"}
+    tiling = None
+    checkpoint_dir = "checkpoints/speed"  # crash-safe checkpoints for --resume, None disables them
+    checkpoint_every = 1000  # frames between checkpoints
     red_line_y, blue_line_y, offset = 120, 80, 6
+    aggregates_path = "speed_aggregates.json"  # rolling counts + speed percentiles; None disables
+    aggregates_export_interval = 60  # seconds of video time between snapshot exports
 
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise IOError(f"Error: Unable to open video file {video_path}")
 
-    detector = VehicleDetector()
+    # Only offline runs see every frame in order; paced and live runs skip frames
+    cache = None
+    if cache_dir and schedule_mode == "offline":
+        cache_params = {"frame_size": frame_size}
+        if tiling:
+            cache_params["tiling"] = layout_key(tiling)
+        try:
+            cache = DetectionCache(cache_dir, video_path, model_path, cache_params)
+        except ValueError as error:
+            logging.warning("Detection cache disabled: %s", error)
+    detector = VehicleDetector(model_path, cache=cache, tiling=tiling, worker_socket=model_socket)
+    if schedule_mode != "offline" and not model_socket:
+        # Pay the one-time model setup before the first live frame instead of on it
+        source_size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        detector.warmup(source_size if tiling else frame_size)
     tracker = Tracker()
     speed_estimator = SpeedEstimator(red_line_y, blue_line_y, offset)
+    # Labels: line "speed", class "vehicle", directions "down" and "up".
+    # Live timestamps are relative to now; offline ones to the start of the video
+    aggregator = TrafficAggregator(
+        max_lines=1, max_classes=1, max_directions=2, origin=time.time() if schedule_mode == "live" else 0.0
+    )
+    next_export = aggregates_export_interval
+
+    # Resume tracker and pending line crossings, then seek past the frames already done
+    checkpointer = None
+    start_frame = 0
+    if checkpoint_dir and schedule_mode != "live":
+        job = {
+            "video": os.path.abspath(video_path),
+            "model": model_path,
+            "frame_size": frame_size,
+            "tiling": layout_key(tiling) if tiling else None,
+            "lines": (red_line_y, blue_line_y, offset),
+        }
+        checkpointer = JobCheckpointer(checkpoint_dir, job, checkpoint_every)
+        checkpoint = checkpointer.load() if args.resume else None
+        if checkpoint is not None:
+            tracker.set_state(checkpoint["state"]["tracker"])
+            speed_estimator.set_state(checkpoint["state"]["speed_estimator"])
+            aggregator.set_state(checkpoint["state"]["aggregator"])
+            next_export = checkpoint["state"]["next_export"]
+            start_frame = checkpoint["position"]
+            seek_capture(cap, start_frame)
+
+    preview = None
+    if preview_port:
+        preview = PreviewServer(preview_port, title="Vehicle Speed Detection").start()
 
     ensure_folder("detected_frames")
 
     fourcc = cv2.VideoWriter_fourcc(*"XVID")
-    out = cv2.VideoWriter("output.avi", fourcc, 20.0, (1020, 500))
+    # A resumed run writes a new segment instead of truncating the earlier one
+    out = cv2.VideoWriter(segment_path("output.avi", start_frame), fourcc, 20.0, frame_size)
     frame_id = 0
+    finished = False
+
+    # Preallocated rings for decoding and for the resized working frame
+    decode_pool = FramePool(capture_shape(cap))
+    frame_pool = FramePool((frame_size[1], frame_size[0], 3))
+
+    scheduler = FrameScheduler(cap, mode=schedule_mode)
 
     # --- Main Loop ---
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        raw = decode_pool.acquire()
+        scheduled = scheduler.next_frame(image=raw)
+        if scheduled is None:
+            decode_pool.release(raw)
+            finished = True
             break
 
-        frame_id += 1
-        frame = cv2.resize(frame, (1020, 500))
+        # Sizes the pool from the first frame of streams without a reported (or with a rotated) size
+        raw = decode_pool.fit(raw, scheduled.frame)
+        frame_id = scheduled.index + 1
+        frame = resize_into(raw, frame_pool)
+        if tiling:
+            # Tiles see the full-resolution source; boxes come back in working-frame pixels
+            detections = detector.detect(raw, scheduled.index, output_size=frame_size)
+        else:
+            detections = detector.detect(frame, scheduled.index)
+        decode_pool.release(raw)
 
-        detections = detector.detect(frame)
-        tracked_objects = tracker.update(detections)
+        tracked_objects = tracker.update(detections, scheduled.motion_scale)
 
         for bbox in tracked_objects:
             x1, y1, x2, y2, object_id = bbox
             cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
 
-            speed_down = speed_estimator.calculate_speed(cy, object_id, "down")
-            speed_up = speed_estimator.calculate_speed(cy, object_id, "up")
+            speed_down = speed_estimator.calculate_speed(cy, object_id, "down", scheduled.timestamp)
+            speed_up = speed_estimator.calculate_speed(cy, object_id, "up", scheduled.timestamp)
 
             speed = speed_down or speed_up
+            if speed:
+                aggregator.add_speed(scheduled.timestamp, "speed", speed)
+                aggregator.add_count(scheduled.timestamp, "speed", "vehicle", "down" if speed_down else "up")
             draw_info(frame, speed, (x1, y1, x2, y2), object_id)
 
         draw_lines(frame, red_line_y, blue_line_y)
         save_frame(frame, "detected_frames", frame_id)
         out.write(frame)
 
-        cv2.imshow("Vehicle Speed Detection", frame)
-        if cv2.waitKey(1) & 0xFF == 27:  # ESC key
-            break
+        if preview is not None:
+            preview.publish(frame)
+
+        # All consumers are done with the working frame
+        frame_pool.release(frame)
+
+        if aggregates_path and scheduled.timestamp >= next_export:
+            aggregator.export(aggregates_path, now=scheduled.timestamp)
+            next_export = scheduled.timestamp + aggregates_export_interval
+
+        if checkpointer is not None and checkpointer.due(scheduler.position):
+            checkpointer.save(
+                scheduler.position,
+                {
+                    "tracker": tracker.get_state(),
+                    "speed_estimator": speed_estimator.get_state(),
+                    "aggregator": aggregator.get_state(),
+                    "next_export": next_export,
+                },
+            )
+        scheduler.finish_frame()
 
     # --- Cleanup ---
+    scheduler.log_metrics()
     cap.release()
     out.release()
-    cv2.destroyAllWindows()
+    if preview is not None:
+        preview.stop()
+    if cache is not None:
+        cache.close(complete=finished)
+    if checkpointer is not None:
+        if finished:
+            checkpointer.clear()
+        checkpointer.close()
+
+    if aggregates_path:
+        aggregator.export(aggregates_path)
+    speeds = aggregator.snapshot(rollup_names=[])["speeds"].get("speed", {"count": 0})
+    logging.info("Speeds: %s", speeds)
 
 
 if __name__ == "__main__":
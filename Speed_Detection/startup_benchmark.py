@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+# Probes import Mobility_Utils and Speed_Detector from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each probe runs in a fresh interpreter so nothing is already imported or warm.
+# It prints one JSON line of timings in seconds, measured from interpreter start.
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path[:0] = [{root!r}, {speed_dir!r}]
+timings = {{}}
+import cv2
+import numpy as np
+frame = cv2.imread({image!r}) if {image!r} else None
+if frame is None:
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+timings["import"] = time.perf_counter() - start
+{body}
+print(json.dumps(timings))
+"""
+
+# What VehicleDetector did before the lazy imports: pandas and ultralytics at module
+# import, then a plain YOLO load and predict on the first frame
+EAGER = """
+import pandas
+from ultralytics import YOLO
+timings["import"] = time.perf_counter() - start
+model = YOLO({model!r})
+timings["ready"] = time.perf_counter() - start
+model.predict(frame)
+timings["first_detection"] = time.perf_counter() - start
+t = time.perf_counter()
+model.predict(frame)
+timings["steady_detection"] = time.perf_counter() - t
+"""
+
+DETECT = """
+from Speed_Detector import VehicleDetector
+timings["import"] = time.perf_counter() - start
+detector = VehicleDetector({model!r}, worker_socket={socket!r})
+timings["ready"] = time.perf_counter() - start
+if {warmup}:
+    detector.warmup((frame.shape[1], frame.shape[0]))
+    timings["warm"] = time.perf_counter() - start
+detector.detect(frame)
+timings["first_detection"] = time.perf_counter() - start
+t = time.perf_counter()
+detector.detect(frame)
+timings["steady_detection"] = time.perf_counter() - t
+"""
+
+
+def probe(body: str, image: str | None) -> dict:
+    """Run one probe in a fresh interpreter and return its timings."""
+    code = PROBE.format(
+        root=REPO_ROOT, speed_dir=os.path.join(REPO_ROOT, "Speed_Detection"), image=image or "", body=body
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True, cwd=REPO_ROOT
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def start_worker(model: str, socket_path: str, workers: int, timeout: float = 300.0) -> subprocess.Popen:
+    """Launch a Model_Worker daemon and wait until its socket accepts clients."""
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "Mobility_Utils.Model_Worker", "--model", model,
+         "--socket", socket_path, "--workers", str(workers)],
+        cwd=REPO_ROOT,
+    )
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if daemon.poll() is not None:
+            raise RuntimeError(f"Model worker exited with code {daemon.returncode}")
+        if time.monotonic() > deadline:
+            daemon.terminate()
+            raise TimeoutError("Model worker did not start in time")
+        time.sleep(0.1)
+    return daemon
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time from process start to the first vehicle detection")
+    parser.add_argument("--model", default="yolov9c.pt", help="YOLO weights")
+    parser.add_argument("--image", default=None, help="Frame to detect on (default: random 1280x720)")
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh processes per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="Model_Worker processes")
+    args = parser.parse_args()
+
+    scenarios = {
+        "eager ultralytics + pandas import (before)": EAGER.format(model=args.model),
+        "local model, cold": DETECT.format(model=args.model, socket=None, warmup=False),
+        "local model, explicit warm-up": DETECT.format(model=args.model, socket=None, warmup=True),
+    }
+    socket_path = os.path.join(tempfile.mkdtemp(), "model.sock")
+    daemon = start_worker(args.model, socket_path, args.workers)
+    scenarios["Model_Worker client"] = DETECT.format(model=args.model, socket=socket_path, warmup=False)
+
+    try:
+        for name, body in scenarios.items():
+            runs = [probe(body, args.image) for _ in range(args.repeats)]
+            keys = list(runs[0])
+            means = {key: sum(run[key] for run in runs) / len(runs) for key in keys}
+            print(f"{name:>42}: " + " | ".join(f"{key} {means[key] * 1000:8.1f} ms" for key in keys))
+    finally:
+        daemon.send_signal(signal.SIGINT)  # lets the daemon remove its socket
+        daemon.wait()
+        shutil.rmtree(os.path.dirname(socket_path), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+# Shared modules (Mobility_Utils) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Mobility_Utils.Tiled_Inference import TiledDetector, scale_detections
+
+RESIZED_FRAME = (1020, 500)  # working size of speed_main.py
+VEHICLE_CLASSES = ["car", "bus", "truck", "motorcycle"]
+
+
+def sample_frames(video_path: str, count: int) -> list:
+    """Decode `count` frames spread evenly over the video."""
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    frames = []
+    for index in np.linspace(0, max(total - 1, 0), count).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+    cap.release()
+    return frames
+
+
+def predict(model: YOLO, frame: np.ndarray, **params) -> np.ndarray:
+    """(N, 6) detections of one whole-frame pass."""
+    boxes = model.predict(frame, verbose=False, **params)[0].boxes
+    if boxes is None or boxes.data is None:
+        return np.empty((0, 6), dtype=np.float32)
+    return boxes.data.detach().cpu().numpy()
+
+
+def matched(reference: np.ndarray, detections: np.ndarray, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Which reference boxes are found by `detections` (same class, IoU above threshold).
+
+    Returns:
+        np.ndarray: Boolean array, one entry per reference box.
+    """
+    if len(reference) == 0 or len(detections) == 0:
+        return np.zeros(len(reference), dtype=bool)
+    ix1 = np.maximum(reference[:, None, 0], detections[None, :, 0])
+    iy1 = np.maximum(reference[:, None, 1], detections[None, :, 1])
+    ix2 = np.minimum(reference[:, None, 2], detections[None, :, 2])
+    iy2 = np.minimum(reference[:, None, 3], detections[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_r = (reference[:, 2] - reference[:, 0]) * (reference[:, 3] - reference[:, 1])
+    area_d = (detections[:, 2] - detections[:, 0]) * (detections[:, 3] - detections[:, 1])
+    iou = inter / np.maximum(area_r[:, None] + area_d[None, :] - inter, 1e-9)
+    same_class = reference[:, None, 5] == detections[None, :, 5]
+    return ((iou >= iou_threshold) & same_class).any(axis=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Whole-frame vs tiled inference: recall and throughput")
+    parser.add_argument("video", help="High-resolution video (e.g. a 4K intersection camera)")
+    parser.add_argument("--model", default="yolov9c.pt", help="YOLO weights")
+    parser.add_argument("--frames", type=int, default=30, help="Frames sampled from the video")
+    parser.add_argument("--tile-size", type=int, default=640, help="Tile width/height in source pixels")
+    parser.add_argument("--overlap", type=float, default=0.2, help="Overlap between neighbouring tiles")
+    parser.add_argument("--region", type=int, nargs=4, default=None, help="x1 y1 x2 y2 area to tile")
+    parser.add_argument("--batch-size", type=int, default=16, help="Tiles per predict call (batch mode)")
+    parser.add_argument("--workers", type=int, default=4, help="Threads (threads mode)")
+    parser.add_argument("--small", type=int, default=32, help="Boxes below this height (px) count as small")
+    args = parser.parse_args()
+
+    frames = sample_frames(args.video, args.frames)
+    if not frames:
+        raise IOError(f"Error: Unable to read frames from {args.video}")
+    height, width = frames[0].shape[:2]
+    model = YOLO(args.model)
+    vehicle_ids = [class_id for class_id, name in model.names.items() if name in VEHICLE_CLASSES]
+
+    def resized(frame):
+        detections = predict(model, cv2.resize(frame, RESIZED_FRAME))
+        return scale_detections(detections, RESIZED_FRAME, (width, height))
+
+    layout = dict(tile_size=args.tile_size, overlap=args.overlap, region=args.region)
+    tiled_batch = TiledDetector(model, mode="batch", batch_size=args.batch_size, **layout)
+    tiled_threads = TiledDetector(
+        model, mode="threads", workers=args.workers, model_loader=lambda: YOLO(args.model), **layout
+    )
+    methods = {
+        "whole frame (imgsz 640)": lambda frame: predict(model, frame),
+        f"resized {RESIZED_FRAME[0]}x{RESIZED_FRAME[1]}": resized,
+        f"tiled batch ({len(tiled_batch.tiles((width, height)))} tiles)": tiled_batch.detect,
+        f"tiled threads x{args.workers}": tiled_threads.detect,
+    }
+
+    # Reference: one pass at native resolution (slow, but sees every pixel)
+    native_size = int(np.ceil(max(width, height) / 32) * 32)
+    predict(model, frames[0], imgsz=native_size)  # warm-up
+    references = []
+    for frame in frames:
+        detections = predict(model, frame, imgsz=native_size)
+        references.append(detections[np.isin(detections[:, 5], vehicle_ids)])
+    reference_count = sum(len(r) for r in references)
+    small_count = sum(int(((r[:, 3] - r[:, 1]) < args.small).sum()) for r in references)
+    print(f"{len(frames)} frames {width}x{height}: {reference_count} reference vehicles "
+          f"({small_count} under {args.small}px) from a native-resolution pass (imgsz {native_size})")
+
+    for name, detect in methods.items():
+        detect(frames[0])  # warm-up
+        found = small_found = 0
+        elapsed = 0.0
+        for frame, reference in zip(frames, references):
+            start = time.perf_counter()
+            detections = detect(frame)
+            elapsed += time.perf_counter() - start
+            hits = matched(reference, detections)
+            small = (reference[:, 3] - reference[:, 1]) < args.small
+            found += int(hits.sum())
+            small_found += int(hits[small].sum())
+        print(
+            f"{name:>28}: {len(frames) / elapsed:6.2f} fps | recall {found / max(reference_count, 1):.3f} "
+            f"| small-vehicle recall {small_found / max(small_count, 1):.3f}"
+        )
+
+    tiled_threads.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,48 @@ CLASSES_TO_TRACK = ['person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus',
 'bird', 'cat', 'dog', 'horse', 'sheep', 'cow', 'elephant', 'bear', 'zebra', 'giraffe', 
 'backpack', 'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee', 'skis', 'snowboard']
 
+# Detection cache (raw YOLO boxes per frame); None disables caching. Only used in "offline"
+# mode and for sources that are regular files (not device indices or stream URLs).
+DETECTION_CACHE_DIR = "./cache/detections"
+INFERENCE_PARAMS = {}  # extra model.predict arguments, e.g. {"imgsz": 1280}; part of the cache key
+
+# Pre-loaded model daemon (python -m Mobility_Utils.Model_Worker --model <MODEL_PATH>); when set,
+# detection is sent to it over this Unix socket and no model is loaded here. None loads locally.
+MODEL_WORKER_SOCKET = None
+
+# Tiled inference for high-resolution cameras (see Mobility_Utils/Tiled_Inference.py); None runs
+# one whole-frame pass. Layout per camera, e.g. tile only the far part of the road and keep a
+# whole-frame pass for close vehicles:
+# {"tile_size": 640, "overlap": 0.2, "region": (0, 300, 3840, 1200), "full_frame": True,
+#  "mode": "batch", "batch_size": 16}   # or "mode": "threads", "workers": 4
+TILING = None
+
+# Frame scheduling: "offline" processes every frame; "paced" emulates a live camera at the
+# video's native fps; "live" for cameras/streams. Stale frames are skipped in both live modes.
+SCHEDULE_MODE = "offline"
+FRAME_DEADLINE = None  # per-frame budget in seconds, None = one frame period
+
+# Rolling counts per line / class / direction (1 min, 15 min, 1 h buckets); None disables export
+AGGREGATES_PATH = "./traffic_aggregates.json"
+AGGREGATES_EXPORT_INTERVAL = 60  # seconds of video time between snapshot exports
+
+# Crash-safe checkpoints (resume with `python Main.py --resume`); None disables them.
+# Not used in "live" mode, where there is nothing to seek back to.
+CHECKPOINT_DIR = "./checkpoints/traffic_counter"
+CHECKPOINT_EVERY = 1000  # source frames between checkpoints
+
+# Live preview (MJPEG over HTTP, open http://127.0.0.1:<port>/); None disables it
+PREVIEW_PORT = 8080
+PREVIEW_MAX_FPS = 10
+
 # Line coordinates
 LINE_COORDS = {
     "nb": {"start": (880, 390), "end": (1000, 380), "label": "NB Incoming"},
     "sb": {"start": (740, 660), "end": (1010, 620), "label": "SB Incoming"},
     "wb": {"start": (630, 430), "end": (630, 620), "label": "WB Incoming"},
 }
+
+# RL signal controller bridge (see Signal_Controller.py); None disables publishing
+BRIDGE_RING_NAME = None
+BRIDGE_ZONE_PX = 60  # distance from a line within which a vehicle counts as queued
+BRIDGE_LANE_CAPACITY = 20  # queued vehicles that correspond to full occupancy
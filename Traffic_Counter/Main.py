@@ -1,77 +1,164 @@
+import argparse
+import os
+import sys
 import cv2
 import logging
-from typing import Dict, Set, Tuple
+import time
+from functools import partial
+from typing import Dict
 from config import FILE_ID, DEST_PATH, MODEL_PATH, CLASSES_TO_TRACK, LINE_COORDS
+from config import BRIDGE_RING_NAME, BRIDGE_ZONE_PX, BRIDGE_LANE_CAPACITY
+from config import DETECTION_CACHE_DIR, INFERENCE_PARAMS, PREVIEW_PORT, PREVIEW_MAX_FPS
+from config import SCHEDULE_MODE, FRAME_DEADLINE, AGGREGATES_PATH, AGGREGATES_EXPORT_INTERVAL
+from config import CHECKPOINT_DIR, CHECKPOINT_EVERY, TILING, MODEL_WORKER_SOCKET
 from utils.downloader import download_file_from_google_drive
-from utils.DetectionOfFrames import load_model, detect_objects
+from utils.DetectionOfFrames import load_model, warmup_model, detect_objects
 from utils.LineVisualization import draw_lines_and_labels, draw_vehicle_count
 from utils.tracker import Tracker
 
+# Shared modules (Mobility_Utils) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Mobility_Utils.Detection_Cache import DetectionCache
+from Mobility_Utils.Job_Checkpoint import JobCheckpointer, seek_capture
+from Mobility_Utils.Line_Geometry import is_crossing_line, lane_queues
+from Mobility_Utils.Live_Scheduler import FrameScheduler
+from Mobility_Utils.Model_Worker import ModelClient
+from Mobility_Utils.Preview_Server import PreviewServer
+from Mobility_Utils.Tiled_Inference import TiledDetector, layout_key
+from Mobility_Utils.Traffic_Aggregates import RecentIds, TrafficAggregator
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
-def is_crossing_line(
-    cx: int,
-    cy: int,
-    line_start: Tuple[int, int],
-    line_end: Tuple[int, int],
-    axis: str = "horizontal",
-) -> bool:
-    """
-    Check if the centroid crosses the defined line.
-
-    Args:
-        cx (int): Centroid x-coordinate.
-        cy (int): Centroid y-coordinate.
-        line_start (Tuple[int, int]): Line start coordinates.
-        line_end (Tuple[int, int]): Line end coordinates.
-        axis (str): Line orientation ('horizontal' or 'vertical').
-
-    Returns:
-        bool: True if centroid crosses the line, else False.
-    """
-    if axis == "horizontal":
-        return line_start[0] < cx < line_end[0] and abs(cy - line_start[1]) < 10
-    return line_start[1] < cy < line_end[1] and abs(cx - line_start[0]) < 10
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Traffic vehicle counter")
+    parser.add_argument(
+        "--resume", action="store_true", help="Continue from the last checkpoint in CHECKPOINT_DIR"
+    )
+    return parser.parse_args()
 
 
 def main() -> None:
     """Main function to run the traffic vehicle counter."""
+    args = parse_args()
     logging.info("🚗 Starting Traffic Vehicle Counter")
 
     # Step 1: Download video
     download_file_from_google_drive(FILE_ID, DEST_PATH)
 
-    # Step 2: Load YOLO model
-    model = load_model(MODEL_PATH)
+    # Step 2: Load YOLO model (or connect to a daemon that has it loaded and warm)
+    if MODEL_WORKER_SOCKET:
+        # Fails if the daemon serves other weights than MODEL_PATH, which keys the cache and checkpoints
+        model = ModelClient(MODEL_WORKER_SOCKET, model_path=MODEL_PATH)
+        model_loader = partial(ModelClient, MODEL_WORKER_SOCKET)
+    else:
+        model = load_model(MODEL_PATH)
+        model_loader = partial(load_model, MODEL_PATH)
+        if SCHEDULE_MODE != "offline":
+            # Pay the one-time model setup before the first live frame instead of on it
+            warmup_model(model, predict_params=INFERENCE_PARAMS)
+    tiler = None
+    if TILING:
+        tiler = TiledDetector(model, model_loader=model_loader, predict_params=INFERENCE_PARAMS, **TILING)
 
     # Step 3: Initialize tracker and counters
     tracker = Tracker()
-    counts: Dict[str, Set[int]] = {direction: set() for direction in LINE_COORDS.keys()}
+    # Bounded memory: recently counted IDs per line + fixed-size rolling aggregates
+    counted: Dict[str, RecentIds] = {direction: RecentIds() for direction in LINE_COORDS.keys()}
+    # Each counting line is also its own direction
+    aggregator = TrafficAggregator(
+        max_lines=len(LINE_COORDS),
+        max_classes=len(CLASSES_TO_TRACK),
+        max_directions=len(LINE_COORDS),
+        origin=time.time() if SCHEDULE_MODE == "live" else 0.0,
+    )
+    next_export = AGGREGATES_EXPORT_INTERVAL
+
+    # Optional: publish lane observations for the RL signal controller
+    publisher = None
+    if BRIDGE_RING_NAME:
+        from Mobility_Utils.Shared_Ring import ObservationPublisher
+
+        publisher = ObservationPublisher(BRIDGE_RING_NAME)
+        logging.info("Publishing lane observations to shared ring '%s'", BRIDGE_RING_NAME)
+
+    # Reuse stored detections when the video, weights and inference params are unchanged
+    # Only offline runs see every frame in order; paced and live runs skip frames
+    cache = None
+    if DETECTION_CACHE_DIR and SCHEDULE_MODE == "offline":
+        cache_params = dict(INFERENCE_PARAMS, tiling=layout_key(TILING)) if TILING else INFERENCE_PARAMS
+        try:
+            cache = DetectionCache(DETECTION_CACHE_DIR, DEST_PATH, MODEL_PATH, cache_params)
+        except ValueError as error:
+            logging.warning("Detection cache disabled: %s", error)
+
+    preview = None
+    if PREVIEW_PORT:
+        preview = PreviewServer(PREVIEW_PORT, max_fps=PREVIEW_MAX_FPS, title="Traffic Counter").start()
 
     # Step 4: Process video
     cap = cv2.VideoCapture(DEST_PATH)
 
+    # Resume tracker and counts from the last checkpoint and seek past the frames already done
+    checkpointer = None
+    if CHECKPOINT_DIR and SCHEDULE_MODE != "live":
+        job = {
+            "video": os.path.abspath(DEST_PATH),
+            "model": MODEL_PATH,
+            "classes": CLASSES_TO_TRACK,
+            "inference_params": INFERENCE_PARAMS,
+            "tiling": layout_key(TILING) if TILING else None,
+            "lines": LINE_COORDS,
+        }
+        checkpointer = JobCheckpointer(CHECKPOINT_DIR, job, CHECKPOINT_EVERY)
+        checkpoint = checkpointer.load() if args.resume else None
+        if checkpoint is not None:
+            state = checkpoint["state"]
+            tracker.set_state(state["tracker"])
+            for direction, ids in state["counted"].items():
+                counted[direction].set_state(ids)
+            aggregator.set_state(state["aggregator"])
+            next_export = state["next_export"]
+            seek_capture(cap, checkpoint["position"])
+        elif args.resume:
+            logging.info("No checkpoint in %s; starting from the first frame", CHECKPOINT_DIR)
+    elif args.resume:
+        logging.warning("--resume needs CHECKPOINT_DIR and a non-live SCHEDULE_MODE; starting fresh")
+
+    scheduler = FrameScheduler(cap, mode=SCHEDULE_MODE, deadline=FRAME_DEADLINE)
+    finished = False
+
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        scheduled = scheduler.next_frame()
+        if scheduled is None:
+            finished = True
             break
+        frame, frame_idx = scheduled.frame, scheduled.index
 
-        detections = detect_objects(model, frame)
+        detections = detect_objects(model, frame, cache, frame_idx, INFERENCE_PARAMS, tiler)
 
         # Filter only classes we want to track
-        boxes = [
-            [x1, y1, x2, y2]
+        kept = [
+            ([x1, y1, x2, y2], model.names[int(class_id)])
             for x1, y1, x2, y2, _, class_id in detections
             if int(class_id) < 80 and model.names[int(class_id)] in CLASSES_TO_TRACK
         ]
+        boxes = [box for box, _ in kept]
+        classes = [class_name for _, class_name in kept]
 
         tracked_objects = tracker.update(boxes)
 
-        for x1, y1, x2, y2, obj_id in tracked_objects:
+        if publisher is not None:
+            centroids = [((x1 + x2) // 2, (y1 + y2) // 2) for x1, y1, x2, y2, _ in tracked_objects]
+            queues = lane_queues(centroids, LINE_COORDS.values(), BRIDGE_ZONE_PX)
+            occupancy = [min(queue / BRIDGE_LANE_CAPACITY, 1.0) for queue in queues]
+            # The counter does not estimate speed, so mean_speed stays NaN; pipeline_main.py publishes it
+            publisher.publish(frame_idx, occupancy, queues)
+
+        for (x1, y1, x2, y2, obj_id), class_name in zip(tracked_objects, classes):
             cx, cy = (int((x1 + x2) // 2), int((y1 + y2) // 2))
 
             for direction, line in LINE_COORDS.items():
@@ -79,21 +166,54 @@ def main() -> None:
                 crossed = is_crossing_line(cx, cy, line["start"], line["end"], axis=axis)
 
                 color = (0, 255, 0)
-                if crossed and obj_id not in counts[direction]:
-                    counts[direction].add(obj_id)
+                if crossed and obj_id not in counted[direction]:
+                    counted[direction].add(obj_id)
+                    aggregator.add_count(scheduled.timestamp, direction, class_name, direction)
                     color = (0, 0, 255)
 
                 cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
 
         draw_lines_and_labels(frame, LINE_COORDS)
-        draw_vehicle_count(frame, {k.upper(): len(v) for k, v in counts.items()})
-
-        cv2.imshow("Traffic Counter", frame)
-        if cv2.waitKey(1) & 0xFF == 27:  # ESC key
-            break
-
+        draw_vehicle_count(frame, {k.upper(): aggregator.total(k) for k in LINE_COORDS})
+
+        if AGGREGATES_PATH and scheduled.timestamp >= next_export:
+            aggregator.export(AGGREGATES_PATH, now=scheduled.timestamp)
+            next_export = scheduled.timestamp + AGGREGATES_EXPORT_INTERVAL
+
+        # State is complete for this frame; the write happens off the frame loop
+        if checkpointer is not None and checkpointer.due(scheduler.position):
+            checkpointer.save(
+                scheduler.position,
+                {
+                    "tracker": tracker.get_state(),
+                    "counted": {direction: ids.get_state() for direction, ids in counted.items()},
+                    "aggregator": aggregator.get_state(),
+                    "next_export": next_export,
+                },
+            )
+
+        if preview is not None:
+            preview.publish(frame)
+        scheduler.finish_frame()
+
+    scheduler.log_metrics()
+    if AGGREGATES_PATH:
+        aggregator.export(AGGREGATES_PATH)
     cap.release()
-    cv2.destroyAllWindows()
+    if preview is not None:
+        preview.stop()
+    if cache is not None:
+        cache.close(complete=finished)
+    if tiler is not None:
+        tiler.close()
+    if MODEL_WORKER_SOCKET:
+        model.close()
+    if checkpointer is not None:
+        if finished:
+            checkpointer.clear()
+        checkpointer.close()
+    if publisher is not None:
+        publisher.close()
     logging.info("✅ Processing complete!")
 
 
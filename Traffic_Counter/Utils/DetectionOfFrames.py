@@ -1,11 +1,18 @@
 import logging
-from ultralytics import YOLO
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 import numpy as np
 
+if TYPE_CHECKING:
+    # ultralytics (and torch) are imported in load_model, not at module load
+    from ultralytics import YOLO
+    from Mobility_Utils.Detection_Cache import DetectionCache
+    from Mobility_Utils.Tiled_Inference import TiledDetector
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 
-def load_model(model_path: str) -> YOLO:
+def load_model(model_path: str) -> "YOLO":
     """
     Load a YOLO model from the specified pretrained weights.
 
@@ -17,6 +24,8 @@ def load_model(model_path: str) -> YOLO:
     """
     logging.info("Loading YOLO model from %s", model_path)
     try:
+        from ultralytics import YOLO
+
         model = YOLO(model_path)
         logging.info("Model loaded successfully.")
         return model
@@ -25,24 +34,82 @@ def load_model(model_path: str) -> YOLO:
         raise
 
 
-def detect_objects(model: YOLO, frame: np.ndarray) -> np.ndarray:
+def warmup_model(
+    model: "YOLO",
+    frame_size: Tuple[int, int] = (640, 640),
+    runs: int = 1,
+    predict_params: Optional[Dict[str, Any]] = None,
+) -> float:
+    """
+    Run predictions on a blank frame so the first real frame is not slowed by
+    one-time setup (predictor creation, layer fusion, kernel selection).
+
+    Args:
+        model (YOLO): Loaded YOLO model.
+        frame_size (Tuple[int, int]): (width, height) of the blank frame; use the
+            real frame size so the same input shape is prepared.
+        runs (int): Number of warm-up predictions.
+        predict_params (dict | None): Extra keyword arguments for `model.predict`.
+
+    Returns:
+        float: Seconds spent warming up.
+    """
+    start = time.perf_counter()
+    blank = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+    params = {"verbose": False, **(predict_params or {})}
+    for _ in range(runs):
+        model.predict(blank, **params)
+    elapsed = time.perf_counter() - start
+    logging.info("Model warmed up in %.2fs", elapsed)
+    return elapsed
+
+
+def detect_objects(
+    model: "YOLO",
+    frame: np.ndarray,
+    cache: Optional["DetectionCache"] = None,
+    frame_idx: Optional[int] = None,
+    predict_params: Optional[Dict[str, Any]] = None,
+    tiler: Optional["TiledDetector"] = None,
+) -> np.ndarray:
     """
     Run YOLO object detection on a single frame.
 
     Args:
-        model (YOLO): YOLO model instance for object detection.
+        model (YOLO | ModelClient): YOLO model instance, or a client of a
+            Model_Worker daemon that serves a pre-loaded model.
         frame (np.ndarray): Input image or video frame.
+        cache (DetectionCache | None): Persistent detection cache to read from
+            and write to. Requires `frame_idx`.
+        frame_idx (int | None): Zero-based index of the frame in the video.
+        predict_params (dict | None): Extra keyword arguments for `model.predict`.
+        tiler (TiledDetector | None): Run tiled inference over the full-resolution
+            frame instead of a single downscaled pass.
 
     Returns:
         np.ndarray: Detection results as an array of bounding box data.
     """
-    try:
-        results = model.predict(frame)
-        if not results or not hasattr(results[0], "boxes"):
-            logging.warning("No detections found in the frame.")
-            return np.empty((0, 6))  # Empty detection array
+    if cache is not None and frame_idx is not None:
+        cached = cache.get(frame_idx)
+        if cached is not None:
+            return cached
 
-        return results[0].boxes.data.detach().cpu().numpy()
+    try:
+        if tiler is not None:
+            detections = tiler.detect(frame)
+        elif hasattr(model, "predict_boxes"):
+            detections = model.predict_boxes(frame, **(predict_params or {}))
+        else:
+            results = model.predict(frame, **(predict_params or {}))
+            if not results or not hasattr(results[0], "boxes"):
+                logging.warning("No detections found in the frame.")
+                detections = np.empty((0, 6))  # Empty detection array
+            else:
+                detections = results[0].boxes.data.detach().cpu().numpy()
     except Exception as error:
         logging.error("Error during detection: %s", error)
         return np.empty((0, 6))
+
+    if cache is not None and frame_idx is not None:
+        cache.put(frame_idx, detections)
+    return detections
@@ -29,3 +29,12 @@ class Tracker:
             self.next_id += 1
 
         return tracked
+
+    def get_state(self) -> dict:
+        """Return the tracker state for checkpointing."""
+        return {"objects": dict(self.objects), "next_id": self.next_id}
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by `get_state`."""
+        self.objects = dict(state["objects"])
+        self.next_id = state["next_id"]
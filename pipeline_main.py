@@ -0,0 +1,289 @@
+import argparse
+import logging
+import os
+import time
+from functools import partial
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from Pipeline_Config import (
+    AGGREGATES_EXPORT_INTERVAL,
+    AGGREGATES_PATH,
+    ANALYSERS,
+    BRIDGE_LANE_CAPACITY,
+    BRIDGE_RING_NAME,
+    BRIDGE_ZONE_PX,
+    CHECKPOINT_DIR,
+    CHECKPOINT_EVERY,
+    CLASSES_TO_TRACK,
+    DETECTION_CACHE_DIR,
+    FRAME_DEADLINE,
+    INFERENCE_PARAMS,
+    MODEL_PATH,
+    MODEL_WORKER_SOCKET,
+    OUTPUT_VIDEO,
+    PREVIEW_MAX_FPS,
+    PREVIEW_PORT,
+    PROCESS_SIZE,
+    SCHEDULE_MODE,
+    TILING,
+    VIDEO_PATH,
+)
+from Mobility_Utils.Analysers import LineCounter, SpeedAnalyser, aggregate_limits, build_analysers
+from Mobility_Utils.Detection_Cache import DetectionCache
+from Mobility_Utils.Job_Checkpoint import JobCheckpointer, seek_capture, segment_path
+from Mobility_Utils.Line_Geometry import lane_queues
+from Mobility_Utils.Live_Scheduler import FrameScheduler
+from Mobility_Utils.Model_Worker import ModelClient
+from Mobility_Utils.Preview_Server import PreviewServer
+from Mobility_Utils.Tiled_Inference import TiledDetector, layout_key, scale_detections
+from Mobility_Utils.Traffic_Aggregates import TrafficAggregator
+from Speed_Detection.Speed_Tracker import Tracker
+from Traffic_Counter.Utils.DetectionOfFrames import detect_objects, load_model, warmup_model
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def class_mask(model, class_names: List[str]) -> np.ndarray:
+    """
+    Lookup table of which model class IDs should be tracked.
+
+    Args:
+        model (YOLO): Loaded YOLO model.
+        class_names (List[str]): Class names to keep.
+
+    Returns:
+        np.ndarray: Boolean array indexed by class ID.
+    """
+    mask = np.zeros(max(model.names) + 1, dtype=bool)
+    for class_id, name in model.names.items():
+        mask[class_id] = name in class_names
+    return mask
+
+
+def filter_boxes(detections: np.ndarray, mask: np.ndarray) -> Tuple[List[List[int]], List[int]]:
+    """
+    Keep detections of tracked classes as integer [x1, y1, x2, y2] boxes.
+
+    Args:
+        detections (np.ndarray): (N, 6) raw detections.
+        mask (np.ndarray): Output of `class_mask`.
+
+    Returns:
+        Tuple[List[List[int]], List[int]]: Boxes for the tracker and their class IDs.
+    """
+    if len(detections) == 0:
+        return [], []
+    class_ids = detections[:, 5].astype(int)
+    keep = (class_ids < mask.size) & mask[np.minimum(class_ids, mask.size - 1)]
+    return detections[keep, :4].astype(int).tolist(), class_ids[keep].tolist()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Combined counting + speed pipeline")
+    parser.add_argument(
+        "--resume", action="store_true", help="Continue from the last checkpoint in CHECKPOINT_DIR"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    Decode, detect and track every frame once, then fan the tracked objects
+    out to all configured analysers (line counters, speed estimators, ...).
+    """
+    args = parse_args()
+    logging.info("🚦 Starting combined counting + speed pipeline")
+
+    cap = cv2.VideoCapture(VIDEO_PATH)
+    if not cap.isOpened():
+        raise IOError(f"Error: Unable to open video file {VIDEO_PATH}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    if MODEL_WORKER_SOCKET:
+        # The daemon's model is already loaded and warm; this process never imports torch
+        # Fails if the daemon serves other weights than MODEL_PATH, which keys the cache and checkpoints
+        model = ModelClient(MODEL_WORKER_SOCKET, model_path=MODEL_PATH)
+        model_loader = partial(ModelClient, MODEL_WORKER_SOCKET)
+    else:
+        model = load_model(MODEL_PATH)
+        model_loader = partial(load_model, MODEL_PATH)
+        if SCHEDULE_MODE != "offline":
+            # Pay the one-time model setup before the first live frame instead of on it
+            source_size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            warmup_model(model, PROCESS_SIZE or source_size, predict_params=INFERENCE_PARAMS)
+    mask = class_mask(model, CLASSES_TO_TRACK)
+    tiler = None
+    if TILING:
+        tiler = TiledDetector(model, model_loader=model_loader, predict_params=INFERENCE_PARAMS, **TILING)
+    tracker = Tracker()
+    # Live timestamps are relative to now; offline ones to the start of the video
+    aggregator = TrafficAggregator(
+        **aggregate_limits(ANALYSERS, CLASSES_TO_TRACK), origin=time.time() if SCHEDULE_MODE == "live" else 0.0
+    )
+    analysers = build_analysers(ANALYSERS, aggregator)
+    next_export = AGGREGATES_EXPORT_INTERVAL
+
+    # Only offline runs see every frame in order; paced and live runs skip frames
+    cache = None
+    if DETECTION_CACHE_DIR and SCHEDULE_MODE == "offline":
+        cache_params = dict(INFERENCE_PARAMS)
+        if PROCESS_SIZE:
+            cache_params["frame_size"] = PROCESS_SIZE
+        if TILING:
+            cache_params["tiling"] = layout_key(TILING)
+        try:
+            cache = DetectionCache(DETECTION_CACHE_DIR, VIDEO_PATH, MODEL_PATH, cache_params)
+        except ValueError as error:
+            logging.warning("Detection cache disabled: %s", error)
+
+    # Resume tracker, analysers and aggregates from the last checkpoint and seek past done frames
+    checkpointer = None
+    start_frame = 0
+    if CHECKPOINT_DIR and SCHEDULE_MODE != "live":
+        job = {
+            "video": os.path.abspath(VIDEO_PATH),
+            "model": MODEL_PATH,
+            "classes": CLASSES_TO_TRACK,
+            "inference_params": INFERENCE_PARAMS,
+            "process_size": PROCESS_SIZE,
+            "tiling": layout_key(TILING) if TILING else None,
+            "analysers": ANALYSERS,
+        }
+        checkpointer = JobCheckpointer(CHECKPOINT_DIR, job, CHECKPOINT_EVERY)
+        checkpoint = checkpointer.load() if args.resume else None
+        if checkpoint is not None:
+            state = checkpoint["state"]
+            tracker.set_state(state["tracker"])
+            aggregator.set_state(state["aggregator"])
+            for analyser, analyser_state in zip(analysers, state["analysers"]):
+                analyser.set_state(analyser_state)
+            next_export = state["next_export"]
+            start_frame = checkpoint["position"]
+            seek_capture(cap, start_frame)
+        elif args.resume:
+            logging.info("No checkpoint in %s; starting from the first frame", CHECKPOINT_DIR)
+    elif args.resume:
+        logging.warning("--resume needs CHECKPOINT_DIR and a non-live SCHEDULE_MODE; starting fresh")
+
+    # Optional: publish lane observations, including the recent mean speed, for the RL signal controller
+    publisher = None
+    if BRIDGE_RING_NAME:
+        from Mobility_Utils.Shared_Ring import ObservationPublisher
+
+        publisher = ObservationPublisher(BRIDGE_RING_NAME)
+        lanes = [line for a in analysers if isinstance(a, LineCounter) for line in a.lines.values()]
+        speed_analysers = [a for a in analysers if isinstance(a, SpeedAnalyser)]
+        logging.info("Publishing %d lane observations to shared ring '%s'", len(lanes), BRIDGE_RING_NAME)
+
+    preview = None
+    if PREVIEW_PORT:
+        preview = PreviewServer(PREVIEW_PORT, max_fps=PREVIEW_MAX_FPS, title="Smart Mobility Pipeline").start()
+
+    scheduler = FrameScheduler(cap, mode=SCHEDULE_MODE, fps=fps, deadline=FRAME_DEADLINE)
+    out = None
+    finished = False
+
+    while True:
+        scheduled = scheduler.next_frame()
+        if scheduled is None:
+            finished = True
+            break
+        frame, frame_idx, timestamp = scheduled.frame, scheduled.index, scheduled.timestamp
+
+        source = frame
+        if PROCESS_SIZE:
+            frame = cv2.resize(frame, PROCESS_SIZE)
+
+        # One detection and one tracking pass shared by every analyser
+        if tiler is not None:
+            # Tiles see the full-resolution source; boxes are mapped to the working frame
+            detections = detect_objects(model, source, cache, frame_idx, tiler=tiler)
+            if PROCESS_SIZE:
+                detections = scale_detections(detections, (source.shape[1], source.shape[0]), PROCESS_SIZE)
+        else:
+            detections = detect_objects(model, frame, cache, frame_idx, INFERENCE_PARAMS)
+        boxes, class_ids = filter_boxes(detections, mask)
+        # The tracker returns one entry per box, in order, so classes stay aligned
+        tracked_objects = tracker.update(boxes, scheduled.motion_scale)
+        classes = [model.names[class_id] for class_id in class_ids]
+
+        for analyser in analysers:
+            analyser.process(frame_idx, timestamp, tracked_objects, classes)
+
+        if publisher is not None:
+            centroids = [((x1 + x2) // 2, (y1 + y2) // 2) for x1, y1, x2, y2, _ in tracked_objects]
+            queues = lane_queues(centroids, lanes, BRIDGE_ZONE_PX)
+            occupancy = [min(queue / BRIDGE_LANE_CAPACITY, 1.0) for queue in queues]
+            speeds = [speed for a in speed_analysers for speed in a.recent_speeds(timestamp)]
+            mean_speed = float(np.mean(speeds)) if speeds else float("nan")
+            publisher.publish(frame_idx, occupancy, queues, mean_speed)
+
+        if AGGREGATES_PATH and timestamp >= next_export:
+            aggregator.export(AGGREGATES_PATH, now=timestamp)
+            next_export = timestamp + AGGREGATES_EXPORT_INTERVAL
+
+        # State is complete for this frame; the write happens off the frame loop
+        if checkpointer is not None and checkpointer.due(scheduler.position):
+            checkpointer.save(
+                scheduler.position,
+                {
+                    "tracker": tracker.get_state(),
+                    "aggregator": aggregator.get_state(),
+                    "analysers": [analyser.get_state() for analyser in analysers],
+                    "next_export": next_export,
+                },
+            )
+
+        # Skip drawing when nothing consumes the annotated frame
+        if not OUTPUT_VIDEO and (preview is None or not preview.clients):
+            scheduler.finish_frame()
+            continue
+
+        for analyser in analysers:
+            analyser.annotate(frame, tracked_objects)
+
+        if OUTPUT_VIDEO:
+            if out is None:
+                fourcc = cv2.VideoWriter_fourcc(*"XVID")
+                # A resumed run writes a new segment instead of truncating the earlier one
+                out = cv2.VideoWriter(segment_path(OUTPUT_VIDEO, start_frame), fourcc, fps, (frame.shape[1], frame.shape[0]))
+            out.write(frame)
+        if preview is not None:
+            preview.publish(frame)
+        scheduler.finish_frame()
+
+    scheduler.log_metrics()
+    cap.release()
+    if out is not None:
+        out.release()
+    if preview is not None:
+        preview.stop()
+    if cache is not None:
+        cache.close(complete=finished)
+    if tiler is not None:
+        tiler.close()
+    if MODEL_WORKER_SOCKET:
+        model.close()
+    if checkpointer is not None:
+        if finished:
+            checkpointer.clear()
+        checkpointer.close()
+
+    if publisher is not None:
+        publisher.close()
+
+    if AGGREGATES_PATH:
+        aggregator.export(AGGREGATES_PATH)
+    for analyser in analysers:
+        logging.info("%s: %s", analyser.name, analyser.summary())
+    logging.info("✅ Processing complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Root-level scripts and the shared Mobility_Utils modules are imported from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
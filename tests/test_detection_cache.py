@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+
+from Mobility_Utils.Detection_Cache import BOX_COLUMNS, DetectionCache, file_digest
+
+
+@pytest.fixture
+def sources(tmp_path):
+    video = tmp_path / "video.mp4"
+    model = tmp_path / "weights.pt"
+    video.write_bytes(b"frames" * 100)
+    model.write_bytes(b"weights")
+    return str(video), str(model)
+
+
+def detections(frame_idx, count):
+    rows = np.arange(count * BOX_COLUMNS, dtype=np.float32).reshape(count, BOX_COLUMNS)
+    return rows + frame_idx
+
+
+def open_cache(tmp_path, sources, params=None):
+    return DetectionCache(str(tmp_path / "cache"), *sources, params or {"imgsz": 640})
+
+
+def test_round_trip_and_reopen(tmp_path, sources):
+    cache = open_cache(tmp_path, sources)
+    for frame_idx, count in enumerate([2, 0, 3]):
+        cache.put(frame_idx, detections(frame_idx, count))
+    cache.close(complete=True)
+
+    reopened = open_cache(tmp_path, sources)
+    assert reopened.complete
+    for frame_idx, count in enumerate([2, 0, 3]):
+        np.testing.assert_array_equal(reopened.get(frame_idx), detections(frame_idx, count))
+    assert reopened.get(3) is None
+    assert open_cache(tmp_path, sources, {"imgsz": 1280}).key != reopened.key
+
+
+def test_recovers_from_truncated_append(tmp_path, sources):
+    cache = open_cache(tmp_path, sources)
+    for frame_idx in range(3):
+        cache.put(frame_idx, detections(frame_idx, 2))
+    cache.close()
+
+    # Crash while appending frame 3: half a box row and half an index entry on disk,
+    # plus an index entry for frame 2 that now points past the truncated boxes
+    with open(cache._boxes_path, "r+b") as f:
+        f.truncate(5 * BOX_COLUMNS * 4)
+    with open(cache._boxes_path, "ab") as f:
+        f.write(b"\0" * 10)
+    with open(cache._index_path, "ab") as f:
+        f.write(b"\0" * 7)
+
+    recovered = open_cache(tmp_path, sources)
+    assert recovered.last_frame == 1
+    assert recovered.get(2) is None
+    np.testing.assert_array_equal(recovered.get(1), detections(1, 2))
+    assert os.path.getsize(recovered._boxes_path) == 4 * BOX_COLUMNS * 4
+    assert os.path.getsize(recovered._index_path) == 2 * 16
+
+    # The next run continues after the valid prefix
+    recovered.put(2, detections(2, 1))
+    recovered.close(complete=True)
+    np.testing.assert_array_equal(open_cache(tmp_path, sources).get(2), detections(2, 1))
+
+
+def test_file_digest_only_hashes_regular_files(tmp_path, sources):
+    video, _ = sources
+    assert file_digest(video) == file_digest(video, str(tmp_path / "memo.json"))
+    assert file_digest(str(tmp_path)) is None  # a directory
+    assert file_digest(str(tmp_path / "missing.mp4")) is None
+    assert file_digest("rtsp://camera.local/stream") is None
+    assert file_digest(0) is None  # a capture device index
+
+
+@pytest.mark.parametrize("video", [0, "rtsp://camera.local/stream", "missing.mp4"])
+def test_cache_refuses_sources_that_are_not_files(tmp_path, sources, video):
+    with pytest.raises(ValueError, match="video"):
+        DetectionCache(str(tmp_path / "cache"), video, sources[1], {})
+
+
+def test_frames_after_a_gap_are_not_cached_and_never_marked_complete(tmp_path, sources):
+    # A paced run that only processed frames 0, 3 and 7 of an 8-frame video
+    paced = open_cache(tmp_path, sources)
+    for frame_idx in (0, 3, 7):
+        paced.put(frame_idx, detections(frame_idx, 1))
+    paced.close(complete=True)
+    assert not paced.complete
+
+    offline = open_cache(tmp_path, sources)
+    assert not offline.complete and offline.last_frame == 0
+    for frame_idx in range(8):
+        if offline.get(frame_idx) is None:
+            offline.put(frame_idx, detections(frame_idx, 2))
+    assert offline.misses == 7
+    offline.close(complete=True)
+
+    rerun = open_cache(tmp_path, sources)
+    assert rerun.complete
+    assert all(rerun.get(frame_idx) is not None for frame_idx in range(8))
+    assert rerun.misses == 0
+
+
+def test_gapped_cache_from_disk_is_cut_at_the_first_gap(tmp_path, sources):
+    cache = open_cache(tmp_path, sources)
+    cache.close()
+    # Frames 0, 1, 3 and 4 on disk, marked complete: as written when gaps were still accepted
+    rows = [detections(frame_idx, 1) for frame_idx in (0, 1, 3, 4)]
+    np.concatenate(rows).astype(np.float32).tofile(cache._boxes_path)
+    np.array([[0, 1], [1, 2], [3, 3], [4, 4]], dtype=np.int64).tofile(cache._index_path)
+    with open(cache._meta_path, "w") as f:
+        f.write("{}")
+
+    reopened = open_cache(tmp_path, sources)
+    assert not reopened.complete
+    assert reopened.last_frame == 1
+    assert reopened.get(3) is None
+    np.testing.assert_array_equal(reopened.get(1), detections(1, 1))
+    assert os.path.getsize(reopened._boxes_path) == 2 * BOX_COLUMNS * 4
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from Mobility_Utils.Frame_Pool import FramePool, capture_shape, read_into, resize_into
+
+
+class FakeCapture:
+    """Capture that decodes `frames` and reports `reported` as (height, width)."""
+
+    def __init__(self, frames, reported=(0, 0)):
+        self.frames = list(frames)
+        self.reported = reported
+        self.allocations = 0
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.reported[0]
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.reported[1]
+        return 0
+
+    def read(self, image=None):
+        if not self.frames:
+            return False, None
+        frame = self.frames.pop(0)
+        if image is None or image.shape != frame.shape:
+            self.allocations += 1
+            return True, frame.copy()
+        image[...] = frame
+        return True, image
+
+
+def frames(count, shape):
+    return [np.full(shape, i, dtype=np.uint8) for i in range(count)]
+
+
+def test_released_frames_survive_until_the_ring_wraps():
+    pool = FramePool((4, 4, 3), capacity=3)
+    first = pool.acquire()
+    first[...] = 1
+    pool.release(first)
+    second = pool.acquire()
+    third = pool.acquire()
+    assert second is not first and third is not first
+    assert (first == 1).all()
+    pool.release(second)
+    pool.release(third)
+    assert pool.acquire() is first  # only now is `first` reused
+
+
+def test_exhausted_pool_and_foreign_buffers_are_errors():
+    pool = FramePool((2, 2, 3), capacity=1)
+    buffer = pool.acquire()
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    with pytest.raises(ValueError):
+        pool.release(np.empty((2, 2, 3), dtype=np.uint8))
+    pool.release(buffer)
+    with pytest.raises(ValueError):
+        pool.release(buffer)
+    with pytest.raises(ValueError):
+        FramePool((2, 2, 3), capacity=0)
+
+
+def test_stream_without_reported_size_is_sized_from_the_first_frame():
+    cap = FakeCapture(frames(5, (6, 8, 3)))
+    assert capture_shape(cap) is None
+    pool = FramePool(capture_shape(cap))
+    decoded = []
+    while (frame := read_into(cap, pool)) is not None:
+        decoded.append(int(frame[0, 0, 0]))
+        pool.release(frame)
+    assert decoded == [0, 1, 2, 3, 4]
+    assert pool.shape == (6, 8, 3)
+    assert cap.allocations == 1  # only the first frame; the rest decode in place
+
+
+def test_rotated_video_resizes_the_pool_once_without_distortion():
+    # Reported as 8x6 (width x height) but decoded upright as 6 wide, 8 tall
+    cap = FakeCapture(frames(4, (8, 6, 3)), reported=(6, 8))
+    pool = FramePool(capture_shape(cap), capacity=2)
+    held = pool.acquire()  # in flight while the pool is re-sized
+    for _ in range(4):
+        frame = read_into(cap, pool)
+        assert frame.shape == (8, 6, 3)
+        pool.release(frame)
+    assert cap.allocations == 1
+    pool.release(held)
+    assert pool.acquire().shape == (8, 6, 3) and pool.acquire().shape == (8, 6, 3)
+
+
+def test_resize_into_writes_into_a_pooled_buffer():
+    pool = FramePool((5, 10, 3), capacity=1)
+    out = resize_into(np.full((20, 40, 3), 7, dtype=np.uint8), pool)
+    assert out.shape == (5, 10, 3) and (out == 7).all()
+    pool.release(out)
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from Mobility_Utils.Job_Checkpoint import JobCheckpointer, seek_capture, segment_path
+from Mobility_Utils.Traffic_Aggregates import TrafficAggregator
+
+JOB = {"video": "/videos/a.mp4", "model": "yolov9c.pt", "lines": (120, 80, 6)}
+
+
+def test_round_trip(tmp_path):
+    aggregator = TrafficAggregator()
+    aggregator.add_count(5.0, "north", "car", "in")
+    aggregator.add_speed(5.0, "north", 48.0)
+    expected = aggregator.snapshot()
+
+    checkpointer = JobCheckpointer(str(tmp_path), JOB, every_frames=100)
+    assert checkpointer.load() is None
+    assert checkpointer.due(100) and not checkpointer.due(99)
+    checkpointer.save(100, {"aggregator": aggregator.get_state(), "next_export": 60.0})
+    # The frame loop keeps recording while the writer thread pickles the copy
+    aggregator.add_count(6.0, "north", "car", "in")
+    checkpointer.close()
+    assert checkpointer.written == 1
+
+    resumed = JobCheckpointer(str(tmp_path), JOB, every_frames=100)
+    checkpoint = resumed.load()
+    assert checkpoint["position"] == 100
+    assert checkpoint["state"]["next_export"] == 60.0
+    restored = TrafficAggregator()
+    restored.set_state(checkpoint["state"]["aggregator"])
+    assert restored.snapshot() == expected
+    assert not resumed.due(199) and resumed.due(200)
+
+    resumed.clear()
+    assert resumed.load() is None
+    resumed.close()
+
+
+def test_checkpoint_of_another_job_is_rejected(tmp_path):
+    checkpointer = JobCheckpointer(str(tmp_path), JOB)
+    checkpointer.save(10, {})
+    checkpointer.close()
+    other = JobCheckpointer(str(tmp_path), dict(JOB, lines=(200, 80, 6)))
+    with pytest.raises(ValueError, match="different job"):
+        other.load()
+    other.close()
+
+
+def test_unpicklable_state_does_not_stop_the_writer(tmp_path):
+    checkpointer = JobCheckpointer(str(tmp_path), JOB)
+    checkpointer.save(10, {"callback": lambda: None})
+    checkpointer.flush()
+    checkpointer.save(20, {})
+    checkpointer.close()
+    assert checkpointer.written == 1
+    assert JobCheckpointer(str(tmp_path), JOB).load()["position"] == 20
+
+
+def test_segment_path():
+    assert segment_path("output.avi", 0) == "output.avi"
+    assert segment_path("output.avi", 900) == "output.000900.avi"
+
+
+@pytest.fixture
+def numbered_video(tmp_path):
+    """Video whose frame i is filled with gray level 10 * i."""
+    path = str(tmp_path / "numbered.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10.0, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), 10 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame_number(frame):
+    return int(round(frame.mean() / 10))
+
+
+def test_seek_capture_on_a_video(numbered_video):
+    cap = cv2.VideoCapture(numbered_video)
+    assert seek_capture(cap, 7)
+    ok, frame = cap.read()
+    assert ok and frame_number(frame) == 7
+    cap.release()
+
+
+class KeyframeCapture:
+    """Capture of numbered frames that only seeks to multiples of `keyframe`."""
+
+    def __init__(self, length=20, keyframe=5, overshoot=False):
+        self.length = length
+        self.keyframe = keyframe
+        self.overshoot = overshoot
+        self.position = 0
+
+    def set(self, prop, value):
+        assert prop == cv2.CAP_PROP_POS_FRAMES
+        value = int(value)
+        if value % self.keyframe:
+            value = (value // self.keyframe + self.overshoot) * self.keyframe
+        self.position = min(value, self.length)
+        return True
+
+    def get(self, prop):
+        assert prop == cv2.CAP_PROP_POS_FRAMES
+        return float(self.position)
+
+    def grab(self):
+        if self.position >= self.length:
+            return False
+        self.position += 1
+        return True
+
+
+@pytest.mark.parametrize("overshoot", [False, True])
+def test_seek_capture_grabs_forward_from_a_keyframe(overshoot):
+    cap = KeyframeCapture(overshoot=overshoot)
+    assert seek_capture(cap, 13)
+    assert cap.position == 13
+
+
+def test_seek_capture_past_the_end():
+    assert not seek_capture(KeyframeCapture(length=12), 13)
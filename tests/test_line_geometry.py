@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Mobility_Utils.Line_Geometry import distance_to_line, is_crossing_line, lane_queues
+
+
+def test_distance_to_line_clamps_to_the_segment():
+    assert distance_to_line(5, 3, (0, 0), (10, 0)) == pytest.approx(3)
+    assert distance_to_line(13, 4, (0, 0), (10, 0)) == pytest.approx(5)  # past the end point
+    assert distance_to_line(3, 4, (0, 0), (0, 0)) == pytest.approx(5)  # degenerate line
+
+
+def test_lane_queues_counts_vehicles_near_each_line():
+    lines = [{"start": (0, 100), "end": (200, 100)}, {"start": (300, 0), "end": (300, 200)}]
+    centroids = [(50, 90), (150, 130), (290, 50), (305, 150), (600, 600)]
+    assert lane_queues(centroids, lines, zone_px=20) == [1, 2]
+
+
+def test_is_crossing_line_respects_axis():
+    assert is_crossing_line(50, 105, (0, 100), (200, 100))
+    assert not is_crossing_line(50, 115, (0, 100), (200, 100))
+    assert not is_crossing_line(250, 100, (0, 100), (200, 100))
+    assert is_crossing_line(305, 50, (300, 0), (300, 200), axis="vertical")
+    assert not is_crossing_line(305, 250, (300, 0), (300, 200), axis="vertical")
+
+
+def test_counter_geometry_has_no_pipeline_dependencies():
+    # Traffic_Counter/Main.py imports this module; it must not pull in the speed-detection package
+    code = (
+        "import sys, Mobility_Utils.Line_Geometry; "
+        "print(sorted(m for m in sys.modules if m.startswith(('Speed_Detection', 'cv2'))))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
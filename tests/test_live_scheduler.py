@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from Mobility_Utils.Live_Scheduler import FrameScheduler
+
+FPS = 30.0
+NUM_FRAMES = 60
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """Two seconds at 30 fps; frame i is filled with gray level 4 * i."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (64, 48))
+    for i in range(NUM_FRAMES):
+        writer.write(np.full((48, 64, 3), 4 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame_number(frame):
+    return int(round(frame.mean() / 4))
+
+
+def run(path, mode, work=0.0):
+    cap = cv2.VideoCapture(path)
+    scheduler = FrameScheduler(cap, mode=mode, log_interval=0)
+    frames = []
+    while True:
+        scheduled = scheduler.next_frame()
+        if scheduled is None:
+            break
+        frames.append(scheduled)
+        time.sleep(work)
+        scheduler.finish_frame()
+    cap.release()
+    return scheduler, frames
+
+
+def test_offline_returns_every_frame_in_order(clip):
+    scheduler, frames = run(clip, "offline")
+
+    assert [f.index for f in frames] == list(range(NUM_FRAMES))
+    assert [frame_number(f.frame) for f in frames] == list(range(NUM_FRAMES))
+    assert [f.timestamp for f in frames] == pytest.approx([i / FPS for i in range(NUM_FRAMES)])
+    assert [f.motion_scale for f in frames] == pytest.approx([1.0] * NUM_FRAMES)
+    metrics = scheduler.metrics()
+    assert metrics["processed"] == NUM_FRAMES and metrics["dropped"] == 0
+
+
+def test_paced_skips_frames_that_arrive_during_processing(clip):
+    # 100 ms of work per frame against a 33 ms frame period: every 3rd frame is processed
+    scheduler, frames = run(clip, "paced", work=0.1)
+
+    assert [frame_number(f.frame) for f in frames] == [f.index for f in frames]
+    assert [f.timestamp for f in frames] == pytest.approx([f.index / FPS for f in frames])
+    scales = [f.motion_scale for f in frames[1:]]
+    assert scales == pytest.approx([b.index - a.index for a, b in zip(frames, frames[1:])])
+    assert np.median(scales) == pytest.approx(3.0)
+
+    metrics = scheduler.metrics()
+    assert metrics["processed"] == len(frames)
+    assert metrics["processed"] + metrics["dropped"] == NUM_FRAMES
+    assert 0.55 <= metrics["drop_rate"] <= 0.75
+    assert metrics["deadline_misses"] == len(frames)
+    # A frame is finished 100 ms of work after it arrived, plus decode and scheduling
+    assert 100 <= metrics["lag_ms_mean"] < 200
+    assert metrics["lag_ms_mean"] <= metrics["lag_ms_p95"] <= metrics["lag_ms_max"]
+
+
+def test_unknown_mode(clip):
+    with pytest.raises(ValueError, match="Unknown scheduling mode"):
+        FrameScheduler(cv2.VideoCapture(clip), mode="realtime")
@@ -0,0 +1,56 @@
+import os
+import shutil
+import socket
+import threading
+
+import pytest
+
+from Mobility_Utils.Model_Worker import ModelClient, _serve_forever, weights_info
+
+
+class NamesOnlyModel:
+    names = {0: "car"}
+
+
+@pytest.fixture
+def weights(tmp_path):
+    path = tmp_path / "yolo.pt"
+    path.write_bytes(b"weights" * 1000)
+    return str(path)
+
+
+@pytest.fixture
+def worker(tmp_path, weights):
+    socket_path = str(tmp_path / "worker.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(4)
+    threading.Thread(
+        target=_serve_forever, args=(listener, NamesOnlyModel(), weights_info(weights)), daemon=True
+    ).start()
+    yield socket_path
+    listener.close()
+
+
+def test_client_accepts_the_served_weights(worker, weights, tmp_path):
+    client = ModelClient(worker, model_path=weights)
+    assert client.model_path == os.path.abspath(weights) and client.names == {0: "car"}
+    client.close()
+
+    # A copy elsewhere has another path and mtime but the same content
+    copy = str(tmp_path / "copy.pt")
+    shutil.copy(weights, copy)
+    ModelClient(worker, model_path=copy).close()
+
+
+def test_client_rejects_other_weights(worker, tmp_path):
+    other = tmp_path / "other.pt"
+    other.write_bytes(b"other weights")
+    with pytest.raises(ValueError, match="serves"):
+        ModelClient(worker, model_path=str(other))
+
+
+def test_missing_local_weights_are_compared_by_name(worker):
+    ModelClient(worker, model_path="yolo.pt").close()
+    with pytest.raises(ValueError, match="serves"):
+        ModelClient(worker, model_path="yolov8n.pt")
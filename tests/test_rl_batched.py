@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("gym")
+
+from RL_algorithm import QLearningAgent, evaluate_batched
+from RL_environment import TrafficManagementEnv
+
+
+@pytest.fixture
+def env():
+    return TrafficManagementEnv(num_actions=4, num_observations=6)
+
+
+def test_step_batch_matches_repeated_step(env):
+    start = np.random.default_rng(1).random((8, 6))
+    for row, state in enumerate(start):
+        env.state = state.copy()
+        batch_state = state[None, :].copy()
+        # Identical seeds give step (global RNG) and step_batch (rng argument) the same draws;
+        # action 4 is outside the lanes, so nothing is cleared
+        np.random.seed(row)
+        rng = np.random.RandomState(row)
+        for action in [row % 5, 2, 4, 0]:
+            expected_state, expected_reward, _, _ = env.step(action)
+            batch_state, batch_rewards = env.step_batch(batch_state, np.array([action]), rng)
+            np.testing.assert_allclose(batch_state[0], expected_state)
+            assert batch_rewards[0] == pytest.approx(expected_reward)
+
+
+def test_step_batch_does_not_modify_input(env):
+    states = env.reset_batch(16, np.random.default_rng(0))
+    before = states.copy()
+    env.step_batch(states, np.zeros(16, dtype=int), np.random.default_rng(1))
+    np.testing.assert_array_equal(states, before)
+
+
+def test_greedy_actions_match_per_state_argmax():
+    agent = QLearningAgent(num_states=3, num_actions=4)
+    agent.q_table = np.random.default_rng(0).random(agent.q_table.shape)
+    states = np.random.default_rng(1).random((50, 3))
+    expected = [np.argmax(agent.q_table[agent._discretize_state(state)]) for state in states]
+    np.testing.assert_array_equal(agent.greedy_actions(states), expected)
+
+
+def test_evaluate_batched_is_reproducible_with_a_seed(env):
+    agent = QLearningAgent(num_states=6, num_actions=4)
+    first = evaluate_batched(env, agent, episodes=64, max_steps=10, batch_size=16, seed=3)
+    second = evaluate_batched(env, agent, episodes=64, max_steps=10, batch_size=16, seed=3)
+    assert first["reward_mean"] == second["reward_mean"]
+    low, high = first["reward_ci95"]
+    assert low <= first["reward_mean"] <= high
+
+
+def test_environment_is_still_importable_from_rl_algorithm():
+    from RL_algorithm import TrafficManagementEnv as reexported
+
+    assert reexported is TrafficManagementEnv
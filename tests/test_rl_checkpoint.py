@@ -0,0 +1,117 @@
+import os
+
+import numpy as np
+import pytest
+
+import RL_checkpoint
+from RL_algorithm import QLearningAgent, train
+from RL_checkpoint import LATEST_FILE, latest_checkpoint, load_checkpoint, save_checkpoint
+
+
+class TinyEnv:
+    """Two-lane stand-in for TrafficManagementEnv (no gym), driven by the global NumPy RNG."""
+
+    def reset(self):
+        self.steps = 0
+        self.state = np.random.rand(2)
+        return self.state
+
+    def step(self, action):
+        self.steps += 1
+        self.state = np.clip(self.state + np.random.uniform(-0.2, 0.2, size=2), 0, 0.99)
+        return self.state, float(1 - self.state.mean()), self.steps >= 5, {}
+
+
+def make_agent(**kwargs):
+    return QLearningAgent(num_states=2, num_actions=2, **kwargs)
+
+
+def run(checkpoint_dir, num_episodes, resume=False, checkpoint_every=5, agent=None):
+    agent = agent or make_agent()
+    rewards = train(
+        TinyEnv(),
+        agent,
+        num_episodes=num_episodes,
+        max_steps=10,
+        checkpoint_dir=str(checkpoint_dir),
+        checkpoint_every=checkpoint_every,
+        resume=resume,
+    )
+    return agent, rewards
+
+
+def test_resume_matches_uninterrupted_run(tmp_path):
+    np.random.seed(0)
+    full_agent, full_rewards = run(tmp_path / "full", 20)
+
+    np.random.seed(0)
+    run(tmp_path / "split", 10)
+    np.random.seed(123)  # resume must restore the RNG, not depend on the caller's seed
+    resumed_agent, resumed_rewards = run(tmp_path / "split", 20, resume=True)
+
+    np.testing.assert_array_equal(np.asarray(resumed_agent.q_table), full_agent.q_table)
+    assert resumed_rewards == full_rewards
+    assert resumed_agent.epsilon == full_agent.epsilon
+
+
+def test_latest_points_at_newest_and_old_checkpoints_are_pruned(tmp_path):
+    agent = make_agent()
+    for episode in (5, 10, 15):
+        agent.q_table[0, 0] = episode
+        save_checkpoint(str(tmp_path), agent, episode, [0.0] * episode, keep=2)
+
+    assert sorted(os.listdir(tmp_path)) == [LATEST_FILE, "ep_000010", "ep_000015"]
+    assert latest_checkpoint(str(tmp_path)) == str(tmp_path / "ep_000015")
+    ckpt = load_checkpoint(str(tmp_path))
+    assert ckpt["episode"] == 15 and ckpt["q_table"][0, 0] == 15
+
+
+def test_fresh_run_next_to_older_checkpoints_keeps_its_own(tmp_path):
+    agent = make_agent()
+    for episode in (400, 500):
+        save_checkpoint(str(tmp_path), agent, episode, [0.0] * episode, keep=2)
+
+    # A new run starting over at a lower episode count in the same directory
+    for episode in (100, 200):
+        path = save_checkpoint(str(tmp_path), agent, episode, [0.0] * episode, keep=2)
+        assert latest_checkpoint(str(tmp_path)) == path == str(tmp_path / f"ep_{episode:06d}")
+        assert os.path.isdir(path)
+
+    assert sorted(os.listdir(tmp_path)) == [LATEST_FILE, "ep_000100", "ep_000200"]
+    assert load_checkpoint(str(tmp_path))["episode"] == 200
+
+
+def test_failed_save_leaves_previous_checkpoint_current(tmp_path, monkeypatch):
+    agent = make_agent()
+    save_checkpoint(str(tmp_path), agent, 5, [1.0] * 5)
+
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(RL_checkpoint.os, "replace", crash)
+    with pytest.raises(OSError):
+        save_checkpoint(str(tmp_path), agent, 10, [1.0] * 10)
+    monkeypatch.undo()
+
+    # No partial directory or pointer is left behind and LATEST still resolves
+    assert sorted(os.listdir(tmp_path)) == [LATEST_FILE, "ep_000005"]
+    assert load_checkpoint(str(tmp_path))["episode"] == 5
+
+
+@pytest.mark.parametrize("checkpoint_every", [0, None])
+def test_periodic_checkpoints_can_be_disabled(tmp_path, checkpoint_every):
+    run(tmp_path, 12, checkpoint_every=checkpoint_every)
+    assert sorted(os.listdir(tmp_path)) == [LATEST_FILE, "ep_000012"]
+
+
+def test_negative_checkpoint_every_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        run(tmp_path, 5, checkpoint_every=-1)
+
+
+def test_resume_refuses_mismatched_hyperparameters(tmp_path):
+    run(tmp_path, 5)
+    with pytest.raises(ValueError, match="learning_rate"):
+        run(tmp_path, 10, resume=True, agent=make_agent(learning_rate=0.5))
+    with pytest.raises(ValueError, match="num_actions"):
+        run(tmp_path, 10, resume=True, agent=QLearningAgent(num_states=2, num_actions=3))
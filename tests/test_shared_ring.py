@@ -0,0 +1,113 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+from Mobility_Utils.Shared_Ring import DECISION_DTYPE, SharedRing
+
+
+def record(frame_id):
+    value = np.zeros((), dtype=DECISION_DTYPE)
+    value["timestamp_ns"] = value["obs_timestamp_ns"] = value["frame_id"] = frame_id
+    value["phase"] = frame_id % 4
+    return value
+
+
+@pytest.fixture
+def ring_name():
+    return f"test_ring_{uuid.uuid4().hex[:12]}"
+
+
+class InterruptedSlots:
+    """Reader-side view of the slots that lets the writer publish while a record is being copied."""
+
+    def __init__(self, slots, interrupts):
+        self.slots = slots
+        self.interrupts = interrupts
+
+    def __getitem__(self, index):
+        slot = self.slots[index]
+        interrupts = self.interrupts
+
+        class Slot:
+            def __getitem__(self, key):
+                if key == "record" and interrupts:
+                    interrupts.pop()()
+                return slot[key]
+
+        return Slot()
+
+
+def test_read_returns_published_records_in_order(ring_name):
+    writer = SharedRing(ring_name, DECISION_DTYPE, capacity=4, create=True)
+    try:
+        for frame_id in range(6):
+            writer.publish(record(frame_id))
+        assert writer.head == 6
+        assert writer.read(1) is None  # overwritten by record 5
+        assert [int(writer.read(i)["frame_id"]) for i in range(2, 6)] == [2, 3, 4, 5]
+        assert writer.read(6) is None  # not written yet
+        assert int(writer.latest()["frame_id"]) == 5
+    finally:
+        writer.close()
+
+
+def test_torn_read_is_detected_and_latest_retries(ring_name):
+    writer = SharedRing(ring_name, DECISION_DTYPE, capacity=1, create=True)
+    reader = SharedRing(ring_name, DECISION_DTYPE)
+    try:
+        writer.publish(record(0))
+        # The writer overwrites the only slot while the reader is copying record 0
+        reader._slots = InterruptedSlots(reader._slots, [lambda: writer.publish(record(1))])
+        assert reader.read(0) is None
+        assert reader._slots.interrupts == []
+
+        writer.publish(record(2))
+        reader._slots.interrupts.append(lambda: writer.publish(record(3)))
+        latest = reader.latest()
+        assert int(latest["frame_id"]) == 3
+        assert int(latest["phase"]) == 3 and int(latest["timestamp_ns"]) == 3
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_slot_being_written_is_not_read(ring_name):
+    writer = SharedRing(ring_name, DECISION_DTYPE, capacity=2, create=True)
+    try:
+        writer.publish(record(0))
+        writer._slots[0]["seq"] += 1  # as if the writer stopped halfway through its next lap
+        assert writer.read(0) is None
+    finally:
+        writer.close()
+
+
+def test_wait_next_wakes_on_publish_and_times_out_without_spinning(ring_name):
+    writer = SharedRing(ring_name, DECISION_DTYPE, create=True)
+    try:
+        timer = threading.Timer(0.05, writer.publish, args=(record(0),))
+        timer.start()
+        assert writer.wait_next(0, timeout=2.0) == 1
+        timer.join()
+
+        cpu, wall = time.process_time(), time.monotonic()
+        assert writer.wait_next(1, timeout=0.3) is None
+        assert time.monotonic() - wall >= 0.3
+        assert time.process_time() - cpu < 0.15  # backs off instead of busy-waiting
+    finally:
+        writer.close()
+
+
+def test_create_replaces_a_stale_block(ring_name):
+    crashed = SharedRing(ring_name, DECISION_DTYPE, capacity=4, create=True)
+    crashed.publish(record(7))
+    del crashed._head, crashed._slots
+    crashed.shm.close()  # exits without unlinking, like a crashed writer
+
+    writer = SharedRing(ring_name, DECISION_DTYPE, capacity=8, create=True)
+    try:
+        assert writer.head == 0 and writer.capacity == 8
+    finally:
+        writer.close()
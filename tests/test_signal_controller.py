@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from Mobility_Utils.Shared_Ring import OBSERVATION_DTYPE
+from RL_algorithm import QLearningAgent
+from Signal_Controller import build_observation
+
+
+def record(occupancy, mean_speed=float("nan")):
+    value = np.zeros((), dtype=OBSERVATION_DTYPE)
+    value["num_lanes"] = len(occupancy)
+    value["occupancy"][: len(occupancy)] = occupancy
+    value["mean_speed"] = mean_speed
+    return value[()]
+
+
+def test_build_observation_pads_lanes_and_normalizes_speed():
+    observation = build_observation(record([0.2, 1.5, -0.1], mean_speed=25.0), num_observations=6)
+    np.testing.assert_allclose(observation, [0.2, 1.0, 0.0, 0.0, 0.0, 0.5], rtol=1e-6)
+
+
+def test_build_observation_derives_speed_from_density_when_unmeasured():
+    observation = build_observation(record([0.5, 0.5, 0.5, 0.5, 0.5]), num_observations=6)
+    np.testing.assert_allclose(observation[-1], 0.5)
+
+
+def test_greedy_action_matches_greedy_actions():
+    rng = np.random.default_rng(0)
+    agent = QLearningAgent(num_states=6, num_actions=4, q_table=rng.random((10 ** 6, 4)))
+    states = rng.random((500, 6))
+    # Values on the bin edges, including 0 and 1
+    states[:50] = np.linspace(0, 1, 10)[rng.integers(0, 10, size=(50, 6))]
+    expected = agent.greedy_actions(states)
+    assert [agent.greedy_action(state) for state in states] == expected.tolist()
+
+
+def test_importing_the_agent_does_not_import_gym():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, RL_algorithm, Signal_Controller; assert 'gym' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from Mobility_Utils.Tiled_Inference import TiledDetector, merge_detections, tile_grid
+
+
+def box(x1, y1, x2, y2, conf=0.9, cls=2):
+    return [x1, y1, x2, y2, conf, cls]
+
+
+def test_truncated_box_never_suppresses_the_complete_box():
+    # The part cut off at a seam is more confident than the complete box
+    full = box(100, 100, 200, 160, conf=0.7)
+    part = box(150, 100, 200, 160, conf=0.9)
+    detections = np.array([part, full], dtype=np.float32)
+
+    kept = merge_detections(detections, truncated=np.array([True, False]))
+    np.testing.assert_array_equal(kept, np.array([full], dtype=np.float32))
+
+
+def test_ios_merges_partial_boxes_that_iou_keeps():
+    # The partial box covers half of the complete one: IoU 0.5, IoS 1.0
+    detections = np.array([box(100, 100, 200, 160), box(150, 100, 200, 160, conf=0.8)], dtype=np.float32)
+    assert len(merge_detections(detections, metric="iou")) == 2
+    assert len(merge_detections(detections, metric="ios")) == 1
+
+
+def test_overlapping_boxes_of_different_classes_are_kept():
+    detections = np.array([box(100, 100, 200, 160, cls=2), box(100, 100, 200, 160, cls=7)], dtype=np.float32)
+    assert len(merge_detections(detections)) == 2
+
+
+def test_unknown_metric():
+    with pytest.raises(ValueError, match="Unknown match metric"):
+        merge_detections(np.zeros((2, 6)), metric="giou")
+
+
+def test_tile_grid_covers_the_region():
+    tiles = tile_grid((1000, 400), tile_size=500, overlap=0.2)
+    np.testing.assert_array_equal(tiles, [[0, 0, 500, 400], [250, 0, 750, 400], [500, 0, 1000, 400]])
+
+
+class BlobModel:
+    """Fake model: one box around the bright pixels of each crop, partial views most confident."""
+
+    def predict_boxes(self, crops, **params):
+        results = []
+        for crop in crops:
+            ys, xs = np.nonzero(crop[:, :, 0])
+            if not len(xs):
+                results.append(np.empty((0, 6), dtype=np.float32))
+                continue
+            x1, y1, x2, y2 = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+            partial = x1 == 0 or x2 == crop.shape[1]
+            results.append(np.array([box(x1, y1, x2, y2, conf=0.9 if partial else 0.8)], dtype=np.float32))
+        return results
+
+
+def test_vehicle_across_tile_seams_is_detected_once():
+    frame = np.zeros((400, 1000, 3), dtype=np.uint8)
+    frame[100:160, 430:560] = 255  # cut where the first tile ends and the last starts
+    detector = TiledDetector(BlobModel(), tile_size=500, overlap=0.2, full_frame=False)
+
+    detections = detector.detect(frame)
+    np.testing.assert_array_equal(detections, np.array([box(430, 100, 560, 160, conf=0.8)], dtype=np.float32))
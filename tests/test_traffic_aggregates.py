@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from Mobility_Utils.Traffic_Aggregates import SpeedSketch, TrafficAggregator
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_sketch_quantiles_within_relative_accuracy(accuracy):
+    sketch = SpeedSketch(accuracy=accuracy)
+    speeds = np.random.default_rng(0).lognormal(np.log(50), 0.5, 5000).clip(1.5, 390)
+    hist = np.zeros(sketch.bins, dtype=np.int64)
+    for speed in speeds:
+        hist[sketch.index(speed)] += 1
+
+    ordered = np.sort(speeds)
+    for q, value in zip((0.5, 0.85, 0.95), sketch.quantiles(hist).values()):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        # Quantiles are rounded to 0.01 km/h on top of the sketch error
+        assert abs(value - exact) <= accuracy * exact + 0.005
+
+
+def test_sketch_quantiles_of_empty_histogram():
+    sketch = SpeedSketch()
+    assert sketch.quantiles(np.zeros(sketch.bins)) == {"p50": None, "p85": None, "p95": None}
+
+
+def test_merged_aggregators_match_one_aggregator():
+    speeds = np.random.default_rng(1).uniform(20, 120, 400)
+    whole, first, second = TrafficAggregator(), TrafficAggregator(), TrafficAggregator()
+    for i, speed in enumerate(speeds):
+        whole.add_speed(float(i), "speed", speed)
+        (first if i % 2 else second).add_speed(float(i), "speed", speed)
+    first.merge(second)
+    assert first.snapshot()["speeds"] == whole.snapshot()["speeds"]
+
+
+def test_snapshot_skips_buckets_outside_the_window():
+    aggregator = TrafficAggregator(rollups=(("1min", 60, 4),))
+    for minute in range(4):
+        aggregator.add_count(minute * 60.0, "north", "car", "in")
+    # Minute 6 reuses only slot 2; slots 0, 1 and 3 still hold minutes 0, 1 and 3
+    aggregator.add_count(6 * 60.0, "north", "car", "in")
+
+    starts = [bucket["start"] for bucket in aggregator.snapshot()["rollups"]["1min"]]
+    assert starts == [3 * 60.0, 6 * 60.0]
+    starts = [bucket["start"] for bucket in aggregator.snapshot(now=8 * 60.0)["rollups"]["1min"]]
+    assert starts == [6 * 60.0]
+    assert aggregator.snapshot(now=20 * 60.0)["rollups"]["1min"] == []
+    assert aggregator.total("north") == 5
+
+
+def test_state_round_trip():
+    aggregator = TrafficAggregator()
+    aggregator.add_count(10.0, "north", "car", "in")
+    aggregator.add_speed(10.0, "north", 42.0)
+    restored = TrafficAggregator()
+    restored.set_state(aggregator.get_state())
+    assert restored.snapshot() == aggregator.snapshot()
+    with pytest.raises(ValueError):
+        TrafficAggregator(max_lines=4).set_state(aggregator.get_state())
+
+
+def test_labels_beyond_the_limits_are_counted_as_other():
+    aggregator = TrafficAggregator(max_lines=1, max_classes=2, max_directions=1)
+    for class_name in ("car", "truck", "bus", "bicycle"):
+        aggregator.add_count(10.0, "north", class_name, "in")
+    aggregator.add_count(10.0, "south", "car", "out")
+
+    assert aggregator.snapshot()["totals"] == {
+        "north": {"car": {"in": 1}, "truck": {"in": 1}, "other": {"in": 2}},
+        "other": {"car": {"other": 1}},
+    }
+    restored = TrafficAggregator(max_lines=1, max_classes=2, max_directions=1)
+    restored.set_state(aggregator.get_state())
+    assert restored.snapshot() == aggregator.snapshot()
+
+
+def test_merge_adds_every_label_folded_into_other():
+    whole = TrafficAggregator(max_classes=1)
+    other = TrafficAggregator()
+    for class_name in ("car", "truck", "bus"):
+        whole.add_count(10.0, "north", class_name, "in")
+        other.add_count(10.0, "north", class_name, "in")
+    merged = TrafficAggregator(max_classes=1)
+    merged.merge(other)
+    assert merged.snapshot() == whole.snapshot()
+    assert merged.snapshot()["totals"]["north"] == {"car": {"in": 1}, "other": {"in": 2}}
+
+
+def test_pipeline_aggregator_has_a_slot_for_every_configured_label():
+    pytest.importorskip("cv2")
+    from Mobility_Utils.Analysers import aggregate_limits
+    from Pipeline_Config import ANALYSERS, CLASSES_TO_TRACK
+
+    limits = aggregate_limits(ANALYSERS, CLASSES_TO_TRACK)
+    assert limits == {"max_lines": 4, "max_classes": len(CLASSES_TO_TRACK), "max_directions": 5}